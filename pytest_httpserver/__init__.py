@@ -4,35 +4,75 @@ This is package provides the main API for the pytest_httpserver package.
 """
 
 __all__ = [
+    "JSON_DUMPS_COMPACT",
+    "JSON_DUMPS_INDENTED",
     "METHOD_ALL",
     "URI_DEFAULT",
+    "AsyncHTTPServer",
+    "AsyncioEngine",
     "BakedHTTPServer",
     "BlockingHTTPServer",
     "BlockingRequestHandler",
+    "ConnectionStats",
     "Error",
     "HTTPServer",
     "HTTPServerError",
     "HeaderValueMatcher",
+    "KeepAliveSettings",
+    "LogEvictionWarning",
+    "LogRetention",
+    "LogSettings",
     "NoHandlerError",
+    "OverflowPolicy",
+    "PathTemplate",
     "RequestHandler",
     "RequestMatcher",
     "RequestMatcherKwargs",
+    "RequestSpec",
+    "ResponseSpec",
+    "ServerEngine",
+    "StaticResponse",
+    "TLSCertificates",
     "URIPattern",
     "WaitingSettings",
+    "WorkerPool",
+    "get_tls_certificates",
+    "load_json_specs",
+    "load_jsonl_specs",
 ]
 
+from .async_httpserver import AsyncHTTPServer
 from .bake import BakedHTTPServer
 from .blocking_httpserver import BlockingHTTPServer
 from .blocking_httpserver import BlockingRequestHandler
+from .engines import AsyncioEngine
+from .engines import ServerEngine
+from .httpserver import JSON_DUMPS_COMPACT
+from .httpserver import JSON_DUMPS_INDENTED
 from .httpserver import METHOD_ALL
 from .httpserver import URI_DEFAULT
+from .httpserver import ConnectionStats
 from .httpserver import Error
 from .httpserver import HeaderValueMatcher
 from .httpserver import HTTPServer
 from .httpserver import HTTPServerError
+from .httpserver import KeepAliveSettings
+from .httpserver import LogEvictionWarning
+from .httpserver import LogRetention
+from .httpserver import LogSettings
 from .httpserver import NoHandlerError
+from .httpserver import OverflowPolicy
+from .httpserver import PathTemplate
 from .httpserver import RequestHandler
 from .httpserver import RequestMatcher
 from .httpserver import RequestMatcherKwargs
+from .httpserver import RequestSpec
+from .httpserver import ResponseSpec
+from .httpserver import StaticResponse
 from .httpserver import URIPattern
 from .httpserver import WaitingSettings
+from .httpserver import WorkerPool
+from .specs import load_json_specs
+from .specs import load_jsonl_specs
+from .tls import TLSCertificates
+from .tls import get_tls_certificates
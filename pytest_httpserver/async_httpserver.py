@@ -0,0 +1,217 @@
+"""
+Server serving the requests on the running asyncio event loop.
+
+Unlike :py:class:`HTTPServer`, which serves the requests in a background thread,
+:py:class:`AsyncHTTPServer` serves them in the event loop of the test, so the
+requests of an asynchronous client don't cross a thread boundary, and the
+handlers can be coroutine functions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from werkzeug import Request
+from werkzeug import Response
+
+from .engines import AsyncioEngine
+from .engines import _AppResult
+from .httpserver import HTTPServer
+from .httpserver import HTTPServerError
+from .httpserver import RequestCache
+from .httpserver import _to_response
+
+if TYPE_CHECKING:
+    import sys
+    from ssl import SSLContext
+    from types import TracebackType
+
+    from _typeshed.wsgi import WSGIEnvironment
+
+    from .httpserver import JSON_DUMPS_T
+    from .httpserver import LogSettings
+    from .httpserver import WaitingSettings
+
+    if sys.version_info >= (3, 11):
+        from typing import Self
+    else:
+        from typing_extensions import Self
+
+__all__ = ["AsyncHTTPServer"]
+
+
+class _RunningLoopEngine(AsyncioEngine):
+    """
+    Engine serving the connections on the running event loop, awaiting the server
+    for each request.
+    """
+
+    def __init__(self, server: AsyncHTTPServer) -> None:
+        super().__init__()
+        self._server = server
+        self._asyncio_server: asyncio.Server | None = None
+        self._connections: set[asyncio.Task[None]] = set()
+
+    def is_running(self) -> bool:
+        return self._asyncio_server is not None
+
+    async def start_serving(self, host: str, port: int, ssl_context: SSLContext | None) -> None:
+        sock = self._bind(host, port, ssl_context)
+        try:
+            self._asyncio_server = await asyncio.start_server(self._serve_connection, sock=sock, ssl=ssl_context)
+        except BaseException:
+            sock.close()
+            raise
+
+    async def stop_serving(self) -> None:
+        assert self._asyncio_server is not None
+        asyncio_server, self._asyncio_server = self._asyncio_server, None
+        asyncio_server.close()
+        # the connections waiting for their next request are not closed by the asyncio server
+        for task in self._connections:
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await asyncio_server.wait_closed()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections.add(task)
+        try:
+            await super()._serve_connection(reader, writer)
+        finally:
+            self._connections.discard(task)
+
+    async def _respond(self, environ: WSGIEnvironment) -> _AppResult:
+        response = await self._server.application_async(Request(environ))
+        return self._call_app(response, environ)
+
+
+class AsyncHTTPServer(HTTPServer):
+    """
+    Server instance serving the requests on the running asyncio event loop.
+
+    The handlers are registered and the log and the assertions are checked in the
+    same way as for :py:class:`HTTPServer`, but the server must be started and
+    stopped from a coroutine, by :py:meth:`start_async` and :py:meth:`stop_async`
+    or by the ``async with`` statement. The functions registered by
+    ``respond_with_handler()`` can be coroutine functions, which are awaited.
+
+    As the requests are served by the event loop of the caller, the methods
+    blocking the caller (such as :py:meth:`HTTPServer.wait`) would block the
+    server as well, so they should not be used.
+
+    :param host: the host or IP where the server will listen, or ``unix://`` followed by
+        the path of a Unix domain socket
+    :param port: the TCP port where the server will listen (it is ignored for a Unix
+        domain socket)
+    :param ssl_context: the ssl context object to use for https connections
+
+    :param default_waiting_settings: the waiting settings object to use as default settings for
+        :py:meth:`wait` context manager
+
+    :param json_dumps: the JSON serializer used by the ``respond_with_json`` methods of
+        the handlers created by this server, such as :py:data:`JSON_DUMPS_COMPACT`.
+
+    :param log_settings: the :py:class:`LogSettings` limiting the size of the log.
+        By default, the log is not limited.
+    """
+
+    def __init__(
+        self,
+        host: str = HTTPServer.DEFAULT_LISTEN_HOST,
+        port: int = HTTPServer.DEFAULT_LISTEN_PORT,
+        ssl_context: SSLContext | None = None,
+        default_waiting_settings: WaitingSettings | None = None,
+        *,
+        json_dumps: JSON_DUMPS_T | None = None,
+        log_settings: LogSettings | None = None,
+    ) -> None:
+        super().__init__(
+            host, port, ssl_context, default_waiting_settings, json_dumps=json_dumps, log_settings=log_settings
+        )
+        self._loop_engine = _RunningLoopEngine(self)
+
+    def is_running(self) -> bool:
+        return self._loop_engine.is_running()
+
+    def start(self) -> None:
+        raise HTTPServerError("AsyncHTTPServer must be started by awaiting start_async()")
+
+    def stop(self) -> None:
+        raise HTTPServerError("AsyncHTTPServer must be stopped by awaiting stop_async()")
+
+    async def start_async(self) -> None:
+        """
+        Start serving the requests on the running event loop.
+
+        When this coroutine returns, the server is listening, so the clients can
+        connect to it.
+
+        If the server is already running :py:class:`HTTPServerError` will be raised.
+        """
+        if self.is_running():
+            raise HTTPServerError("Server is already running")
+
+        await self._loop_engine.start_serving(self.host, self.port, self.ssl_context)
+        self.port = self._loop_engine.port  # Update port (needed if `port` was set to 0)
+
+    async def stop_async(self) -> None:
+        """
+        Stop serving the requests, and close the connections of the clients.
+
+        Only a running server can be stopped. If the sever is not running,
+        :py:class:`HTTPServerError` will be raised.
+        """
+        if not self.is_running():
+            raise HTTPServerError("Server is not running")
+
+        await self._loop_engine.stop_serving()
+        self._remove_unix_socket()
+
+    async def __aenter__(self) -> Self:
+        if not self.is_running():
+            await self.start_async()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self.is_running():
+            await self.stop_async()
+
+    async def dispatch_async(self, request: Request) -> Response:
+        """
+        Dispatch a request to the appropriate request handler, awaiting it when it is
+        a coroutine function.
+
+        The handlers are looked up in the same way as by :py:meth:`HTTPServer.dispatch`.
+
+        :param request: the request object from the werkzeug library
+        :return: the response object what the handler responded, or a response which contains the error
+        """
+        handler = self._find_handler(request)
+        if isinstance(handler, Response):
+            return handler
+
+        with self._collect_handler_errors():
+            response = await handler.respond_async(request)
+
+        return _to_response(response)
+
+    async def application_async(self, request: Request) -> Response:
+        """
+        Entry point of the server, called for each request.
+
+        :param request: the request object
+        :return: the response object what the dispatch returned
+        """
+        request.get_data()
+        RequestCache.attach(request)
+        response = await self.dispatch_async(request)
+        self.add_log_entry(request, response)
+        return response
@@ -5,6 +5,7 @@ from typing import Any
 
 if TYPE_CHECKING:
     import sys
+    from collections.abc import Iterable
     from re import Pattern
     from types import TracebackType
 
@@ -21,6 +22,7 @@ if TYPE_CHECKING:
     from .httpserver import HTTPServer
     from .httpserver import RequestHandler
     from .httpserver import RequestMatcherKwargs
+    from .httpserver import RequestSpec
     from .httpserver import URIPattern
 
 
@@ -103,3 +105,7 @@ class BakedHTTPServer:
     ) -> RequestHandler:
         """Create and register an ordered request handler, using baked defaults."""
         return self._server.expect_ordered_request(uri, **self._merge_kwargs(kwargs))
+
+    def expect_requests(self, specs: Iterable[RequestSpec]) -> list[RequestHandler]:
+        """Create and register request handlers in a batch, using baked defaults."""
+        return self._server.expect_requests(self._defaults | spec for spec in specs)  # type: ignore[misc]
@@ -14,6 +14,7 @@ from pytest_httpserver.httpserver import RequestHandlerBase
 from pytest_httpserver.httpserver import URIPattern
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
     from collections.abc import Mapping
     from re import Pattern
     from ssl import SSLContext
@@ -21,6 +22,10 @@ if TYPE_CHECKING:
     from werkzeug import Request
     from werkzeug import Response
 
+    from pytest_httpserver.engines import ServerEngine
+    from pytest_httpserver.httpserver import KeepAliveSettings
+    from pytest_httpserver.httpserver import LogSettings
+
 
 class BlockingRequestHandler(RequestHandlerBase):
     """
@@ -29,12 +34,16 @@ class BlockingRequestHandler(RequestHandlerBase):
     This class should only be instantiated inside the implementation of the :py:class:`BlockingHTTPServer`.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, request: Request | None = None) -> None:
+        self.request = request
         self.response_queue: Queue[Response] = Queue()
 
     def respond_with_response(self, response: Response) -> None:
         self.response_queue.put_nowait(response)
 
+    def _respond_with_factory(self, factory: Callable[[Request | None], Response]) -> None:
+        self.respond_with_response(factory(self.request))
+
 
 class BlockingHTTPServer(HTTPServerBase):
     """
@@ -47,6 +56,15 @@ class BlockingHTTPServer(HTTPServerBase):
     :param timeout: waiting time in seconds for matching and responding to an incoming request.
         manager
 
+    :param engine: the :py:class:`ServerEngine` serving the requests. By default, the
+        werkzeug development server is used.
+
+    :param keep_alive: the :py:class:`KeepAliveSettings` of the persistent connections.
+        By default, the connections are closed after each response.
+
+    :param log_settings: the :py:class:`LogSettings` limiting the size of the log.
+        By default, the log is not limited.
+
     .. py:attribute:: no_handler_status_code
 
         Attribute containing the http status code (int) which will be the response
@@ -63,8 +81,12 @@ class BlockingHTTPServer(HTTPServerBase):
         port: int = DEFAULT_LISTEN_PORT,
         ssl_context: SSLContext | None = None,
         timeout: int = 30,
+        *,
+        engine: ServerEngine | None = None,
+        keep_alive: KeepAliveSettings | None = None,
+        log_settings: LogSettings | None = None,
     ) -> None:
-        super().__init__(host, port, ssl_context)
+        super().__init__(host, port, ssl_context, engine=engine, keep_alive=keep_alive, log_settings=log_settings)
         self.timeout = timeout
         self.request_queue: Queue[Request] = Queue()
         self.request_handlers: dict[Request, Queue[BlockingRequestHandler]] = {}
@@ -133,7 +155,7 @@ class BlockingHTTPServer(HTTPServerBase):
 
         diff = matcher.difference(request)
 
-        request_handler = BlockingRequestHandler()
+        request_handler = BlockingRequestHandler(request)
 
         self.request_handlers[request].put_nowait(request_handler)
 
@@ -0,0 +1,485 @@
+"""
+Server engines serving the WSGI application of the servers.
+
+By default the servers use the werkzeug development server, which handles the
+connections one by one (or in a new thread for each request when ``threaded`` is
+set). An engine can be passed to the server to serve the requests in a different
+way.
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import io
+import logging
+import os
+import socket
+import sys
+import threading
+import urllib.parse
+from contextlib import suppress
+from typing import TYPE_CHECKING
+
+from werkzeug.exceptions import BadRequest
+from werkzeug.exceptions import InternalServerError
+from werkzeug.http import http_date
+from werkzeug.serving import get_sockaddr
+from werkzeug.serving import select_address_family
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from ssl import SSLContext
+    from types import TracebackType
+
+    from _typeshed.wsgi import WSGIApplication
+    from _typeshed.wsgi import WSGIEnvironment
+
+__all__ = ["AsyncioEngine", "ServerEngine"]
+
+_logger = logging.getLogger(__name__)
+
+_NO_BODY_STATUSES = frozenset({"204", "304"})
+
+# status, headers, the iterable of the body, and the chunks of the body already produced
+_AppResult = tuple[str, list[tuple[str, str]], "Iterable[bytes]", list[bytes]]
+
+
+class ServerEngine(abc.ABC):
+    """
+    Abstract server engine.
+
+    An engine binds the listening socket, serves the WSGI application in a
+    background thread, and stops serving when requested. The same engine object
+    can be started again after it has been stopped.
+
+    .. py:attribute:: port
+
+        The TCP port where the engine listens. It is set by :py:meth:`start`, which
+        is needed when the engine has been started with port *0*.
+    """
+
+    port: int = 0
+
+    @abc.abstractmethod
+    def start(self, host: str, port: int, app: WSGIApplication, ssl_context: SSLContext | None) -> None:
+        """
+        Start serving the application in a background thread.
+
+        This method must return when the listening socket is bound, so the clients
+        can connect to the engine right after this method returns.
+
+        :param host: the host or IP where the engine will listen
+        :param port: the TCP port where the engine will listen, *0* for an ephemeral port
+        :param app: the WSGI application to serve
+        :param ssl_context: the ssl context object to use for https connections
+        """
+
+    @abc.abstractmethod
+    def stop(self) -> None:
+        """
+        Stop serving and wait for the background thread to terminate.
+        """
+
+    @abc.abstractmethod
+    def is_running(self) -> bool:
+        """
+        Returns `True` when the engine is running, otherwise `False`.
+        """
+
+
+class _BadRequestError(Exception):
+    pass
+
+
+class AsyncioEngine(ServerEngine):
+    """
+    Server engine running an asyncio event loop in a background thread.
+
+    The engine parses HTTP/1.1 itself and keeps the connections alive between
+    requests, so the clients reusing their connections are not paying for a new
+    connection for each request. Pipelined requests are served in order.
+
+    The WSGI application is called synchronously in the thread of the event loop,
+    so the requests are dispatched one by one, like the default non-threaded server
+    does. The responses are streamed to the client, using chunked transfer encoding
+    when the application does not specify the length of the response.
+
+    :param backlog: the maximum number of pending connections of the listening socket
+    """
+
+    def __init__(self, *, backlog: int = socket.SOMAXCONN) -> None:
+        self.backlog = backlog
+        self.port = 0
+        self._host = ""
+        self._app: WSGIApplication | None = None
+        self._url_scheme = "http"
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._startup_error: BaseException | None = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} port={self.port} running={self.is_running()}>"
+
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, host: str, port: int, app: WSGIApplication, ssl_context: SSLContext | None) -> None:
+        sock = self._bind(host, port, ssl_context)
+        self._app = app
+        self._loop = asyncio.new_event_loop()
+        self._startup_error = None
+
+        started = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(sock, ssl_context, started), daemon=True)
+        self._thread.start()
+        started.wait()
+
+        if self._startup_error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._startup_error
+
+    def _bind(self, host: str, port: int, ssl_context: SSLContext | None) -> socket.socket:
+        family = select_address_family(host, port)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        address = get_sockaddr(host, port, family)
+        try:
+            if isinstance(address, str):
+                # remove the socket file left behind by a previous server, like werkzeug does
+                with suppress(FileNotFoundError):
+                    os.unlink(address)
+            else:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(address)
+            sock.listen(self.backlog)
+            sock.setblocking(False)
+        except BaseException:
+            sock.close()
+            raise
+
+        self.port = 0 if isinstance(address, str) else sock.getsockname()[1]
+        self._host = host
+        self._url_scheme = "https" if ssl_context is not None else "http"
+        return sock
+
+    def stop(self) -> None:
+        assert self._loop is not None
+        assert self._thread is not None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+        self._loop = None
+
+    def _run(self, sock: socket.socket, ssl_context: SSLContext | None, started: threading.Event) -> None:
+        loop = self._loop
+        assert loop is not None
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(asyncio.start_server(self._serve_connection, sock=sock, ssl=ssl_context))
+        except BaseException as err:  # noqa: BLE001
+            sock.close()
+            loop.close()
+            self._startup_error = err
+            started.set()
+            return
+
+        started.set()
+        try:
+            loop.run_forever()
+        finally:
+            server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peername = writer.get_extra_info("peername") or ("", 0)
+        sock = writer.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            # the response head and body are written separately, avoid waiting for delayed acks
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                try:
+                    environ = await self._read_request(reader, writer, peername)
+                except (_BadRequestError, ValueError):
+                    await self._write_error(writer, BadRequest())
+                    break
+                if environ is None:
+                    break
+                if not await self._write_response(writer, environ):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # the engine is stopping, finish the task normally so it is not reported
+            pass
+        except Exception:
+            _logger.exception("Error while serving connection from %s", peername[0])
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _read_request(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        peername: tuple[str, int],
+    ) -> WSGIEnvironment | None:
+        request_line = await reader.readline()
+        while request_line in (b"\r\n", b"\n"):
+            request_line = await reader.readline()
+        if not request_line:
+            return None
+
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise _BadRequestError from None
+        if not version.startswith("HTTP/1."):
+            raise _BadRequestError
+
+        environ: WSGIEnvironment = {
+            "REQUEST_METHOD": method,
+            "SCRIPT_NAME": "",
+            "SERVER_NAME": self._host,
+            "SERVER_PORT": str(self.port),
+            "SERVER_PROTOCOL": version,
+            "REQUEST_URI": target,
+            "RAW_URI": target,
+            "REMOTE_ADDR": peername[0],
+            "REMOTE_PORT": peername[1],
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": self._url_scheme,
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": False,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+            "wsgi.input_terminated": True,
+        }
+
+        if "://" in target and not target.startswith("/"):
+            url = urllib.parse.urlsplit(target)
+            path, query = url.path, url.query
+        else:
+            path, _, query = target.partition("?")
+        environ["PATH_INFO"] = urllib.parse.unquote_to_bytes(path).decode("latin-1")
+        environ["QUERY_STRING"] = query
+
+        key = ""
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n"):
+                break
+            if not line:
+                raise asyncio.IncompleteReadError(b"", None)
+            if line[:1] in (b" ", b"\t"):
+                # obsolete line folding
+                if key:
+                    environ[key] += " " + line.decode("latin-1").strip()
+                continue
+
+            name, sep, value = line.decode("latin-1").partition(":")
+            if not sep or not name or name != name.strip():
+                raise _BadRequestError
+            if "_" in name:
+                key = ""
+                continue
+            key = name.upper().replace("-", "_")
+            if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                key = f"HTTP_{key}"
+            value = value.strip()
+            if key in environ:
+                value = f"{environ[key]},{value}"
+            environ[key] = value
+
+        transfer_encoding = environ.pop("HTTP_TRANSFER_ENCODING", "").lower()
+        content_length = environ.get("CONTENT_LENGTH", "")
+        if transfer_encoding:
+            if transfer_encoding.rsplit(",", 1)[-1].strip() != "chunked":
+                raise _BadRequestError
+            self._send_continue(writer, environ)
+            body = await self._read_chunked(reader)
+        elif content_length:
+            length = int(content_length)
+            if length < 0:
+                raise _BadRequestError
+            if length:
+                self._send_continue(writer, environ)
+            body = await reader.readexactly(length)
+        else:
+            body = b""
+
+        environ["CONTENT_LENGTH"] = str(len(body))
+        environ["wsgi.input"] = io.BytesIO(body)
+        return environ
+
+    @staticmethod
+    def _send_continue(writer: asyncio.StreamWriter, environ: WSGIEnvironment) -> None:
+        if environ["SERVER_PROTOCOL"] != "HTTP/1.0" and environ.get("HTTP_EXPECT", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks: list[bytes] = []
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                break
+            chunks.append(await reader.readexactly(size))
+            if (await reader.readline()).strip():
+                raise _BadRequestError
+
+        # skip the trailer fields
+        while (await reader.readline()).strip():
+            pass
+
+        return b"".join(chunks)
+
+    async def _respond(self, environ: WSGIEnvironment) -> _AppResult:
+        """
+        Call the application for the request, which can be overridden to call it asynchronously.
+        """
+        assert self._app is not None
+        return self._call_app(self._app, environ)
+
+    @staticmethod
+    def _call_app(app: WSGIApplication, environ: WSGIEnvironment) -> _AppResult:
+        response_start: list[tuple[str, list[tuple[str, str]]]] = []
+        written: list[bytes] = []
+
+        def start_response(
+            status: str,
+            headers: list[tuple[str, str]],
+            exc_info: tuple[type[BaseException], BaseException, TracebackType] | tuple[None, None, None] | None = None,
+        ):
+            if exc_info and exc_info[1] is not None and written:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response_start[:] = [(status, headers)]
+            return written.append
+
+        app_iter = app(environ, start_response)
+
+        # the application may call start_response only when its first chunk is requested
+        head: list[bytes] = []
+        try:
+            for chunk in app_iter:
+                if chunk:
+                    head.append(chunk)
+                    break
+        except BaseException:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+            raise
+
+        status, headers = response_start[0]
+        return status, headers, app_iter, written + head
+
+    async def _write_response(self, writer: asyncio.StreamWriter, environ: WSGIEnvironment) -> bool:
+        """
+        Write the response of the application and return whether the connection can be kept alive.
+        """
+        try:
+            status, headers, app_iter, head = await self._respond(environ)
+        except Exception:
+            _logger.exception("Error on request %s %s", environ["REQUEST_METHOD"], environ["REQUEST_URI"])
+            await self._write_error(writer, InternalServerError())
+            return False
+
+        try:
+            connection = environ.get("HTTP_CONNECTION", "").lower()
+            if environ["SERVER_PROTOCOL"] == "HTTP/1.0":
+                keep_alive = "keep-alive" in connection
+                can_chunk = False
+            else:
+                keep_alive = "close" not in connection
+                can_chunk = True
+
+            has_date = False
+            content_length: str | None = None
+            lines = [f"HTTP/1.1 {status}\r\n"]
+            for name, value in headers:
+                lower_name = name.lower()
+                if lower_name == "content-length":
+                    content_length = value
+                elif lower_name == "connection":
+                    keep_alive = keep_alive and value.lower() != "close"
+                    continue
+                elif lower_name == "date":
+                    has_date = True
+                lines.append(f"{name}: {value}\r\n")
+
+            if not has_date:
+                lines.append(f"Date: {http_date()}\r\n")
+
+            has_body = environ["REQUEST_METHOD"] != "HEAD" and status[:3] not in _NO_BODY_STATUSES
+            chunked = has_body and content_length is None and can_chunk
+            if chunked:
+                lines.append("Transfer-Encoding: chunked\r\n")
+            elif has_body and content_length is None:
+                keep_alive = False
+
+            if not keep_alive:
+                lines.append("Connection: close\r\n")
+            elif environ["SERVER_PROTOCOL"] == "HTTP/1.0":
+                lines.append("Connection: keep-alive\r\n")
+            lines.append("\r\n")
+            response_head = "".join(lines).encode("latin-1")
+
+            if has_body:
+                await self._write_body(writer, response_head, head, app_iter, chunked=chunked)
+            else:
+                writer.write(response_head)
+            await writer.drain()
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+        return keep_alive
+
+    @staticmethod
+    async def _write_body(
+        writer: asyncio.StreamWriter,
+        response_head: bytes,
+        head: list[bytes],
+        app_iter: Iterable[bytes],
+        *,
+        chunked: bool,
+    ) -> None:
+        # the response head is sent together with the first chunk of the body
+        pending = response_head
+        for chunks in (head, app_iter):
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if chunked:
+                    chunk = b"%x\r\n%b\r\n" % (len(chunk), chunk)  # noqa: PLW2901
+                writer.write(pending + chunk if pending else chunk)
+                pending = b""
+                await writer.drain()
+
+        if chunked:
+            pending += b"0\r\n\r\n"
+        if pending:
+            writer.write(pending)
+
+    async def _write_error(self, writer: asyncio.StreamWriter, error: BadRequest | InternalServerError) -> None:
+        body = error.get_body()
+        writer.write(
+            (
+                f"HTTP/1.1 {error.code} {error.name}\r\n"
+                f"Content-Type: text/html; charset=utf-8\r\n"
+                f"Content-Length: {len(body.encode())}\r\n"
+                "Connection: close\r\n"
+                "\r\n"
+                f"{body}"
+            ).encode()
+        )
+        await writer.drain()
@@ -5,6 +5,8 @@ Hooks for pytest-httpserver
 import os
 import time
 from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
 
 from werkzeug import Request
 from werkzeug import Response
@@ -89,15 +91,33 @@ class Garbage:
         """
         return os.urandom(size)
 
+    @staticmethod
+    def _iter_with_garbage(prefix: bytes, body: Iterable[bytes], suffix: bytes) -> Iterator[bytes]:
+        """
+        Yields the prefix, the chunks of the body, then the suffix.
+        """
+        if prefix:
+            yield prefix
+        yield from body
+        if suffix:
+            yield suffix
+
     def __call__(self, _request: Request, response: Response) -> Response:
         """
         Adds random bytes to the beginning or to the end of the response data.
 
-        New random bytes will be generated for every call.
+        New random bytes will be generated for every call. Streamed responses
+        are not buffered, the random bytes are sent before and after the chunks
+        of the body.
 
         Returns the modified response object.
         """
         prefix = self._get_garbage_bytes(self._prefix_size)
         suffix = self._get_garbage_bytes(self._suffix_size)
-        response.set_data(prefix + response.get_data() + suffix)
+        if response.is_streamed:
+            response.response = self._iter_with_garbage(prefix, response.iter_encoded(), suffix)
+            if response.content_length is not None:
+                response.content_length += len(prefix) + len(suffix)
+        else:
+            response.set_data(prefix + response.get_data() + suffix)
         return response
@@ -1,37 +1,77 @@
 from __future__ import annotations
 
 import abc
+import gzip
+import heapq
+import inspect
+import io
 import ipaddress
 import json
+import mimetypes
+import mmap
+import operator
+import os
 import queue
 import re
+import secrets
+import selectors
+import socket
+import ssl
 import threading
 import time
 import urllib.parse
-import urllib.request
+import warnings
+import weakref
+import zlib
+from collections import OrderedDict
 from collections import defaultdict
+from collections import deque
 from collections.abc import Callable
 from collections.abc import Generator
 from collections.abc import Iterable
+from collections.abc import Iterator
 from collections.abc import Mapping
 from collections.abc import MutableMapping
+from collections.abc import MutableSequence
+from collections.abc import Sequence
 from contextlib import contextmanager
 from contextlib import suppress
 from copy import copy
+from datetime import datetime
+from datetime import timezone
 from enum import Enum
+from functools import partial
 from http import HTTPStatus
+from operator import itemgetter
+from pathlib import Path
 from re import Pattern
+from types import MappingProxyType
+from typing import IO
+from typing import NamedTuple
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import ClassVar
+from typing import SupportsIndex
+from typing import TypeGuard
 from typing import TypedDict
+from typing import TypeVar
+from typing import overload
 
 import werkzeug.http
 from werkzeug import Request
 from werkzeug import Response
 from werkzeug.datastructures import Authorization
+from werkzeug.datastructures import Headers
+from werkzeug.datastructures import ImmutableMultiDict
 from werkzeug.datastructures import MultiDict
-from werkzeug.serving import make_server
+from werkzeug.exceptions import InternalServerError
+from werkzeug.serving import BaseWSGIServer
+from werkzeug.serving import ThreadedWSGIServer
+from werkzeug.serving import WSGIRequestHandler
+from werkzeug.wsgi import ClosingIterator
+from werkzeug.wsgi import FileWrapper
+from werkzeug.wsgi import LimitedStream
+from werkzeug.wsgi import get_content_length
 
 from .bake import BakedHTTPServer
 
@@ -40,7 +80,12 @@ if TYPE_CHECKING:
     from ssl import SSLContext
     from types import TracebackType
 
-    from werkzeug.serving import BaseWSGIServer
+    from _typeshed.wsgi import WSGIEnvironment
+    from _typeshed.wsgi import WSGIApplication
+    from werkzeug.datastructures import Range
+
+    from .engines import ServerEngine
+    from .multiprocess import WorkerProcesses
 
     if sys.version_info >= (3, 11):
         from typing import Self
@@ -55,15 +100,64 @@ if TYPE_CHECKING:
 URI_DEFAULT = ""
 METHOD_ALL = "__ALL"
 
+_T = TypeVar("_T")
+
 HEADERS_T = Mapping[str, str | Iterable[str]] | Iterable[tuple[str, str]]
 
 HVMATCHER_T = Callable[[str, str | None, str], bool]
 
+JSON_DUMPS_T = Callable[[Any], str | bytes]
+
+#: JSON serializer producing indented output, the default of ``respond_with_json()``
+JSON_DUMPS_INDENTED: JSON_DUMPS_T = partial(json.dumps, indent=4)
+
+#: JSON serializer producing the most compact output, without any whitespace
+JSON_DUMPS_COMPACT: JSON_DUMPS_T = partial(json.dumps, separators=(",", ":"))
+
+STREAM_SOURCE_T = Iterable[bytes | str] | IO[bytes]
+STREAM_BODY_T = STREAM_SOURCE_T | Callable[[], STREAM_SOURCE_T]
+
+#: the default size of the chunks sent by ``respond_with_stream()``
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+
+UNIX_SOCKET_PREFIX = "unix://"
+UNIX_SOCKET_URL_HOST = "localhost"
+
+# compressors of the content encodings supported by static responses, in the
+# order of preference
+_COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {}
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:
+    pass
+else:
+    _COMPRESSORS["br"] = brotli.compress
+
+try:
+    from compression import zstd  # type: ignore[import-not-found]
+except ImportError:
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError:
+        pass
+    else:
+        _COMPRESSORS["zstd"] = zstandard.compress
+else:
+    _COMPRESSORS["zstd"] = zstd.compress
+
+_COMPRESSORS["gzip"] = partial(gzip.compress, mtime=0)
+_COMPRESSORS["deflate"] = zlib.compress
+
 
 class Undefined:
     def __repr__(self) -> str:
         return "<UNDEFINED>"
 
+    def __reduce__(self) -> str:
+        # unpickled as the module-level singleton
+        return "UNDEFINED"
+
 
 UNDEFINED = Undefined()
 
@@ -171,12 +265,143 @@ class HeaderValueMatcher:
         return matcher(actual, expected)
 
 
+def _default_header_value_matcher_factory() -> Callable[[str | None, str], bool]:
+    return HeaderValueMatcher.default_header_value_matcher
+
+
+# the factory is a named function, so the matchers can be pickled
 HeaderValueMatcher.DEFAULT_MATCHERS = defaultdict(
-    lambda: HeaderValueMatcher.default_header_value_matcher,
+    _default_header_value_matcher_factory,
     {"Authorization": HeaderValueMatcher.authorization_header_value_matcher},
 )
 
 
+def _header_key(name: str) -> str:
+    return name.lower().replace("_", "-")
+
+
+class RequestCache:
+    """
+    Per-request memo of the values parsed from the request.
+
+    Matchers are evaluated for many handlers for the same request, and the request
+    is matched again when the log is queried. To avoid parsing the same request
+    again and again, the parsed values are stored in this object, which is
+    attached to the environ of the request. Each value is computed at most once,
+    when it is first needed.
+
+    Use :py:meth:`of` to get the cache of a request.
+    """
+
+    ENVIRON_KEY = "pytest_httpserver.request_cache"
+
+    def __init__(self, request: Request) -> None:
+        self._request = request
+        self._json: dict[str, Any] = {}
+        self._query: MultiDict[str, str] | None = None
+        self._query_dict: dict[str, str] | None = None
+        self._headers: dict[str, str] | None = None
+        self._path_params: dict[PathTemplate, dict[str, Any] | None] = {}
+
+    @classmethod
+    def attach(cls, request: Request) -> RequestCache:
+        """
+        Creates a new cache for the request and attaches it to the request.
+
+        :param request: the HTTP request
+        :return: the newly created cache
+        """
+        cache = cls(request)
+        request.environ[cls.ENVIRON_KEY] = cache
+        return cache
+
+    @classmethod
+    def of(cls, request: Request) -> RequestCache:
+        """
+        Returns the cache attached to the request, creating one if it has no cache yet.
+
+        :param request: the HTTP request
+        """
+        cache = request.environ.get(cls.ENVIRON_KEY)
+        if cache is None:
+            cache = cls.attach(request)
+        return cache
+
+    def get_json(self, encoding: str) -> Any:
+        """
+        Returns the request body loaded as json.
+
+        :param encoding: the encoding used to decode the body before loading it
+        :return: the loaded object, or ``UNDEFINED`` if the body is not a valid json
+            or it cannot be decoded with the encoding specified.
+        """
+        try:
+            return self._json[encoding]
+        except KeyError:
+            pass
+
+        try:
+            # do the decoding here as python 3.5 requires string and does not
+            # accept bytes
+            value = json.loads(self._request.get_data().decode(encoding))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            value = UNDEFINED
+
+        self._json[encoding] = value
+        return value
+
+    def get_query(self) -> MultiDict[str, str]:
+        """
+        Returns the query string of the request parsed to a MultiDict.
+
+        The returned object is shared, so it must not be modified.
+        """
+        if self._query is None:
+            self._query = MultiDict(urllib.parse.parse_qsl(self._request.query_string.decode("utf-8")))
+        return self._query
+
+    def get_query_dict(self) -> dict[str, str]:
+        """
+        Returns the query string of the request parsed to a dict, where the first
+        value is kept when multiple values are specified for a key.
+
+        The returned object is shared, so it must not be modified.
+        """
+        if self._query_dict is None:
+            self._query_dict = self.get_query().to_dict()
+        return self._query_dict
+
+    def get_header(self, name: str) -> str | None:
+        """
+        Returns the value of the header, or `None` if there's no such header in the request.
+
+        :param name: name of the header, case insensitive, and ``_`` is equivalent to
+            ``-`` (as in werkzeug, which stores the headers in the environ)
+        """
+        if self._headers is None:
+            headers: dict[str, str] = {}
+            for key, value in self._request.headers.items():
+                headers.setdefault(_header_key(key), value)
+            self._headers = headers
+        return self._headers.get(_header_key(name))
+
+    def get_path_params(self, template: PathTemplate) -> dict[str, Any] | None:
+        """
+        Returns the values captured by the path template from the path of the request.
+
+        :param template: the path template
+        :return: the captured values, or `None` if the path does not match the template.
+            The returned object is shared, so it must not be modified.
+        """
+        try:
+            return self._path_params[template]
+        except KeyError:
+            pass
+
+        value = self._path_params[template] = template.parse(self._request.path)
+        return value
+
+
 class QueryMatcher(abc.ABC):
     """
     Abstract class for QueryMatchers
@@ -189,6 +414,25 @@ class QueryMatcher(abc.ABC):
         values = self.get_comparing_values(request_query_string)
         return bool(values[0] == values[1])
 
+    def match_request(self, request: Request) -> bool:
+        """
+        Matches the query string of the request.
+
+        Subclasses may override this method to use the values already parsed in the
+        :py:class:`RequestCache` of the request.
+
+        :param request: the HTTP request
+        """
+        return self.match(request.query_string)
+
+    def compile(self) -> None:  # noqa: B027
+        """
+        Prepares the expected values for the comparison.
+
+        This is called when the :py:class:`RequestMatcher` owning this object is
+        compiled, so the values do not need to be normalized for each request.
+        """
+
     @abc.abstractmethod
     def get_comparing_values(self, request_query_string: bytes) -> tuple[Any, Any]:
         pass
@@ -210,18 +454,33 @@ class StringQueryMatcher(QueryMatcher):
             raise TypeError("query_string must be a string, or a bytes-like object")
 
         self.query_string = query_string
+        self._expected: bytes | None = None
 
-    def get_comparing_values(self, request_query_string: bytes) -> tuple[bytes, bytes]:
+    def compile(self) -> None:
+        self._expected = self._encode_query_string()
+
+    def _encode_query_string(self) -> bytes:
         if not isinstance(self.query_string, (str, bytes)):
             raise TypeError("query_string must be a string, or a bytes-like object")
 
         if isinstance(self.query_string, str):
-            query_string = self.query_string.encode()
+            return self.query_string.encode()
         else:
-            query_string = self.query_string
+            return self.query_string
+
+    def get_comparing_values(self, request_query_string: bytes) -> tuple[bytes, bytes]:
+        query_string = self._expected
+        if query_string is None:
+            query_string = self._encode_query_string()
 
         return (request_query_string, query_string)
 
+    def match_request(self, request: Request) -> bool:
+        if self._expected is None or type(self).get_comparing_values is not StringQueryMatcher.get_comparing_values:
+            return super().match_request(request)
+
+        return request.query_string == self._expected
+
 
 class MappingQueryMatcher(QueryMatcher):
     """
@@ -237,13 +496,44 @@ class MappingQueryMatcher(QueryMatcher):
             represents multiple values for one key.
         """
         self.query_dict = query_dict
+        self._expected: Mapping[str, str] | None = None
+
+    def compile(self) -> None:
+        if isinstance(self.query_dict, MultiDict):
+            self._expected = ImmutableMultiDict(self.query_dict)
+        else:
+            self._expected = MappingProxyType(dict(self.query_dict))
+
+    def __getstate__(self) -> dict[str, Any]:
+        # the compiled mapping can't be pickled, it is re-created by compile()
+        state = self.__dict__.copy()
+        state["_expected"] = None
+        return state
+
+    def _get_expected(self) -> Mapping[str, str]:
+        if self._expected is not None:
+            return self._expected
+        if isinstance(self.query_dict, MultiDict):
+            return self.query_dict
+        else:
+            return dict(self.query_dict)
 
     def get_comparing_values(self, request_query_string: bytes) -> tuple[Mapping[str, str], Mapping[str, str]]:
         query = MultiDict(urllib.parse.parse_qsl(request_query_string.decode("utf-8")))
         if isinstance(self.query_dict, MultiDict):
-            return (query, self.query_dict)
+            return (query, self._get_expected())
+        else:
+            return (query.to_dict(), self._get_expected())
+
+    def match_request(self, request: Request) -> bool:
+        if type(self).get_comparing_values is not MappingQueryMatcher.get_comparing_values:
+            return super().match_request(request)
+
+        cache = RequestCache.of(request)
+        if isinstance(self.query_dict, MultiDict):
+            return bool(cache.get_query() == self._get_expected())
         else:
-            return (query.to_dict(), dict(self.query_dict))
+            return cache.get_query_dict() == self._get_expected()
 
 
 class BooleanQueryMatcher(QueryMatcher):
@@ -264,6 +554,12 @@ class BooleanQueryMatcher(QueryMatcher):
         else:
             return (True, False)
 
+    def match_request(self, request: Request) -> bool:
+        if type(self).get_comparing_values is not BooleanQueryMatcher.get_comparing_values:
+            return super().match_request(request)
+
+        return self.result
+
 
 def _create_query_matcher(query_string: QueryMatcher | str | bytes | Mapping[str, str] | None) -> QueryMatcher:
     if isinstance(query_string, QueryMatcher):
@@ -293,6 +589,117 @@ class URIPattern(abc.ABC):
         """
 
 
+_PLACEHOLDER_RE = re.compile(r"\{(?P<name>[A-Za-z_]\w*)(?::(?P<converter>\w+))?\}")
+
+
+class PathTemplate(URIPattern):
+    """
+    URI pattern matching a path template such as ``/users/{user_id}/orders/{order_id:int}``.
+
+    Each placeholder must be a whole path segment, in the form of ``{name}`` or
+    ``{name:converter}``. The following converters are available:
+
+    * ``str``: a non-empty segment without slash (this is the default)
+    * ``int``: a segment of digits, converted to int
+    * ``path``: the rest of the path, including slashes. It can be used in the
+      last segment only.
+
+    The values captured by the placeholders are passed to the function registered
+    with :py:meth:`RequestHandler.respond_with_handler` as keyword arguments.
+
+    Handlers registered with a path template are indexed by the segments of the
+    template, so the number of templates registered does not affect the time of
+    the dispatching.
+
+    :param template: the path template, it must start with ``/``.
+    :raises ValueError: when the template is invalid
+    """
+
+    CONVERTERS: ClassVar[dict[str, tuple[str, Callable[[str], Any]]]] = {
+        "str": (r"[^/]+", str),
+        "int": (r"\d+", int),
+        "path": (r".+", str),
+    }
+
+    def __init__(self, template: str) -> None:
+        if not template.startswith("/"):
+            raise ValueError("Path template must start with '/': {!r}".format(template))
+
+        self.template = template
+        self.segments: tuple[tuple[str, str | None], ...] = self._parse_template(template)
+        self.converters = {
+            name: self.CONVERTERS[converter][1] for name, converter in self.segments if converter is not None
+        }
+
+        regex_parts = []
+        for value, converter in self.segments:
+            if converter is None:
+                regex_parts.append(re.escape(value))
+            else:
+                regex_parts.append("(?P<{}>{})".format(value, self.CONVERTERS[converter][0]))
+        self._regex = re.compile("/".join(regex_parts) + r"\Z")
+
+    @classmethod
+    def _parse_template(cls, template: str) -> tuple[tuple[str, str | None], ...]:
+        segments: list[tuple[str, str | None]] = []
+        parts = template.split("/")
+        for idx, part in enumerate(parts):
+            if "{" not in part and "}" not in part:
+                segments.append((part, None))
+                continue
+
+            m = _PLACEHOLDER_RE.fullmatch(part)
+            if m is None:
+                raise ValueError("Placeholder must be a whole path segment: {!r}".format(template))
+
+            name = m.group("name")
+            converter = m.group("converter") or "str"
+            if converter not in cls.CONVERTERS:
+                raise ValueError("Unknown converter {!r} in path template: {!r}".format(converter, template))
+            if converter == "path" and idx != len(parts) - 1:
+                raise ValueError("The path converter can be used in the last segment only: {!r}".format(template))
+            if any(name == other for other, other_converter in segments if other_converter is not None):
+                raise ValueError("Duplicate placeholder {!r} in path template: {!r}".format(name, template))
+
+            segments.append((name, converter))
+
+        return tuple(segments)
+
+    def parse(self, uri: str) -> dict[str, Any] | None:
+        """
+        Matches the URI and returns the values captured by the placeholders.
+
+        :param uri: URI of the request
+        :return: a dict of the captured values converted by their converter, or
+            `None` if the URI does not match the template
+        """
+        m = self._regex.match(uri)
+        if m is None:
+            return None
+        return {name: self.converters[name](value) for name, value in m.groupdict().items()}
+
+    def match(self, uri: str) -> bool:
+        return self._regex.match(uri) is not None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PathTemplate):
+            return NotImplemented
+        return self.template == other.template
+
+    def __hash__(self) -> int:
+        return hash(self.template)
+
+    def __repr__(self) -> str:
+        return "{}({!r})".format(self.__class__.__name__, self.template)
+
+
+def _is_path_template(uri: object) -> TypeGuard[PathTemplate]:
+    """
+    Returns True if the URI is a :py:class:`PathTemplate` with the standard matching.
+    """
+    return isinstance(uri, PathTemplate) and type(uri).match is PathTemplate.match
+
+
 class RequestMatcherKwargs(TypedDict, total=False):
     """Keyword arguments common to ``expect_request()`` and related methods."""
 
@@ -369,6 +776,40 @@ class RequestMatcher:
         if header_value_matcher is not None:
             self.header_value_matcher = header_value_matcher
 
+        # the dispatch indexes containing a handler of this matcher
+        self._indexes: weakref.WeakSet[_HandlerIndex] = weakref.WeakSet()
+        self._checks: tuple[Callable[[Request], bool], ...] | None = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        # once constructed, setting an attribute discards the compiled checks and the
+        # index entries of the handlers, so they are re-created from the new values
+        if not name.startswith("_") and "_checks" in self.__dict__:
+            if name == "query_string":
+                super().__setattr__("query_matcher", _create_query_matcher(value))
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._checks = None
+        for index in list(self.__dict__.get("_indexes", ())):
+            index.stale = True
+
+    def _add_index(self, index: _HandlerIndex) -> None:
+        if "_indexes" not in self.__dict__:
+            self._indexes = weakref.WeakSet()
+        self._indexes.add(index)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # the compiled checks are closures, they are re-created by compile() when needed
+        state = self.__dict__.copy()
+        state["_checks"] = None
+        state.pop("_indexes", None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._indexes = weakref.WeakSet()
+
     def __repr__(self) -> str:
         """
         Returns the string representation of the object, with the known parameters.
@@ -400,10 +841,7 @@ class RequestMatcher:
         if isinstance(self.uri, URIPattern):
             return self.uri.match(path)
 
-        # this is python version depending
-        # in python 3.7 and above: it is re.Pattern
-        # below python 3.7 it is _sre.SRE_Pattern which cannot be accessed directly
-        elif isinstance(self.uri, re.compile("").__class__):
+        elif isinstance(self.uri, Pattern):
             return bool(self.uri.match(path))
 
         else:
@@ -428,13 +866,8 @@ class RequestMatcher:
         if self.json is UNDEFINED:
             return True
 
-        try:
-            # do the decoding here as python 3.5 requires string and does not
-            # accept bytes
-            json_received = json.loads(request.data.decode(self.data_encoding))
-        except json.JSONDecodeError:
-            return False
-        except UnicodeDecodeError:
+        json_received = RequestCache.of(request).get_json(self.data_encoding)
+        if json_received is UNDEFINED:
             return False
 
         return bool(json_received == self.json)
@@ -449,6 +882,9 @@ class RequestMatcher:
 
         If zero-length list is returned, this means that there's no difference, so the request
         matches the fields set in the matcher object.
+
+        All the fields are evaluated, so this method is intended for diagnostics. Use
+        :py:meth:`match` to decide whether the request matches or not.
         """
 
         retval: list[tuple[str, Any, Any]] = []
@@ -459,14 +895,16 @@ class RequestMatcher:
         if self.method not in (METHOD_ALL, request.method):
             retval.append(("method", request.method, self.method))
 
-        if not self.query_matcher.match(request.query_string):
+        if not self.query_matcher.match_request(request):
             retval.append(("query_string", request.query_string, self.query_string))
 
+        cache = RequestCache.of(request)
         request_headers: dict[str, str | None] = {}
         expected_headers: dict[str, str] = {}
         for key, value in self.headers.items():
-            if not self.header_value_matcher(key, request.headers.get(key), value):
-                request_headers[key] = request.headers.get(key)
+            actual = cache.get_header(key)
+            if not self.header_value_matcher(key, actual, value):
+                request_headers[key] = actual
                 expected_headers[key] = value
 
         if request_headers and expected_headers:
@@ -479,171 +917,2426 @@ class RequestMatcher:
             retval.append(("json", request.data, self.json))
         return retval
 
-    def match(self, request: Request) -> bool:
-        """
-        Returns whether the request matches the parameters set in the matcher
-        object or not. `True` value is returned when it matches, `False` otherwise.
-        """
+    def match_headers(self, request: Request) -> bool:
+        """
+        Matches the headers of the request
+
+        :param request: the HTTP request
+        :return: `True` when all the headers are matched or no matching is required. `False` otherwise.
+        """
+
+        cache = RequestCache.of(request)
+        for key, value in self.headers.items():
+            if not self.header_value_matcher(key, cache.get_header(key), value):
+                return False
+        return True
+
+    def compile(self) -> None:
+        """
+        Prepares the matcher for matching many requests.
+
+        The expected values are frozen into their final form (encoded query string,
+        frozen dicts, the way of matching the URI, and the header value matcher
+        function of each header), so matching a request is a series of plain
+        comparisons.
+
+        This is called when the matcher is registered by
+        :py:meth:`HTTPServer.expect_request` or :py:meth:`HTTPServer.expect`, and
+        by :py:meth:`match` if the matcher has not been compiled yet. Setting an
+        attribute of the matcher (such as ``uri``, ``method`` or ``headers``)
+        discards the compiled checks, so they are compiled again from the new
+        values at the next match. Modifying the expected values in place (such as
+        adding a key to the ``headers`` dict) is not detected, this method needs to
+        be called after that.
+        """
+
+        matcher_class = type(self)
+        checks: list[Callable[[Request], bool]] = []
+
+        method = self.method
+        if method != METHOD_ALL:
+            checks.append(lambda request: request.method == method)
+
+        uri_check = self._compile_uri() if matcher_class.match_uri is RequestMatcher.match_uri else self.match_uri
+        if uri_check is not None:
+            checks.append(uri_check)
+
+        if not isinstance(self.query_matcher, BooleanQueryMatcher) or not self.query_matcher.result:
+            self.query_matcher.compile()
+            checks.append(self.query_matcher.match_request)
+
+        if matcher_class.match_headers is not RequestMatcher.match_headers:
+            checks.append(self.match_headers)
+        elif self.headers:
+            checks.append(self._compile_headers())
+
+        if matcher_class.match_data is not RequestMatcher.match_data:
+            checks.append(self.match_data)
+        elif self.data is not None:
+            data = self.data
+            checks.append(lambda request: request.data == data)
+
+        if matcher_class.match_json is not RequestMatcher.match_json:
+            checks.append(self.match_json)
+        elif self.json is not UNDEFINED:
+            checks.append(self._compile_json())
+
+        self._checks = tuple(checks)
+
+    def _compile_uri(self) -> Callable[[Request], bool] | None:
+        uri = self.uri
+        if _is_path_template(uri):
+            return lambda request: RequestCache.of(request).get_path_params(uri) is not None
+
+        if isinstance(uri, URIPattern):
+            uri_match = uri.match
+            return lambda request: bool(uri_match(request.path))
+
+        if isinstance(uri, Pattern):
+            pattern_match = uri.match
+            return lambda request: pattern_match(request.path) is not None
+
+        if type(uri) is str:
+            if uri == URI_DEFAULT:
+                return None
+            return lambda request: request.path == uri
+
+        # any object providing __eq__
+        return lambda request: uri in (URI_DEFAULT, request.path)
+
+    def _bind_header_value_matcher(self, header_name: str) -> Callable[[str | None, str], bool]:
+        header_value_matcher = self.header_value_matcher
+        if (
+            isinstance(header_value_matcher, HeaderValueMatcher)
+            and type(header_value_matcher).__call__ is HeaderValueMatcher.__call__
+        ):
+            with suppress(KeyError):
+                return header_value_matcher.matchers[header_name]
+
+        # raises the error of the header value matcher (if any) when matching
+        return partial(header_value_matcher, header_name)
+
+    def _compile_headers(self) -> Callable[[Request], bool]:
+        header_checks = tuple(
+            (name, expected, self._bind_header_value_matcher(name)) for name, expected in self.headers.items()
+        )
+
+        def check_headers(request: Request) -> bool:
+            get_header = RequestCache.of(request).get_header
+            for name, expected, value_matcher in header_checks:
+                if not value_matcher(get_header(name), expected):
+                    return False
+            return True
+
+        return check_headers
+
+    def _compile_json(self) -> Callable[[Request], bool]:
+        expected = self.json
+        encoding = self.data_encoding
+
+        def check_json(request: Request) -> bool:
+            json_received = RequestCache.of(request).get_json(encoding)
+            if json_received is UNDEFINED:
+                return False
+            return bool(json_received == expected)
+
+        return check_json
+
+    def match(self, request: Request) -> bool:
+        """
+        Returns whether the request matches the parameters set in the matcher
+        object or not. `True` value is returned when it matches, `False` otherwise.
+
+        Contrary to :py:meth:`difference`, matching stops at the first field
+        which does not match, and the fields are checked from the cheapest to
+        the most expensive one: method, URI, query string, headers, data and json.
+        """
+
+        if type(self).difference is not RequestMatcher.difference:
+            # keep the behavior of subclasses customizing difference()
+            return not self.difference(request)
+
+        checks = self._checks
+        if checks is None:
+            self.compile()
+            checks = self._checks
+            assert checks is not None
+
+        for check in checks:
+            if not check(request):
+                return False
+        return True
+
+
+def _serialize_json(obj: Any, json_dumps: JSON_DUMPS_T) -> bytes:
+    """
+    Serializes the object to JSON using the specified serializer.
+
+    If the serializer is a :py:func:`functools.partial` of :py:func:`json.dumps`,
+    the chunks made by the encoder are written to a bytes buffer one by one, so
+    no str object is built for the whole document.
+    """
+    if isinstance(json_dumps, partial) and json_dumps.func is json.dumps and not json_dumps.args:
+        kwargs = dict(json_dumps.keywords)
+        encoder_cls = kwargs.pop("cls", None) or json.JSONEncoder
+        buffer = io.BytesIO()
+        for chunk in encoder_cls(**kwargs).iterencode(obj):
+            buffer.write(chunk.encode("utf-8"))
+        return buffer.getvalue()
+
+    data = json_dumps(obj)
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    return data
+
+
+def _iter_stream(source: STREAM_SOURCE_T, chunk_size: int) -> Iterator[bytes]:
+    """
+    Yields the content of the source in chunks of at most `chunk_size` bytes.
+
+    Binary file objects are read chunk by chunk, the items of other iterables
+    are encoded to utf-8 if they are str objects and split if they are too large.
+    """
+    if hasattr(source, "read"):
+        while chunk := source.read(chunk_size):
+            yield chunk
+        return
+
+    for item in source:
+        chunk = item.encode("utf-8") if isinstance(item, str) else item
+        if len(chunk) <= chunk_size:
+            if chunk:
+                yield chunk
+            continue
+        for offset in range(0, len(chunk), chunk_size):
+            yield chunk[offset : offset + chunk_size]
+
+
+def _satisfiable_ranges(request_range: Range, length: int) -> list[tuple[int, int]]:
+    """
+    Returns the byte ranges of the request which can be satisfied, as (start, stop) pairs.
+    """
+    ranges: list[tuple[int, int]] = []
+    for start, stop in request_range.ranges:
+        if start < 0:
+            start, stop = max(length + start, 0), length  # noqa: PLW2901
+        elif stop is None or stop > length:
+            stop = length  # noqa: PLW2901
+        if start < stop:
+            ranges.append((start, stop))
+    return ranges
+
+
+def _iter_multipart_ranges(
+    ranges: list[tuple[int, int]],
+    part_headers: list[bytes],
+    closing: bytes,
+    read: Callable[[int, int], Iterable[bytes]],
+) -> Iterator[bytes]:
+    for (start, stop), part_header in zip(ranges, part_headers):
+        yield part_header
+        yield from read(start, stop)
+        yield b"\r\n"
+    yield closing
+
+
+def _make_conditional_response(
+    request: Request,
+    status: int,
+    headers: Iterable[tuple[str, str]],
+    etag: str,
+    last_modified: datetime | None,
+    length: int,
+    read: Callable[[int, int], Iterable[bytes]],
+) -> Response | None:
+    """
+    Makes the response for a conditional or a range request.
+
+    :param request: the request, whose ``If-None-Match``, ``If-Modified-Since``,
+        ``Range`` and ``If-Range`` headers are evaluated
+    :param status: the status of the full response, only *200 OK* responses are
+        made conditional
+    :param headers: the headers of the full response
+    :param etag: the unquoted entity tag of the full response
+    :param last_modified: the modification time of the full response, if known
+    :param length: the length of the body of the full response
+    :param read: function returning the bytes of the body between the start and
+        the stop offsets specified
+    :return: a *304 Not Modified*, *206 Partial Content* or *416 Range Not
+        Satisfiable* response, or `None` if the full response should be sent
+    """
+    if status != HTTPStatus.OK or request.method not in ("GET", "HEAD"):
+        return None
+
+    if not werkzeug.http.is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response_headers = Headers(headers)
+        response_headers.remove("Content-Length")
+        return Response(None, HTTPStatus.NOT_MODIFIED, response_headers)
+
+    request_range = request.range
+    if request_range is None or request_range.units != "bytes":
+        return None
+
+    # a range request whose If-Range precondition fails gets the full response
+    if_range = request.if_range
+    if if_range.etag is not None and if_range.etag != etag:
+        return None
+    if if_range.date is not None and (last_modified is None or last_modified.replace(microsecond=0) > if_range.date):
+        return None
+
+    response_headers = Headers(headers)
+    response_headers.remove("Content-Length")
+    ranges = _satisfiable_ranges(request_range, length)
+    if not ranges:
+        response_headers["Content-Range"] = "bytes */{}".format(length)
+        return Response(b"", HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, response_headers)
+
+    if len(ranges) == 1:
+        start, stop = ranges[0]
+        response_headers["Content-Range"] = "bytes {}-{}/{}".format(start, stop - 1, length)
+        response_headers["Content-Length"] = str(stop - start)
+        return Response(read(start, stop), HTTPStatus.PARTIAL_CONTENT, response_headers)
+
+    boundary = secrets.token_hex(16)
+    content_type = response_headers.get("Content-Type", "application/octet-stream")
+    part_headers = [
+        "--{}\r\nContent-Type: {}\r\nContent-Range: bytes {}-{}/{}\r\n\r\n".format(
+            boundary, content_type, start, stop - 1, length
+        ).encode("latin-1")
+        for start, stop in ranges
+    ]
+    closing = "--{}--\r\n".format(boundary).encode("latin-1")
+    content_length = sum(map(len, part_headers)) + sum(stop - start + 2 for start, stop in ranges) + len(closing)
+
+    response_headers["Content-Type"] = "multipart/byteranges; boundary={}".format(boundary)
+    response_headers["Content-Length"] = str(content_length)
+    return Response(
+        _iter_multipart_ranges(ranges, part_headers, closing, read), HTTPStatus.PARTIAL_CONTENT, response_headers
+    )
+
+
+def _make_stream_response(
+    body: STREAM_BODY_T,
+    status: int,
+    headers: HEADERS_T | None,
+    mimetype: str | None,
+    content_type: str | None,
+    chunk_size: int,
+    content_length: int | None,
+    request: Request | None,  # noqa: ARG001
+) -> Response:
+    source = body() if callable(body) else body
+    response = Response(_iter_stream(source, chunk_size), status, headers, mimetype, content_type)
+    if callable(body) and hasattr(source, "close"):
+        response.call_on_close(source.close)
+    if content_length is not None:
+        response.content_length = content_length
+    return response
+
+
+class _FileBody:
+    """
+    Iterable reading a file chunk by chunk, the file is opened for each iteration.
+    """
+
+    def __init__(self, path: Path, chunk_size: int) -> None:
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        with self.path.open("rb") as infile:
+            yield from _iter_stream(infile, self.chunk_size)
+
+
+class _FileResponse(Response):
+    """
+    Response serving a file from the disk.
+
+    The file is not read by the response: the opened file is passed to the
+    file wrapper of the server of :py:class:`HTTPServer`, which sends it to the
+    socket directly, or to ``wsgi.file_wrapper`` if the WSGI server provides it.
+    If the body is replaced (eg. by a hook), the response behaves as a streamed
+    response.
+    """
+
+    def __init__(self, path: Path, size: int, status: int, headers: HEADERS_T | None, content_type: str) -> None:
+        self._file_body = _FileBody(path, DEFAULT_STREAM_CHUNK_SIZE)
+        super().__init__(self._file_body, status, headers, content_type=content_type)
+        self.content_length = size
+
+    def get_app_iter(self, environ: WSGIEnvironment) -> Iterable[bytes]:
+        status = self.status_code
+        if (
+            self.response is not self._file_body
+            or environ["REQUEST_METHOD"] == "HEAD"
+            or 100 <= status < 200
+            or status in (204, 304)
+        ):
+            return super().get_app_iter(environ)
+
+        file_wrapper = environ.get(_SOCKET_FILE_WRAPPER) or environ.get("wsgi.file_wrapper", FileWrapper)
+        infile = self._file_body.path.open("rb")
+        return ClosingIterator(file_wrapper(infile, self._file_body.chunk_size), self.close)
+
+
+def _read_file_range(path: Path, start: int, stop: int) -> Iterator[bytes]:
+    with path.open("rb") as infile:
+        infile.seek(start)
+        remaining = stop - start
+        while remaining > 0 and (chunk := infile.read(min(remaining, DEFAULT_STREAM_CHUNK_SIZE))):
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _make_file_response(
+    path: Path,
+    status: int,
+    headers: HEADERS_T | None,
+    content_type: str,
+    conditional: bool,  # noqa: FBT001
+    request: Request | None,
+) -> Response:
+    stat = path.stat()
+    response = _FileResponse(path, stat.st_size, status, headers, content_type)
+    if not conditional:
+        return response
+
+    etag = "{:x}-{:x}".format(stat.st_mtime_ns, stat.st_size)
+    last_modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.accept_ranges = "bytes"
+    if request is not None:
+        conditional_response = _make_conditional_response(
+            request, status, response.headers.items(), etag, last_modified, stat.st_size, partial(_read_file_range, path)
+        )
+        if conditional_response is not None:
+            return conditional_response
+    return response
+
+
+class _Variant(NamedTuple):
+    """
+    Encoded body and headers of a :py:class:`StaticResponse` for a content encoding.
+    """
+
+    body: bytes
+    headers: tuple[tuple[str, str], ...]
+    etag: str | None
+
+
+class StaticResponse:
+    """
+    Immutable response whose body and headers are encoded once, when it is created.
+
+    The parameters are the same as of :py:class:`werkzeug.Response`. Each call of
+    :py:meth:`make_response` returns a new :py:class:`werkzeug.Response` object
+    built from the encoded body and headers, so the responses of different
+    requests do not share any mutable state (eg. a hook modifying the response
+    does not affect the responses of the later requests), while building them does
+    not need to encode or compress the body, or compute the headers again.
+
+    :param response_data: a string or bytes object representing the body of the response
+    :param status: the HTTP status of the response
+    :param headers: the HTTP headers to be sent
+    :param mimetype: the mime type of the response
+    :param content_type: the content type header to be sent
+    :param conditional: whether to support conditional and range requests. If
+        enabled, the ETag of the body is computed and sent, and
+        :py:meth:`make_response` responds to the ``If-None-Match``, ``Range`` and
+        ``If-Range`` headers of the request with *304 Not Modified*, *206 Partial
+        Content* (including multiple ranges) or *416 Range Not Satisfiable*.
+    :param compress: the content encodings whose compressed variants of the body
+        should be made, or ``True`` for all the encodings supported: ``gzip`` and
+        ``deflate``, plus ``br`` and ``zstd`` if the :py:mod:`brotli` and the
+        :py:mod:`zstandard` (or :py:mod:`compression.zstd`) modules are available.
+        The variants are compressed once, and :py:meth:`make_response` picks the
+        variant preferred by the ``Accept-Encoding`` header of the request.
+    :raises ValueError: when a content encoding specified is not supported
+    """
+
+    __slots__ = ("_encodings", "_identity", "_status", "_status_code", "_variants")
+
+    def __init__(
+        self,
+        response_data: str | bytes = "",
+        status: int | str | HTTPStatus = HTTPStatus.OK.value,
+        headers: HEADERS_T | None = None,
+        mimetype: str | None = None,
+        content_type: str | None = None,
+        *,
+        conditional: bool = False,
+        compress: bool | Iterable[str] = False,
+    ) -> None:
+        if compress is True:
+            encodings = list(_COMPRESSORS)
+        elif compress is False:
+            encodings = []
+        else:
+            encodings = list(compress)
+            for encoding in encodings:
+                if encoding not in _COMPRESSORS:
+                    raise ValueError("Unsupported content encoding: {!r}".format(encoding))
+
+        prototype = Response(response_data, status, headers, mimetype, content_type)
+        if conditional:
+            prototype.accept_ranges = "bytes"
+        if encodings:
+            prototype.vary.add("Accept-Encoding")
+
+        identity_body = prototype.get_data()
+        self._variants: dict[str, _Variant] = {}
+        for encoding in [*encodings, "identity"]:
+            # the identity variant keeps the headers specified, including Content-Encoding
+            variant_headers = prototype.headers.copy()
+            if encoding == "identity":
+                body = identity_body
+            else:
+                body = _COMPRESSORS[encoding](identity_body)
+                variant_headers["Content-Encoding"] = encoding
+            variant_headers["Content-Length"] = str(len(body))
+            etag = werkzeug.http.generate_etag(body) if conditional else None
+            if etag is not None:
+                variant_headers["ETag"] = werkzeug.http.quote_etag(etag)
+            self._variants[encoding] = _Variant(body, tuple(variant_headers.items()), etag)
+
+        self._identity = self._variants["identity"]
+        self._encodings = tuple(self._variants)
+        self._status = prototype.status
+        self._status_code = prototype.status_code
+
+    @property
+    def body(self) -> bytes:
+        """
+        The encoded body of the response.
+        """
+        return self._identity.body
+
+    @property
+    def status(self) -> str:
+        """
+        The status line of the response, such as ``200 OK``.
+        """
+        return self._status
+
+    @property
+    def status_code(self) -> int:
+        """
+        The HTTP status code of the response.
+        """
+        return self._status_code
+
+    @property
+    def headers(self) -> tuple[tuple[str, str], ...]:
+        """
+        The headers of the response, including Content-Type and Content-Length.
+        """
+        return self._identity.headers
+
+    @property
+    def etag(self) -> str | None:
+        """
+        The unquoted ETag of the body, or `None` if the response is not conditional.
+        """
+        return self._identity.etag
+
+    @property
+    def encodings(self) -> tuple[str, ...]:
+        """
+        The content encodings of the variants of the response, including ``identity``.
+        """
+        return self._encodings
+
+    def variant(self, encoding: str) -> tuple[bytes, tuple[tuple[str, str], ...]]:
+        """
+        Returns the body and the headers of the variant of the specified content encoding.
+
+        :raises KeyError: when there's no variant for the encoding
+        """
+        variant = self._variants[encoding]
+        return variant.body, variant.headers
+
+    def make_response(self, request: Request | None = None) -> Response:
+        """
+        Returns a new response object with the body and headers of this response.
+
+        :param request: the request to be responded, it is used to pick the variant
+            of the response accepted by the client, and if the response is conditional,
+            the conditional and range headers of the request are also evaluated
+        """
+        variant = self._identity
+        if request is not None:
+            if len(self._encodings) > 1:
+                encoding = request.accept_encodings.best_match(self._encodings, default="identity")
+                variant = self._variants[encoding]
+
+            if variant.etag is not None:
+                body = variant.body
+                conditional_response = _make_conditional_response(
+                    request,
+                    self.status_code,
+                    variant.headers,
+                    variant.etag,
+                    None,
+                    len(body),
+                    lambda start, stop: (body[start:stop],),
+                )
+                if conditional_response is not None:
+                    return conditional_response
+
+        # the body is passed in a list, so the Content-Length header of the variant
+        # is not computed and set again
+        return Response([variant.body], status=self._status, headers=Headers(variant.headers))
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            "_encodings": self._encodings,
+            "_identity": self._identity,
+            "_status": self._status,
+            "_status_code": self._status_code,
+            "_variants": self._variants,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self._encodings = state["_encodings"]
+        self._identity = state["_identity"]
+        self._status = state["_status"]
+        self._status_code = state["_status_code"]
+        self._variants = state["_variants"]
+
+    def __repr__(self) -> str:
+        return "<{} {} body={!r}>".format(self.__class__.__name__, self.status, self.body[:64])
+
+
+class RequestHandlerBase(abc.ABC):
+    """
+    Represents a :py:class:`RequestHandler` object providing a response for the corresponding request.
+
+    .. py:attribute:: json_dumps
+
+        The JSON serializer used by :py:meth:`respond_with_json`, a callable receiving
+        the object and returning its serialized form as str or bytes. By default, it
+        is :py:data:`JSON_DUMPS_INDENTED`.
+    """
+
+    json_dumps: JSON_DUMPS_T = JSON_DUMPS_INDENTED
+
+    def respond_with_json(
+        self,
+        response_json: Any,
+        status: int = HTTPStatus.OK.value,
+        headers: Mapping[str, str] | None = None,
+        content_type: str = "application/json",
+        *,
+        json_dumps: JSON_DUMPS_T | None = None,
+        conditional: bool = False,
+        compress: bool | Iterable[str] = False,
+    ) -> None:
+        """
+        Prepares a response with a serialized JSON object.
+
+        The object is serialized once, when this method is called.
+
+        :param response_json: a JSON-serializable python object
+        :param status: the HTTP status of the response
+        :param headers: the HTTP headers to be sent (excluding the Content-Type header)
+        :param content_type: the content type header to be sent
+        :param json_dumps: the JSON serializer to be used instead of :py:attr:`json_dumps`,
+            such as :py:data:`JSON_DUMPS_COMPACT` or the ``dumps`` function of a third-party
+            JSON library
+        :param conditional: whether to support conditional and range requests, see
+            :py:class:`StaticResponse`
+        :param compress: the content encodings of the compressed variants to be made,
+            or ``True`` for all the encodings supported, see :py:class:`StaticResponse`
+        """
+
+        response_data = (json_dumps or self.json_dumps)(response_json)
+        self.respond_with_data(
+            response_data, status, headers, content_type=content_type, conditional=conditional, compress=compress
+        )
+
+    def respond_with_data(
+        self,
+        response_data: str | bytes = "",
+        status: int = HTTPStatus.OK.value,
+        headers: HEADERS_T | None = None,
+        mimetype: str | None = None,
+        content_type: str | None = None,
+        *,
+        conditional: bool = False,
+        compress: bool | Iterable[str] = False,
+    ) -> None:
+        """
+        Prepares a response with raw data.
+
+        For detailed description please see the :py:class:`werkzeug.Response` object as the
+        parameters are analogue.
+
+        :param response_data: a string or bytes object representing the body of the response
+        :param status: the HTTP status of the response
+        :param headers: the HTTP headers to be sent (excluding the Content-Type header)
+        :param content_type: the content type header to be sent
+        :param mimetype: the mime type of the request
+        :param conditional: whether to support conditional and range requests, see
+            :py:class:`StaticResponse`
+        :param compress: the content encodings of the compressed variants to be made,
+            or ``True`` for all the encodings supported, see :py:class:`StaticResponse`
+        """
+
+        self.respond_with_static_response(
+            StaticResponse(
+                response_data, status, headers, mimetype, content_type, conditional=conditional, compress=compress
+            )
+        )
+
+    def respond_with_static_response(self, static_response: StaticResponse) -> None:
+        """
+        Prepares a response with the specified static response.
+
+        :param static_response: the static response, a new response object is
+            created from it for each request
+        """
+
+        self._respond_with_factory(static_response.make_response)
+
+    def respond_with_stream(
+        self,
+        body: STREAM_BODY_T,
+        status: int = HTTPStatus.OK.value,
+        headers: HEADERS_T | None = None,
+        mimetype: str | None = None,
+        content_type: str | None = None,
+        *,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+        content_length: int | None = None,
+    ) -> None:
+        """
+        Prepares a response whose body is sent chunk by chunk, without buffering it.
+
+        The body can be an iterable of bytes (or str) objects such as a generator,
+        a binary file object, or a function without parameters returning one of
+        these. As generators and file objects can be consumed only once, a function
+        should be specified when the handler is expected to serve more than one
+        request: it is called for each request, and the object returned is closed
+        when the response is sent, if it has a ``close()`` method.
+
+        If `content_length` is not specified, the length of the body is not known
+        in advance, so it is sent with chunked transfer encoding if the server
+        speaks HTTP/1.1 (eg. it is threaded), otherwise it is delimited by closing
+        the connection.
+
+        :param body: the iterable, file object or function providing the body
+        :param status: the HTTP status of the response
+        :param headers: the HTTP headers to be sent (excluding the Content-Type header)
+        :param mimetype: the mime type of the response
+        :param content_type: the content type header to be sent
+        :param chunk_size: the maximum size of the chunks sent, in bytes
+        :param content_length: the length of the body in bytes, sent in the
+            Content-Length header
+        """
+
+        self._respond_with_factory(
+            partial(_make_stream_response, body, status, headers, mimetype, content_type, chunk_size, content_length)
+        )
+
+    def respond_with_file(
+        self,
+        path: str | os.PathLike[str],
+        content_type: str | None = None,
+        *,
+        status: int = HTTPStatus.OK.value,
+        headers: HEADERS_T | None = None,
+        conditional: bool = False,
+    ) -> None:
+        """
+        Prepares a response with the content of the specified file.
+
+        The file is opened and sent for each request, it is never read into
+        memory as a whole. The server of :py:class:`HTTPServer` sends the file by
+        :py:meth:`socket.socket.sendfile`, or, when it serves HTTPS, from a
+        memory-mapped view of the file.
+
+        :param path: the path of the file
+        :param content_type: the content type header to be sent, if not specified,
+            it is guessed from the file name, ``application/octet-stream`` is used if
+            it can't be guessed
+        :param status: the HTTP status of the response
+        :param headers: the HTTP headers to be sent (excluding the Content-Type header)
+        :param conditional: whether to support conditional and range requests. If
+            enabled, the ETag and the Last-Modified headers are computed from the
+            size and the modification time of the file, and the request is
+            responded as described at :py:class:`StaticResponse`.
+        :raises FileNotFoundError: when the file does not exist
+        """
+
+        path = Path(path)
+        if not path.is_file():
+            raise FileNotFoundError("No such file: {}".format(path))
+
+        if content_type is None:
+            content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+        self._respond_with_factory(partial(_make_file_response, path, status, headers, content_type, conditional))
+
+    def _respond_with_factory(self, factory: Callable[[Request | None], Response]) -> None:
+        """
+        Prepares a response made by the specified function.
+
+        The function receives the request to be responded, or `None` if it is not
+        known. Handlers serving multiple requests should call the function for each
+        request, by default it is called once without the request.
+        """
+
+        self.respond_with_response(factory(None))
+
+    @abc.abstractmethod
+    def respond_with_response(self, response: Response) -> None:
+        """
+        Prepares a response with the specified response object.
+
+        :param response: the response object which will be responded
+        """
+
+
+def _return_response(response: Response, _request: Request) -> Response:
+    return response
+
+
+def _to_response(response: Response | str | None) -> Response:
+    # handlers may return a string or nothing
+    if response is None:
+        return Response("")
+    if isinstance(response, str):
+        return Response(response)
+    return response
+
+
+class RequestHandler(RequestHandlerBase):
+    """
+    Represents a response function and a :py:class:`RequestHandler` object.
+
+    This class connects the matcher object with the function responsible for the response.
+    The respond handler function can be registered with the `respond_with_` methods.
+
+    :param matcher: the matcher object
+    :param json_dumps: the JSON serializer used by the ``respond_with_json`` methods,
+        if not specified, :py:attr:`RequestHandlerBase.json_dumps` is used
+    """
+
+    def __init__(self, matcher: RequestMatcher, json_dumps: JSON_DUMPS_T | None = None) -> None:
+        self.matcher = matcher
+        self.request_handler: Callable[[Request], Response] | None = None
+        self._hooks: list[Callable[[Request, Response], Response]] = []
+        if json_dumps is not None:
+            self.json_dumps = json_dumps
+
+    def with_post_hook(self, hook: Callable[[Request, Response], Response]) -> RequestHandler:
+        self._hooks.append(hook)
+        return self
+
+    def respond(self, request: Request) -> Response:
+        """
+        Calls the request handler registered for this object.
+
+        If no response was specified previously, it raises
+        :py:class:`NoHandlerError` exception.
+
+        :param request: the incoming request object
+        :return: the response object
+        """
+
+        if self.request_handler is None:
+            raise NoHandlerError(
+                "Matching request handler found but no response defined: {} {}".format(request.method, request.path)
+            )
+        else:
+            response = self.request_handler(request)
+
+            for hook in self._hooks:
+                response = hook(request, response)
+            return response
+
+    async def respond_async(self, request: Request) -> Response:
+        """
+        Calls the request handler registered for this object, awaiting its result
+        when it is a coroutine (or another awaitable).
+
+        It is used by :py:class:`AsyncHTTPServer`, so coroutine functions can be
+        registered by :py:meth:`respond_with_handler`.
+
+        :param request: the incoming request object
+        :return: the response object
+        """
+        if self.request_handler is None:
+            raise NoHandlerError(
+                "Matching request handler found but no response defined: {} {}".format(request.method, request.path)
+            )
+
+        response: Any = self.request_handler(request)
+        if inspect.isawaitable(response):
+            response = await response
+
+        for hook in self._hooks:
+            response = hook(request, response)
+        return response
+
+    def respond_with_handler(self, func: Callable[..., Response]) -> None:
+        """
+        Registers the specified function as a responder.
+
+        The function will receive the request object and must return with the response object.
+
+        If the URI of the matcher is a :py:class:`PathTemplate`, the values captured by
+        the template are passed to the function as keyword arguments.
+        """
+        uri = self.matcher.uri
+        if _is_path_template(uri) and uri.converters:
+
+            def request_handler(request: Request) -> Response:
+                params = RequestCache.of(request).get_path_params(uri)
+                return func(request, **(params or {}))
+
+            self.request_handler = request_handler
+        else:
+            self.request_handler = func
+
+    def respond_with_dynamic_json(
+        self,
+        func: Callable[[Request], Any],
+        status: int = HTTPStatus.OK.value,
+        headers: Mapping[str, str] | None = None,
+        content_type: str = "application/json",
+        *,
+        json_dumps: JSON_DUMPS_T | None = None,
+    ) -> None:
+        """
+        Registers a function whose return value is serialized as JSON for each request.
+
+        Unlike :py:meth:`respond_with_json`, the object is created and serialized when
+        the request is served. If the serializer is a :py:func:`functools.partial` of
+        :py:func:`json.dumps` (such as the default one), the document is written to a
+        bytes buffer chunk by chunk, so no intermediate str is built for large payloads.
+
+        :param func: function receiving the request and returning a JSON-serializable
+            python object
+        :param status: the HTTP status of the response
+        :param headers: the HTTP headers to be sent (excluding the Content-Type header)
+        :param content_type: the content type header to be sent
+        :param json_dumps: the JSON serializer to be used instead of :py:attr:`json_dumps`
+        """
+
+        dumps = json_dumps or self.json_dumps
+
+        def request_handler(request: Request) -> Response:
+            return Response(_serialize_json(func(request), dumps), status, headers, content_type=content_type)
+
+        self.request_handler = request_handler
+
+    def respond_with_response(self, response: Response) -> None:
+        self.request_handler = partial(_return_response, response)
+
+    def _respond_with_factory(self, factory: Callable[[Request | None], Response]) -> None:
+        self.request_handler = factory
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        retval = (
+            f"<{class_name} uri={self.matcher.uri!r} method={self.matcher.method!r} "
+            f"query_string={self.matcher.query_string!r} headers={self.matcher.headers!r} data={self.matcher.data!r} "
+            f"json={self.matcher.json!r}>"
+        )
+        return retval
+
+
+def _index_key(matcher: RequestMatcher) -> tuple[str, str] | None:
+    """
+    Returns the (method, path) key of the matcher for the dispatch index.
+
+    `None` is returned when the matcher cannot be indexed: when its URI is not a
+    plain string (eg. a regular expression or an :py:class:`URIPattern`), when
+    it matches every URI, or when the matching methods are overridden in a
+    subclass, so the URI and the method may not be the deciding factors.
+    """
+
+    if not _has_standard_uri_matching(matcher):
+        return None
+
+    if type(matcher.uri) is not str or matcher.uri == URI_DEFAULT or type(matcher.method) is not str:
+        return None
+
+    return (matcher.method, matcher.uri)
+
+
+def _has_standard_uri_matching(matcher: RequestMatcher) -> bool:
+    matcher_class = type(matcher)
+    return (
+        matcher_class.match is RequestMatcher.match
+        and matcher_class.difference is RequestMatcher.difference
+        and matcher_class.match_uri is RequestMatcher.match_uri
+    )
+
+
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]()|\\")
+
+
+def _literal_prefix(pattern: Pattern[str]) -> str:
+    """
+    Returns the literal prefix of the regular expression: a string which must be at
+    the beginning of every string matched by the pattern (with ``match()``).
+
+    The source of the pattern is scanned conservatively: an empty string is
+    returned when the prefix cannot be determined safely.
+    """
+
+    source = pattern.pattern
+    if not isinstance(source, str) or pattern.flags & (re.IGNORECASE | re.VERBOSE) or "|" in source:
+        return ""
+
+    if source.startswith("^"):
+        pos = 1
+    elif source.startswith("\\A"):
+        pos = 2
+    else:
+        pos = 0
+
+    prefix: list[str] = []
+    while pos < len(source):
+        char = source[pos]
+        if char == "\\":
+            if pos + 1 >= len(source) or source[pos + 1].isalnum() or source[pos + 1] == "_":
+                # character classes, anchors, backreferences, etc.
+                break
+            char = source[pos + 1]
+            pos += 2
+        elif char in _REGEX_SPECIAL_CHARS:
+            break
+        else:
+            pos += 1
+
+        if pos < len(source):
+            quantifier = source[pos]
+            if quantifier in "*?{":
+                # the last character is optional or may be repeated a few times
+                break
+            if quantifier == "+":
+                prefix.append(char)
+                break
+
+        prefix.append(char)
+
+    return "".join(prefix)
+
+
+# the patterns which can't be combined into an alternation: backreferences and
+# conditionals refer to the groups by their number, global inline flags must be at
+# the beginning of the pattern
+_UNCOMBINABLE_REGEX_RE = re.compile(r"\\\d|\(\?[aiLmsux(]")
+
+# the number of the patterns of a bucket evaluated one by one before they are combined
+_REGEX_COMBINE_THRESHOLD = 8
+
+
+def _combinable_regex(pattern: Pattern[str]) -> bool:
+    """
+    Returns True if the pattern can be an alternative of a combined pattern.
+    """
+    return (
+        isinstance(pattern.pattern, str)
+        and pattern.flags == re.UNICODE
+        and not pattern.groupindex
+        and _UNCOMBINABLE_REGEX_RE.search(pattern.pattern) is None
+    )
+
+
+class _RegexBucket:
+    """
+    The patterns of a :py:class:`_RegexRouter` sharing a literal prefix.
+
+    The patterns are combined into a single alternation, where each alternative
+    ends with an empty named group, so a single ``match()`` call finds the first
+    pattern matching the path. The patterns which can't be combined are replaced
+    by an empty alternative, so the search stops at them and they are evaluated
+    one by one. The combined pattern is compiled again when the number of the
+    patterns added after it exceeds the number of the patterns combined, so the
+    cost of the compiling is amortized over the additions. Removed patterns leave
+    a tombstone behind, and the bucket is compacted when the tombstones outnumber
+    the live entries.
+    """
+
+    __slots__ = ("_position_of", "_state", "live")
+
+    def __init__(self) -> None:
+        # the entries, the combined pattern and the number of the entries combined,
+        # replaced at once, so a lookup running concurrently sees a consistent state
+        self._state: tuple[list[tuple[int, RequestHandler, Pattern[str]] | None], Pattern[str] | None, int] = (
+            [],
+            None,
+            0,
+        )
+        self._position_of: dict[int, int] = {}
+        self.live = 0
+
+    def add(self, seq: int, handler: RequestHandler, pattern: Pattern[str]) -> None:
+        entries = self._state[0]
+        self._position_of[seq] = len(entries)
+        entries.append((seq, handler, pattern))
+        self.live += 1
+
+    def discard(self, seq: int) -> None:
+        entries = self._state[0]
+        entries[self._position_of.pop(seq)] = None
+        self.live -= 1
+        if len(entries) - self.live > max(self.live, 16):
+            entries = [entry for entry in entries if entry is not None]
+            self._position_of = {entry[0]: position for position, entry in enumerate(entries)}  # type: ignore[index]
+            self._state = (entries, None, 0)
+
+    def _combine(self, entries: list[tuple[int, RequestHandler, Pattern[str]] | None]) -> None:
+        alternatives = [
+            "(?:{})(?P<_{}>)".format(entry[2].pattern, position)
+            if entry is not None and _combinable_regex(entry[2])
+            else "(?P<_{}>)".format(position)
+            for position, entry in enumerate(entries)
+        ]
+        try:
+            combined = re.compile("|".join(alternatives))
+        except re.error:
+            # the patterns are evaluated one by one
+            combined = None
+        self._state = (entries, combined, len(alternatives))
+
+    def matching(self, path: str) -> Iterator[tuple[int, RequestHandler]]:
+        """
+        Returns the entries whose pattern matches the path, in registration order.
+        """
+        entries, combined, compiled = self._state
+        if len(entries) - compiled > max(compiled, _REGEX_COMBINE_THRESHOLD):
+            self._combine(entries)
+            entries, combined, compiled = self._state
+
+        start = 0
+        if combined is not None:
+            # the patterns before the first alternative matching do not match
+            m = combined.match(path)
+            start = compiled if m is None else int(m.lastgroup[1:])  # type: ignore[index]
+
+        for position in range(start, len(entries)):
+            entry = entries[position]
+            if entry is not None and entry[2].match(path):
+                yield entry[0], entry[1]
+
+
+class _RegexRouter:
+    """
+    Finds the handlers whose regular expression URI may match the path.
+
+    The patterns are grouped by their literal prefix (see :py:func:`_literal_prefix`),
+    so only the patterns whose literal prefix is at the beginning of the path
+    need to be evaluated. The prefixes are looked up by their length, so a
+    lookup costs one dict access per distinct prefix length, independently of the
+    number of the patterns. The patterns sharing a prefix are combined into a
+    single pattern by :py:class:`_RegexBucket`, so they are not tried one by one.
+    """
+
+    def __init__(self) -> None:
+        self._by_prefix: dict[str, _RegexBucket] = {}
+        self._prefix_of: dict[int, str] = {}
+        self._prefix_lengths: list[int] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._prefix_of)
+
+    def add(self, seq: int, handler: RequestHandler, pattern: Pattern[str]) -> None:
+        prefix = _literal_prefix(pattern)
+        bucket = self._by_prefix.get(prefix)
+        if bucket is None:
+            bucket = self._by_prefix[prefix] = _RegexBucket()
+            if len(prefix) not in self._prefix_lengths:
+                self._prefix_lengths.append(len(prefix))
+                self._prefix_lengths.sort()
+
+        bucket.add(seq, handler, pattern)
+        self._prefix_of[seq] = prefix
+
+    def discard(self, seq: int) -> bool:
+        prefix = self._prefix_of.pop(seq, None)
+        if prefix is None:
+            return False
+
+        bucket = self._by_prefix[prefix]
+        bucket.discard(seq)
+        if not bucket.live:
+            del self._by_prefix[prefix]
+            if not any(len(other) == len(prefix) for other in self._by_prefix):
+                self._prefix_lengths.remove(len(prefix))
+        return True
+
+    def matching(self, path: str) -> Iterable[tuple[int, RequestHandler]]:
+        """
+        Returns the entries whose pattern matches the path, in registration order.
+
+        The patterns are evaluated lazily, while the returned iterable is consumed.
+        """
+        buckets = []
+        for length in self._prefix_lengths:
+            if length > len(path):
+                break
+            bucket = self._by_prefix.get(path[:length])
+            if bucket is not None:
+                buckets.append(bucket.matching(path))
+
+        if len(buckets) == 1:
+            return buckets[0]
+        return heapq.merge(*buckets, key=itemgetter(0))
+
+
+class _TemplateNode:
+    __slots__ = ("children", "entries", "params", "rest")
+
+    def __init__(self) -> None:
+        # literal segment -> node
+        self.children: dict[str, _TemplateNode] = {}
+        # (converter name, converter regex) -> node
+        self.params: dict[tuple[str, str], _TemplateNode] = {}
+        # handlers whose template ends at this node
+        self.entries: OrderedDict[int, RequestHandler] = OrderedDict()
+        # handlers whose template ends with a path placeholder after this node
+        self.rest: OrderedDict[int, RequestHandler] = OrderedDict()
+
+
+class _TemplateRouter:
+    """
+    Finds the handlers whose :py:class:`PathTemplate` URI matches the path.
+
+    The templates are stored in a radix tree keyed by the path segments, where
+    placeholders are edges labelled by their converter and its regular expression,
+    taken from the template, so the converters added by the subclasses of
+    :py:class:`PathTemplate` are supported. A lookup walks the tree
+    along the segments of the path, so its cost depends on the length of the path
+    rather than on the number of the templates.
+    """
+
+    def __init__(self) -> None:
+        self._root = _TemplateNode()
+        self._bucket_of: dict[int, OrderedDict[int, RequestHandler]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._bucket_of)
+
+    def add(self, seq: int, handler: RequestHandler, template: PathTemplate) -> None:
+        node = self._root
+        for value, converter in template.segments:
+            if converter == "path":
+                bucket = node.rest
+                break
+
+            if converter is None:
+                child = node.children.get(value)
+                if child is None:
+                    child = node.children[value] = _TemplateNode()
+            else:
+                label = (converter, template.CONVERTERS[converter][0])
+                child = node.params.get(label)
+                if child is None:
+                    child = node.params[label] = _TemplateNode()
+            node = child
+        else:
+            bucket = node.entries
+
+        bucket[seq] = handler
+        self._bucket_of[seq] = bucket
+
+    def discard(self, seq: int) -> bool:
+        bucket = self._bucket_of.pop(seq, None)
+        if bucket is None:
+            return False
+        del bucket[seq]
+        return True
+
+    def matching(self, path: str) -> Iterable[tuple[int, RequestHandler]]:
+        """
+        Returns the entries whose template may match the path, in registration order.
+        """
+        segments = path.split("/")
+        buckets = []
+        stack = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if depth == len(segments):
+                if node.entries:
+                    buckets.append(tuple(node.entries.items()))
+                continue
+
+            segment = segments[depth]
+            if node.rest and (segment or depth + 1 < len(segments)):
+                # the candidates are verified by the matcher, so the rest of the
+                # path only needs to be non-empty here
+                buckets.append(tuple(node.rest.items()))
+
+            child = node.children.get(segment)
+            if child is not None:
+                stack.append((child, depth + 1))
+            for (_, regex), param_node in tuple(node.params.items()):
+                if re.fullmatch(regex, segment):
+                    stack.append((param_node, depth + 1))
+
+        if len(buckets) == 1:
+            return buckets[0]
+        return heapq.merge(*buckets, key=itemgetter(0))
+
+
+class _HandlerIndex:
+    """
+    Dispatch index of a :py:class:`RequestHandlerList`.
+
+    Handlers with a plain string URI are put into buckets keyed by method and
+    path, handlers with a regular expression URI are added to a
+    :py:class:`_RegexRouter`, handlers with a :py:class:`PathTemplate` URI are
+    added to a :py:class:`_TemplateRouter`, every other handler goes to the
+    fallback bucket.
+    Each entry has a sequence number reflecting the registration order, so the
+    candidates from the different buckets can be merged back into the
+    registration order. The buckets are ordered dicts keyed by the sequence
+    number, so a handler can be removed in constant time.
+    """
+
+    def __init__(self, handlers: Iterable[RequestHandler] = ()) -> None:
+        # set when a matcher of the handlers is modified, the index needs to be rebuilt
+        self.stale = False
+        self._next_seq = 0
+        self._seqs: dict[int, list[int]] = {}
+        self._exact: dict[tuple[str, str], OrderedDict[int, RequestHandler]] = {}
+        self._exact_key_of: dict[int, tuple[str, str]] = {}
+        self._regex = _RegexRouter()
+        self._templates = _TemplateRouter()
+        self._fallback: OrderedDict[int, RequestHandler] = OrderedDict()
+
+        for handler in handlers:
+            self.add(handler)
+
+    def add(self, handler: RequestHandler) -> int:
+        """
+        Adds the handler to the index and returns its sequence number.
+        """
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seqs.setdefault(id(handler), []).append(seq)
+
+        handler.matcher._add_index(self)
+        key = _index_key(handler.matcher)
+        uri = handler.matcher.uri
+        if key is not None:
+            self._exact.setdefault(key, OrderedDict())[seq] = handler
+            self._exact_key_of[seq] = key
+        elif isinstance(uri, Pattern) and _has_standard_uri_matching(handler.matcher):
+            self._regex.add(seq, handler, uri)
+        elif _is_path_template(uri) and _has_standard_uri_matching(handler.matcher):
+            self._templates.add(seq, handler, uri)
+        else:
+            self._fallback[seq] = handler
+
+        return seq
+
+    def discard(self, handler: RequestHandler) -> int | None:
+        """
+        Removes the first occurrence of the handler from the index.
+
+        :return: the sequence number of the removed entry, or `None` if the handler
+            is not in the index
+        """
+        seqs = self._seqs.get(id(handler))
+        if not seqs:
+            return None
+
+        seq = seqs.pop(0)
+        if not seqs:
+            del self._seqs[id(handler)]
+
+        key = self._exact_key_of.pop(seq, None)
+        if key is not None:
+            bucket = self._exact[key]
+            del bucket[seq]
+            if not bucket:
+                del self._exact[key]
+        elif not self._regex.discard(seq) and not self._templates.discard(seq):
+            del self._fallback[seq]
+
+        return seq
+
+    def candidates(self, request: Request) -> Iterable[RequestHandler]:
+        """
+        Returns the handlers which may match the request, in registration order.
+
+        The buckets are copied (or they are lists which are only appended), so
+        handlers can be added to the index while the candidates are evaluated.
+        """
+        path = request.path
+        exact_method = self._exact.get((request.method, path))
+        exact_all = self._exact.get((METHOD_ALL, path))
+        buckets = [
+            bucket
+            for bucket in (
+                tuple(exact_method.items()) if exact_method else None,
+                tuple(exact_all.items()) if exact_all else None,
+                self._regex.matching(path) if self._regex else None,
+                self._templates.matching(path) if self._templates else None,
+                tuple(self._fallback.items()) if self._fallback else None,
+            )
+            if bucket is not None
+        ]
+
+        if not buckets:
+            return ()
+
+        if len(buckets) == 1:
+            return (handler for _, handler in buckets[0])
+
+        return (handler for _, handler in heapq.merge(*buckets, key=itemgetter(0)))
+
+
+class RequestHandlerList(list[RequestHandler]):
+    """
+    Represents a list of :py:class:`RequestHandler` objects.
+
+    The handlers are indexed by their method and URI, so :py:meth:`match` needs to
+    evaluate only the handlers which could match the request, regardless of the
+    number of the handlers registered. The index is maintained by the list
+    methods, and it is rebuilt when an attribute of a registered matcher is set.
+    """
+
+    def __init__(self, handlers: Iterable[RequestHandler] = ()) -> None:
+        super().__init__(handlers)
+        self._index: _HandlerIndex | None = None
+
+    def _get_index(self) -> _HandlerIndex:
+        if self._index is None or self._index.stale:
+            self._index = _HandlerIndex(self)
+        return self._index
+
+    def _invalidate_index(self) -> None:
+        self._index = None
+
+    def append(self, handler: RequestHandler) -> None:
+        super().append(handler)
+        if self._index is not None:
+            self._index.add(handler)
+
+    def extend(self, handlers: Iterable[RequestHandler]) -> None:
+        handlers = list(handlers)
+        super().extend(handlers)
+        if self._index is not None:
+            for handler in handlers:
+                self._index.add(handler)
+
+    def __iadd__(self, handlers: Iterable[RequestHandler]) -> Self:  # type: ignore[override,misc]
+        self.extend(handlers)
+        return self
+
+    def remove(self, handler: RequestHandler) -> None:
+        super().remove(handler)
+        if self._index is not None:
+            self._index.discard(handler)
+
+    def insert(self, index: SupportsIndex, handler: RequestHandler) -> None:
+        super().insert(index, handler)
+        self._invalidate_index()
+
+    def pop(self, index: SupportsIndex = -1) -> RequestHandler:
+        handler = super().pop(index)
+        self._invalidate_index()
+        return handler
+
+    def clear(self) -> None:
+        super().clear()
+        self._invalidate_index()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        super().sort(*args, **kwargs)
+        self._invalidate_index()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._invalidate_index()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        super().__setitem__(index, value)
+        self._invalidate_index()
+
+    def __delitem__(self, index: Any) -> None:
+        super().__delitem__(index)
+        self._invalidate_index()
+
+    def __imul__(self, value: SupportsIndex) -> Self:  # type: ignore[misc]
+        super().__imul__(value)
+        self._invalidate_index()
+        return self
+
+    def match(self, request: Request) -> RequestHandler | None:
+        """
+        Returns the first request handler which matches the specified request. Otherwise, it returns `None`.
+        """
+        for requesthandler in self._get_index().candidates(request):
+            if requesthandler.matcher.match(request):
+                return requesthandler
+        return None
+
+
+class OneshotRequestHandlerList(MutableSequence[RequestHandler]):
+    """
+    Represents a list of oneshot :py:class:`RequestHandler` objects.
+
+    It behaves like :py:class:`RequestHandlerList`, but removing a handler takes
+    constant time, so consuming the handlers one by one does not depend on the
+    number of the handlers registered. The removed handlers leave a tombstone
+    behind in their slot, and the list is compacted when the tombstones outnumber
+    the live handlers. Until then, indexing uses a list of the live handlers,
+    which is built at the first indexing after a removal.
+
+    It is a :py:class:`collections.abc.MutableSequence`, not a subclass of
+    :py:class:`list`: it can be compared to and concatenated with lists, and
+    slicing it returns a list, but ``isinstance(..., list)`` is false for it.
+    """
+
+    def __init__(self, handlers: Iterable[RequestHandler] = ()) -> None:
+        self._rebuild(handlers)
+
+    def _rebuild(self, handlers: Iterable[RequestHandler]) -> None:
+        # the slot of each handler is its sequence number in the index
+        self._slots: list[RequestHandler | None] = list(handlers)
+        self._live = len(self._slots)
+        self._live_handlers: list[RequestHandler] | None = None
+        self._index = _HandlerIndex(self._slots)  # type: ignore[arg-type]
+
+    def _get_index(self) -> _HandlerIndex:
+        if self._index.stale:
+            self._rebuild(list(self))
+        return self._index
+
+    def _handlers(self) -> list[RequestHandler]:
+        if self._live == len(self._slots):
+            return self._slots  # type: ignore[return-value]
+        if self._live_handlers is None:
+            self._live_handlers = [handler for handler in self._slots if handler is not None]
+        return self._live_handlers
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __iter__(self) -> Iterator[RequestHandler]:
+        return (handler for handler in self._slots if handler is not None)
+
+    @overload
+    def __getitem__(self, index: int) -> RequestHandler: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[RequestHandler]: ...
+
+    def __getitem__(self, index: int | slice) -> RequestHandler | list[RequestHandler]:
+        return self._handlers()[index]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        handlers = list(self)
+        handlers[index] = value
+        self._rebuild(handlers)
+
+    def __delitem__(self, index: Any) -> None:
+        handlers = list(self)
+        del handlers[index]
+        self._rebuild(handlers)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, OneshotRequestHandlerList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __add__(self, other: Iterable[RequestHandler]) -> list[RequestHandler]:
+        if isinstance(other, (list, OneshotRequestHandlerList)):
+            return [*self, *other]
+        return NotImplemented
+
+    def __radd__(self, other: Iterable[RequestHandler]) -> list[RequestHandler]:
+        if isinstance(other, list):
+            return [*other, *self]
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return "{}({!r})".format(self.__class__.__name__, list(self))
+
+    def copy(self) -> list[RequestHandler]:
+        return list(self)
+
+    def insert(self, index: int, value: RequestHandler) -> None:
+        handlers = list(self)
+        handlers.insert(index, value)
+        self._rebuild(handlers)
+
+    def append(self, value: RequestHandler) -> None:
+        self._slots.append(value)
+        self._live += 1
+        self._live_handlers = None
+        self._index.add(value)
+
+    def remove(self, value: RequestHandler) -> None:
+        seq = self._get_index().discard(value)
+        if seq is None or seq >= len(self._slots) or self._slots[seq] is None:
+            raise ValueError("{!r} is not in the list".format(value))
+
+        self._slots[seq] = None
+        self._live -= 1
+        self._live_handlers = None
+        if len(self._slots) - self._live > max(self._live, 16):
+            self._rebuild([handler for handler in self._slots if handler is not None])
+
+    def clear(self) -> None:
+        self._rebuild(())
+
+    def reverse(self) -> None:
+        self._rebuild(reversed(list(self)))
+
+    def match(self, request: Request) -> RequestHandler | None:
+        """
+        Returns the first request handler which matches the specified request. Otherwise, it returns `None`.
+        """
+        for requesthandler in self._get_index().candidates(request):
+            if requesthandler.matcher.match(request):
+                return requesthandler
+        return None
+
+
+class _ListCompatibleDeque(deque[_T]):
+    """
+    Deque which can be compared to lists, and can be sliced and popped by index as
+    a list, so it can replace a list where the items are removed from the front.
+    """
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, list):
+            return list(self) == other
+        return super().__eq__(other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return "{}({!r})".format(self.__class__.__name__, list(self))
+
+    @overload  # type: ignore[override]
+    def __getitem__(self, index: SupportsIndex) -> _T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[_T]: ...
+
+    def __getitem__(self, index: SupportsIndex | slice) -> _T | list[_T]:
+        if isinstance(index, slice):
+            return list(self)[index]
+        return super().__getitem__(index)
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            items = list(self)
+            items[index] = value
+            self._replace(items)
+        else:
+            super().__setitem__(index, value)
+
+    def __delitem__(self, index: Any) -> None:
+        if isinstance(index, slice):
+            items = list(self)
+            del items[index]
+            self._replace(items)
+        else:
+            super().__delitem__(index)
+
+    def _replace(self, items: list[_T]) -> None:
+        super().clear()
+        super().extend(items)
+
+    def pop(self, index: SupportsIndex = -1) -> _T:  # type: ignore[override]
+        index = operator.index(index)
+        if index in (0, -len(self)):
+            return self.popleft()
+        if index in (-1, len(self) - 1):
+            return super().pop()
+        item = self[index]
+        del self[index]
+        return item
+
+    def sort(self, *, key: Callable[[_T], Any] | None = None, reverse: bool = False) -> None:
+        self._replace(sorted(self, key=key, reverse=reverse))  # type: ignore[type-var,arg-type]
+
+
+class OrderedRequestHandlerList(_ListCompatibleDeque[RequestHandler]):
+    """
+    Represents the list of ordered :py:class:`RequestHandler` objects.
+
+    The handlers are consumed from the front of the list, which takes constant
+    time as it is a :py:class:`collections.deque`. It can be compared to lists,
+    and it can be sliced and popped by index as a list.
+    """
+
+
+class HandlerType(Enum):
+    PERMANENT = "permanent"
+    ONESHOT = "oneshot"
+    ORDERED = "ordered"
+
+
+class ResponseSpec(TypedDict, total=False):
+    """
+    Static response of a :py:class:`RequestSpec`.
+
+    If ``json`` is specified, the response is created by ``respond_with_json()``,
+    otherwise by ``respond_with_data()``, the other keys are passed to these
+    methods as keyword arguments.
+    """
+
+    data: str | bytes
+    json: Any
+    status: int
+    headers: Mapping[str, str]
+    mimetype: str
+    content_type: str
+    conditional: bool
+    compress: bool | list[str]
+
+
+class _RequestSpecBase(TypedDict):
+    uri: str | URIPattern | Pattern[str]
+
+
+class RequestSpec(_RequestSpecBase, RequestMatcherKwargs, total=False):
+    """
+    Specification of a request handler for :py:meth:`HTTPServer.expect_requests`.
+
+    ``uri`` is required, the keys of :py:class:`RequestMatcherKwargs` specify the
+    matcher as in ``expect_request()``.
+    """
+
+    #: type of the handler, as a :py:class:`HandlerType` or its value (eg. ``"oneshot"``)
+    handler_type: HandlerType | str
+    #: static response of the handler, if not specified, the response should be
+    #: specified by calling one of the respond methods of the created handler
+    response: ResponseSpec
+
+
+# environ key of the file wrapper of the server, it is used by _FileResponse only,
+# as the wrapper writes the file to the socket ignoring the wrappers of the file
+# (such as the one of werkzeug.utils.send_file() serving ranges)
+_SOCKET_FILE_WRAPPER = "pytest_httpserver.socket_file_wrapper"
+
+
+class _SocketFileWrapper:
+    """
+    File wrapper of the server, sending the file directly to the socket.
+
+    The file is sent by :py:meth:`socket.socket.sendfile` on plain sockets, and
+    from a memory-mapped view on TLS sockets, so the content of the file is not
+    copied into python objects. The response must have a *Content-Length*
+    header, as the server does not know about the data sent this way.
+    """
+
+    def __init__(self, handler: _WSGIRequestHandler, file: IO[bytes], block_size: int = 8192) -> None:
+        self._handler = handler
+        self._file = file
+        self._block_size = block_size
+
+    def _fileno(self) -> int | None:
+        try:
+            return self._file.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return None
+
+    def _send_mapped(self, fileno: int) -> None:
+        size = os.fstat(fileno).st_size - self._file.tell()
+        if size <= 0:
+            return
+
+        offset = self._file.tell()
+        with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            for start in range(offset, offset + size, self._block_size):
+                with view[start : start + self._block_size] as chunk:
+                    self._handler.wfile.write(chunk)
+
+    def __iter__(self) -> Iterator[bytes]:
+        fileno = self._fileno()
+        if fileno is None:
+            yield from _iter_stream(self._file, self._block_size)
+            return
+
+        # the empty chunk makes the server send the status line and the headers
+        yield b""
+
+        connection = self._handler.connection
+        if isinstance(connection, ssl.SSLSocket):
+            self._send_mapped(fileno)
+        else:
+            connection.sendfile(self._file)  # type: ignore[arg-type]
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class KeepAliveSettings:
+    """Settings of the persistent (keep-alive) connections of the server
+
+    :param idle_timeout: time (in seconds) to wait for the next request on a connection
+        before closing it
+    :param max_requests: maximum number of requests served on a connection, after which
+        the connection is closed. `None` means no limit.
+    :param pipelining: whether to serve the requests which the client sent before receiving
+        the response of the previous request. When `False`, the connection is closed after
+        the response when such request is detected, so the client needs to re-send it on a
+        new connection.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float = 5,
+        max_requests: int | None = None,
+        pipelining: bool = True,  # noqa: FBT001
+    ) -> None:
+        if idle_timeout <= 0:
+            raise ValueError("idle_timeout must be positive")
+        if max_requests is not None and max_requests < 1:
+            raise ValueError("max_requests must be at least 1")
+        self.idle_timeout = idle_timeout
+        self.max_requests = max_requests
+        self.pipelining = pipelining
+
+
+class ConnectionStats:
+    """
+    Counters of a connection served with keep-alive enabled.
+
+    This class should not be instantiated directly, the instances are collected in
+    the :py:attr:`HTTPServerBase.connections` attribute of the server.
+
+    .. py:attribute:: client_address
+
+        The address of the client, as returned by :py:meth:`socket.socket.getpeername`.
+
+    .. py:attribute:: request_count
+
+        The number of requests served on the connection.
+
+    .. py:attribute:: closed
+
+        Whether the connection has been closed.
+    """
+
+    def __init__(self, client_address: Any) -> None:
+        self.client_address = client_address
+        self.request_count = 0
+        self.closed = False
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} client_address={self.client_address!r} "
+            f"request_count={self.request_count} closed={self.closed}>"
+        )
+
+
+class LogRetention(Enum):
+    """
+    Specifies which entries are kept when the log of the server reaches the limits
+    of its :py:class:`LogSettings`.
+
+    * ``FIRST``: the first entries are kept, and the new entries are discarded
+    * ``LAST``: the last entries are kept, and the oldest entries are evicted
+    """
+
+    FIRST = "first"
+    LAST = "last"
+
+
+class LogSettings:
+    """Settings of the retention of the log of the server
+
+    :param max_entries: the maximum number of entries kept in the log. `None` means
+        no limit.
+    :param max_body_bytes: the maximum total size of the bodies (of the requests and
+        the responses) kept in the log. The bodies of the streamed responses are not
+        counted. `None` means no limit.
+    :param keep: the :py:class:`LogRetention` (or its value) specifying which entries
+        are kept when a limit is reached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        max_body_bytes: int | None = None,
+        keep: LogRetention | str = LogRetention.LAST,
+    ) -> None:
+        if max_entries is not None and max_entries < 0:
+            raise ValueError("max_entries must not be negative")
+        if max_body_bytes is not None and max_body_bytes < 0:
+            raise ValueError("max_body_bytes must not be negative")
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self.keep = LogRetention(keep)
+
+
+class LogEvictionWarning(UserWarning):
+    """
+    Warning issued when the log is queried after some of its entries have been
+    evicted (or discarded) due to the limits of its :py:class:`LogSettings`, so the
+    result of the query may be incomplete.
+    """
+
+
+def _log_entry_size(entry: tuple[Request, Response]) -> int:
+    request, response = entry
+    size = len(request.get_data())
+    # the body of a streamed response is not read, as it would consume it
+    if isinstance(response, Response) and not response.is_streamed:
+        size += len(response.get_data())
+    return size
+
+
+class _WSGIRequestHandler(WSGIRequestHandler):
+    """
+    Request handler of the server, providing the file wrapper of :py:class:`_FileResponse`.
+
+    When keep-alive is enabled, the responses are framed by HTTP/1.1 rules and the
+    connection is kept open for the next request, which werkzeug does not support
+    (it closes each connection after the response).
+    """
+
+    connection: socket.socket
+    httpserver: HTTPServerBase | None = None
+    keep_alive: KeepAliveSettings | None = None
+    connection_stats: ConnectionStats | None = None
+
+    @classmethod
+    def configure(cls, httpserver: HTTPServerBase, *, threaded: bool) -> type[_WSGIRequestHandler]:
+        """
+        Return a subclass of the handler for the specified server.
+        """
+        keep_alive = httpserver.keep_alive
+        attrs = {
+            "httpserver": httpserver,
+            "keep_alive": keep_alive,
+            # the headers and the body are sent separately, which would be delayed on a persistent connection
+            "disable_nagle_algorithm": keep_alive is not None and httpserver.unix_socket is None,
+            # werkzeug sets it on the class for threaded servers if it's not set explicitly
+            "protocol_version": "HTTP/1.1" if threaded or keep_alive is not None else "HTTP/1.0",
+        }
+        return type(cls.__name__, (cls,), attrs)
+
+    def make_environ(self) -> WSGIEnvironment:
+        environ = super().make_environ()
+        environ[_SOCKET_FILE_WRAPPER] = partial(_SocketFileWrapper, self)
+        return environ
+
+    def setup(self) -> None:
+        super().setup()
+        if self.keep_alive is not None:
+            assert self.httpserver is not None
+            self.connection_stats = ConnectionStats(self.client_address)
+            self.httpserver.connections.append(self.connection_stats)
+
+    def finish(self) -> None:
+        try:
+            super().finish()
+        finally:
+            if self.connection_stats is not None:
+                self.connection_stats.closed = True
+
+    def handle_one_request(self) -> None:
+        if self.keep_alive is not None and not self._wait_for_request(self.keep_alive.idle_timeout):
+            self.close_connection = True
+            return
+        super().handle_one_request()
+
+    def _has_buffered_data(self) -> bool:
+        timeout = self.connection.gettimeout()
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))  # type: ignore[attr-defined]
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(timeout)
+
+    def _wait_for_request(self, timeout: float) -> bool:
+        if self._has_buffered_data():
+            return True
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.connection, selectors.EVENT_READ)
+            # it becomes readable when the server is shut down
+            wakeup_reader = getattr(self.server, "wakeup_reader", None)
+            if wakeup_reader is not None:
+                try:
+                    selector.register(wakeup_reader, selectors.EVENT_READ)
+                except (ValueError, OSError):
+                    # the server has been closed already
+                    return False
+            events = selector.select(timeout)
+        return any(key.fileobj is self.connection for key, _ in events)
+
+    def run_wsgi(self) -> None:
+        if self.keep_alive is None:
+            super().run_wsgi()
+            return
+        self._run_wsgi_keep_alive(self.keep_alive)
+
+    def _run_wsgi_keep_alive(self, keep_alive: KeepAliveSettings) -> None:
+        assert self.connection_stats is not None
+        self.connection_stats.request_count += 1
+
+        if self.headers.get("Expect", "").lower().strip(" \t") == "100-continue":
+            self.wfile.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+        self.environ = environ = self.make_environ()
+        if not environ.get("wsgi.input_terminated"):
+            # the unread part of the body must not be parsed as the next request
+            environ["wsgi.input"] = LimitedStream(self.rfile, get_content_length(environ) or 0)
+        request_input = environ["wsgi.input"]
+
+        # set by the request line and the Connection header of the request
+        close = self.close_connection or (
+            keep_alive.max_requests is not None and self.connection_stats.request_count >= keep_alive.max_requests
+        )
+        status_set: str | None = None
+        headers_set: list[tuple[str, str]] | None = None
+        headers_sent = False
+        chunk_response = False
+
+        def drain_request() -> None:
+            while request_input.read(DEFAULT_STREAM_CHUNK_SIZE):
+                pass
+
+        def write(data: bytes) -> None:
+            nonlocal headers_sent, chunk_response, close
+            assert status_set is not None, "write() before start_response"
+            assert headers_set is not None, "write() before start_response"
+            if not headers_sent:
+                headers_sent = True
+                drain_request()
+                code_str, _, msg = status_set.partition(" ")
+                code = int(code_str)
+                self.send_response(code, msg)
+                header_keys = set()
+                for key, value in headers_set:
+                    if key.lower() == "connection":
+                        close = close or value.lower() == "close"
+                        continue
+                    self.send_header(key, value)
+                    header_keys.add(key.lower())
+
+                if not (
+                    "content-length" in header_keys
+                    or environ["REQUEST_METHOD"] == "HEAD"
+                    or (100 <= code < 200)
+                    or code in {204, 304}
+                ):
+                    if self.request_version == "HTTP/1.1":
+                        chunk_response = True
+                        self.send_header("Transfer-Encoding", "chunked")
+                    else:
+                        # the end of the body is marked by closing the connection
+                        close = True
+
+                if not close and not keep_alive.pipelining and self._has_buffered_data():
+                    close = True
+
+                if close:
+                    self.send_header("Connection", "close")
+                elif self.request_version != "HTTP/1.1":
+                    self.send_header("Connection", "keep-alive")
+                self.end_headers()
+
+            if data:
+                if chunk_response:
+                    self.wfile.write(f"{len(data):x}\r\n".encode())
+                self.wfile.write(data)
+                if chunk_response:
+                    self.wfile.write(b"\r\n")
+
+            self.wfile.flush()
+
+        def start_response(
+            status: str, headers: list[tuple[str, str]], exc_info: Any = None
+        ) -> Callable[[bytes], None]:
+            nonlocal status_set, headers_set
+            if exc_info:
+                try:
+                    if headers_sent:
+                        raise exc_info[1].with_traceback(exc_info[2])
+                finally:
+                    exc_info = None
+            elif headers_set:
+                raise AssertionError("Headers already set")
+            status_set = status
+            headers_set = headers
+            return write
+
+        def execute(app: WSGIApplication) -> None:
+            application_iter = app(environ, start_response)
+            try:
+                for data in application_iter:
+                    write(data)
+                if not headers_sent:
+                    write(b"")
+                if chunk_response:
+                    self.wfile.write(b"0\r\n\r\n")
+                    self.wfile.flush()
+            finally:
+                if hasattr(application_iter, "close"):
+                    application_iter.close()
+
+        try:
+            execute(self.server.app)
+        except (ConnectionError, socket.timeout) as e:
+            close = True
+            self.connection_dropped(e, environ)
+        except Exception as e:
+            if self.server.passthrough_errors:
+                raise
+            close = True
+            with suppress(Exception):
+                # if the headers haven't been sent yet, they can be set again
+                if not headers_sent:
+                    status_set = None
+                    headers_set = None
+                    execute(InternalServerError())
+            self.server.log("error", "Error on request: %r", e)
+
+        self.close_connection = close
+
+
+class OverflowPolicy(Enum):
+    """
+    Specifies what happens to a new connection when all the workers of a
+    :py:class:`WorkerPool` are busy and its queue is full.
+
+    * ``BLOCK``: the server stops accepting new connections until there's room in the queue
+    * ``REJECT``: the server responds with *503 Service Unavailable* and closes the connection
+    * ``CLOSE``: the server closes the connection without responding
+    """
 
-        difference = self.difference(request)
-        return not difference
+    BLOCK = "block"
+    REJECT = "reject"
+    CLOSE = "close"
 
 
-class RequestHandlerBase(abc.ABC):
+class WorkerPool:
     """
-    Represents a :py:class:`RequestHandler` object providing a response for the corresponding request.
+    Fixed-size pool of worker threads serving the connections of the server.
+
+    The worker threads are started with the server, and they are re-used for the
+    connections instead of starting a new thread for each of them. When all the
+    workers are busy, the new connections are waiting in a queue, and when the
+    queue is full, the *overflow* policy decides what happens to them.
+
+    A worker serves a connection until it is closed, so a client keeping its
+    connection alive occupies a worker.
+
+    :param max_workers: the number of worker threads
+    :param queue_size: the maximum number of connections waiting for a free worker
+    :param overflow: the :py:class:`OverflowPolicy` (or its value, such as ``"reject"``)
+        applied to the new connections when the queue is full
+
+    .. py:attribute:: rejected_count
+
+        The number of connections rejected or closed because of the overflow policy.
     """
 
-    def respond_with_json(
+    def __init__(
         self,
-        response_json: Any,
-        status: int = HTTPStatus.OK.value,
-        headers: Mapping[str, str] | None = None,
-        content_type: str = "application/json",
+        max_workers: int = 8,
+        queue_size: int = 16,
+        overflow: OverflowPolicy | str = OverflowPolicy.BLOCK,
     ) -> None:
-        """
-        Prepares a response with a serialized JSON object.
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if queue_size < 0:
+            raise ValueError("queue_size must not be negative")
+
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.overflow = OverflowPolicy(overflow)
+        self.rejected_count = 0
+        self._tasks: deque[Callable[[], None]] = deque()
+        self._active = 0
+        self._generation = 0
+        self._running = False
+        self._condition = threading.Condition()
 
-        :param response_json: a JSON-serializable python object
-        :param status: the HTTP status of the response
-        :param headers: the HTTP headers to be sent (excluding the Content-Type header)
-        :param content_type: the content type header to be sent
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} max_workers={self.max_workers} queue_size={self.queue_size} "
+            f"overflow={self.overflow.value!r} active={self.active_count} queued={self.queued_count}>"
+        )
+
+    @property
+    def active_count(self) -> int:
+        """
+        The number of connections being served by the workers.
         """
+        return self._active
 
-        response_data = json.dumps(response_json, indent=4)
-        self.respond_with_data(response_data, status, headers, content_type=content_type)
+    @property
+    def queued_count(self) -> int:
+        """
+        The number of connections waiting for a free worker.
+        """
+        return len(self._tasks)
 
-    def respond_with_data(
-        self,
-        response_data: str | bytes = "",
-        status: int = HTTPStatus.OK.value,
-        headers: HEADERS_T | None = None,
-        mimetype: str | None = None,
-        content_type: str | None = None,
-    ) -> None:
+    def is_running(self) -> bool:
         """
-        Prepares a response with raw data.
+        Returns `True` when the worker threads are running, otherwise `False`.
+        """
+        return self._running
 
-        For detailed description please see the :py:class:`werkzeug.Response` object as the
-        parameters are analogue.
+    def start(self) -> None:
+        """
+        Start the worker threads.
 
-        :param response_data: a string or bytes object representing the body of the response
-        :param status: the HTTP status of the response
-        :param headers: the HTTP headers to be sent (excluding the Content-Type header)
-        :param content_type: the content type header to be sent
-        :param mimetype: the mime type of the request
+        This is called by the server when it is started.
         """
+        with self._condition:
+            if self._running:
+                raise HTTPServerError("Worker pool is already running")
+            self._running = True
+            self._generation += 1
+            generation = self._generation
+
+        for idx in range(self.max_workers):
+            thread = threading.Thread(
+                target=self._work,
+                args=(generation,),
+                name=f"{self.__class__.__name__}-{generation}-{idx}",
+                daemon=True,
+            )
+            thread.start()
 
-        self.respond_with_response(Response(response_data, status, headers, mimetype, content_type))
+    def shutdown(self) -> None:
+        """
+        Stop the worker threads.
 
-    @abc.abstractmethod
-    def respond_with_response(self, response: Response) -> None:
+        This is called by the server when it is stopped. The idle workers exit
+        immediately, the busy ones when they have finished serving their connection
+        and there are no more connections waiting in the queue. A :py:meth:`submit`
+        call waiting for room in the queue returns `False`.
         """
-        Prepares a response with the specified response object.
+        with self._condition:
+            self._running = False
+            self._generation += 1
+            self._condition.notify_all()
 
-        :param response: the response object which will be responded
+    def submit(self, task: Callable[[], None]) -> bool:
         """
+        Queue a task to be run by a worker.
 
+        When the queue is full, this method blocks until there's room in the queue
+        (or until the pool is shut down) if the overflow policy is ``BLOCK``,
+        otherwise it returns `False` without queueing the task.
 
-class RequestHandler(RequestHandlerBase):
+        :param task: the callable serving a connection
+        :return: `True` if the task has been queued
+        """
+        with self._condition:
+            while self._active + len(self._tasks) >= self.max_workers + self.queue_size:
+                if self.overflow is not OverflowPolicy.BLOCK:
+                    self.rejected_count += 1
+                    return False
+                if not self._running:
+                    return False
+                self._condition.wait()
+
+            self._tasks.append(task)
+            self._condition.notify_all()
+        return True
+
+    def _work(self, generation: int) -> None:
+        while True:
+            with self._condition:
+                while not self._tasks:
+                    if generation != self._generation:
+                        return
+                    self._condition.wait()
+                task = self._tasks.popleft()
+                self._active += 1
+
+            try:
+                task()
+            finally:
+                with self._condition:
+                    self._active -= 1
+                    self._condition.notify_all()
+
+
+class _WakeupServerMixin:
     """
-    Represents a response function and a :py:class:`RequestHandler` object.
+    Serve loop of the WSGI servers, waking up as soon as the server is shut down.
 
-    This class connects the matcher object with the function responsible for the response.
-    The respond handler function can be registered with the `respond_with_` methods.
+    The loop of :py:meth:`socketserver.BaseServer.serve_forever` checks whether the
+    server is shut down twice a second, so stopping a server took up to half a
+    second. This loop waits for the listening socket and for a socket which is
+    written by :py:meth:`shutdown` at the same time.
 
-    :param matcher: the matcher object
+    The :py:attr:`serving` event is set while the loop is running, so the server
+    can be waited for without sending a request to it.
+
+    The wakeup socket is not read by the loop, so it stays readable after shutdown,
+    and the connections waiting for their next request can also wait for it.
     """
 
-    def __init__(self, matcher: RequestMatcher) -> None:
-        self.matcher = matcher
-        self.request_handler: Callable[[Request], Response] | None = None
-        self._hooks: list[Callable[[Request, Response], Response]] = []
+    socket: socket.socket
 
-    def with_post_hook(self, hook: Callable[[Request, Response], Response]) -> RequestHandler:
-        self._hooks.append(hook)
-        return self
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._shutdown_requested = False
+        self._is_shut_down = threading.Event()
+        self._is_shut_down.set()
+        self.serving = threading.Event()
 
-    def respond(self, request: Request) -> Response:
-        """
-        Calls the request handler registered for this object.
+    def serve_forever(self, poll_interval: float = 0.5) -> None:  # noqa: ARG002
+        self._is_shut_down.clear()
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(self.socket, selectors.EVENT_READ)
+                selector.register(self.wakeup_reader, selectors.EVENT_READ)
+                self.serving.set()
+                while not self._shutdown_requested:
+                    for key, _ in selector.select():
+                        if key.fileobj is self.socket and not self._shutdown_requested:
+                            self._handle_request_noblock()  # type: ignore[attr-defined]
+                    self.service_actions()  # type: ignore[attr-defined]
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.serving.clear()
+            self.server_close()
+            self._shutdown_requested = False
+            self._is_shut_down.set()
 
-        If no response was specified previously, it raises
-        :py:class:`NoHandlerError` exception.
+    def shutdown(self) -> None:
+        self._shutdown_requested = True
+        with suppress(OSError):
+            self._wakeup_writer.send(b"\0")
+        self._is_shut_down.wait()
 
-        :param request: the incoming request object
-        :return: the response object
-        """
+    def server_close(self) -> None:
+        super().server_close()  # type: ignore[misc]
+        self.wakeup_reader.close()
+        self._wakeup_writer.close()
 
-        if self.request_handler is None:
-            raise NoHandlerError(
-                "Matching request handler found but no response defined: {} {}".format(request.method, request.path)
-            )
-        else:
-            response = self.request_handler(request)
 
-            for hook in self._hooks:
-                response = hook(request, response)
-            return response
+class _WSGIServer(_WakeupServerMixin, BaseWSGIServer):
+    pass
 
-    def respond_with_handler(self, func: Callable[[Request], Response]) -> None:
-        """
-        Registers the specified function as a responder.
 
-        The function will receive the request object and must return with the response object.
-        """
-        self.request_handler = func
+class _ThreadedWSGIServer(_WakeupServerMixin, ThreadedWSGIServer):
+    pass
 
-    def respond_with_response(self, response: Response) -> None:
-        self.request_handler = lambda request: response
 
-    def __repr__(self) -> str:
-        class_name = self.__class__.__name__
-        retval = (
-            f"<{class_name} uri={self.matcher.uri!r} method={self.matcher.method!r} "
-            f"query_string={self.matcher.query_string!r} headers={self.matcher.headers!r} data={self.matcher.data!r} "
-            f"json={self.matcher.json!r}>"
-        )
-        return retval
+_REJECT_RESPONSE = b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+_REJECT_LINGER_TIMEOUT = 0.5
 
 
-class RequestHandlerList(list[RequestHandler]):
+class _PooledWSGIServer(_WakeupServerMixin, BaseWSGIServer):
     """
-    Represents a list of :py:class:`RequestHandler` objects.
-
+    WSGI server serving the connections by the workers of a :py:class:`WorkerPool`.
     """
 
-    def match(self, request: Request) -> RequestHandler | None:
-        """
-        Returns the first request handler which matches the specified request. Otherwise, it returns `None`.
-        """
-        for requesthandler in self:
-            if requesthandler.matcher.match(request):
-                return requesthandler
-        return None
+    multithread = True
 
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        app: WSGIApplication,
+        worker_pool: WorkerPool,
+        handler: type[WSGIRequestHandler] | None = None,
+        ssl_context: SSLContext | None = None,
+    ) -> None:
+        super().__init__(host, port, app, handler, ssl_context=ssl_context)
+        self.worker_pool = worker_pool
+        self.worker_pool.start()
 
-class HandlerType(Enum):
-    PERMANENT = "permanent"
-    ONESHOT = "oneshot"
-    ORDERED = "ordered"
+    def process_request(self, request: Any, client_address: Any) -> None:
+        if self.worker_pool.submit(partial(self._serve_connection, request, client_address)):
+            return
+
+        if self.worker_pool.overflow is OverflowPolicy.REJECT:
+            self._reject(request)
+        self.shutdown_request(request)
+
+    def _serve_connection(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # noqa: BLE001
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    @staticmethod
+    def _reject(request: socket.socket) -> None:
+        with suppress(OSError):
+            request.sendall(_REJECT_RESPONSE)
+            # read what the client has sent, so closing the socket does not reset the connection
+            request.shutdown(socket.SHUT_WR)
+            request.settimeout(_REJECT_LINGER_TIMEOUT)
+            while request.recv(65536):
+                pass
+
+    def shutdown(self) -> None:
+        # the serve loop may be waiting for room in the queue of the pool
+        self.worker_pool.shutdown()
+        super().shutdown()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.worker_pool.shutdown()
 
 
 class HTTPServerBase(abc.ABC):  # pylint: disable=too-many-instance-attributes
     """
     Abstract HTTP server with error handling.
 
-    :param host: the host or IP where the server will listen
-    :param port: the TCP port where the server will listen
+    :param host: the host or IP where the server will listen, or ``unix://`` followed by
+        the path of a Unix domain socket
+    :param port: the TCP port where the server will listen (it is ignored for a Unix
+        domain socket)
     :param ssl_context: the ssl context object to use for https connections
     :param threaded: whether to handle concurrent requests in separate threads
+    :param engine: the :py:class:`ServerEngine` serving the requests, such as
+        :py:class:`AsyncioEngine`. By default, the werkzeug development server is used.
+        The *threaded* parameter has no effect when an engine is specified.
+    :param worker_pool: the :py:class:`WorkerPool` serving the connections, instead of
+        starting a new thread for each connection. It implies *threaded*, and it has
+        no effect when an engine is specified.
+    :param keep_alive: the :py:class:`KeepAliveSettings` of the persistent connections.
+        By default, the connections are closed after each response. It has no effect
+        when an engine is specified.
+    :param log_settings: the :py:class:`LogSettings` limiting the size of the log.
+        By default, the log is not limited.
 
     .. py:attribute:: log
 
         Attribute containing the list of two-element tuples. Each tuple contains
         :py:class:`werkzeug.Request` and :py:class:`werkzeug.Response` object which represents the
         incoming request and the outgoing response which happened during the lifetime
-        of the server.
+        of the server. When *log_settings* is specified, it is a
+        :py:class:`collections.deque` which can be indexed, sliced and compared as a
+        list, so the entries are evicted in constant time.
+
+    .. py:attribute:: log_evicted_count
+
+        Attribute containing the number of log entries evicted (or discarded) due to
+        the limits of the *log_settings* since the log was cleared.
+
+    .. py:attribute:: connections
+
+        Attribute containing the list of :py:class:`ConnectionStats` objects, one for
+        each connection accepted while keep-alive is enabled.
 
     .. py:attribute:: no_handler_status_code
 
@@ -660,6 +3353,10 @@ class HTTPServerBase(abc.ABC):  # pylint: disable=too-many-instance-attributes
         ssl_context: SSLContext | None = None,
         *,
         threaded: bool = False,
+        engine: ServerEngine | None = None,
+        worker_pool: WorkerPool | None = None,
+        keep_alive: KeepAliveSettings | None = None,
+        log_settings: LogSettings | None = None,
     ) -> None:
         """
         Initializes the instance.
@@ -667,11 +3364,21 @@ class HTTPServerBase(abc.ABC):  # pylint: disable=too-many-instance-attributes
         """
         self.host = host
         self.port = port
+        self.engine = engine
+        self.worker_pool = worker_pool
+        self.keep_alive = keep_alive
+        self.connections: list[ConnectionStats] = []
         self.server: BaseWSGIServer | None = None
         self.server_thread: threading.Thread | None = None
         self.assertions: list[str | AssertionError] = []
         self.handler_errors: list[Exception] = []
-        self.log: list[tuple[Request, Response]] = []
+        self.log_settings = log_settings
+        self.log: MutableSequence[tuple[Request, Response]] = self._new_log()
+        self.log_evicted_count = 0
+        self._log_body_bytes = 0
+        # the sizes of the log entries, kept only when the log is limited
+        self._log_sizes: deque[int] = deque()
+        self._log_lock = threading.Lock()
         self.ssl_context = ssl_context
         self.threaded = threaded
         self.no_handler_status_code = 500
@@ -689,6 +3396,7 @@ class HTTPServerBase(abc.ABC):  # pylint: disable=too-many-instance-attributes
         self.clear_assertions()
         self.clear_handler_errors()
         self.clear_log()
+        self.clear_connections()
         self.no_handler_status_code = 500
 
     def clear_assertions(self) -> None:
@@ -707,10 +3415,70 @@ class HTTPServerBase(abc.ABC):  # pylint: disable=too-many-instance-attributes
 
     def clear_log(self) -> None:
         """
-        Clears the list of log entries
+        Clears the list of log entries, and the counter of the evicted entries
+        """
+
+        with self._log_lock:
+            self.log = self._new_log()
+            self.log_evicted_count = 0
+            self._log_body_bytes = 0
+            self._log_sizes = deque()
+
+    def _new_log(self) -> MutableSequence[tuple[Request, Response]]:
+        # a limited log evicts its first entries, which takes constant time with a deque
+        if self.log_settings is None:
+            return []
+        return _ListCompatibleDeque()
+
+    def add_log_entry(self, request: Request, response: Response) -> None:
+        """
+        Add an entry to the log, evicting (or discarding) entries when the limits of
+        the *log_settings* are reached.
+
+        :param request: the request object from the werkzeug library
+        :param response: the response object sent to the client
+        """
+        entry = (request, response)
+        settings = self.log_settings
+        if settings is None:
+            self.log.append(entry)
+            return
+
+        size = _log_entry_size(entry)
+        with self._log_lock:
+            log = self.log
+            if not isinstance(log, deque):
+                # the log has been replaced by a list (or the settings have been set later)
+                log = self.log = _ListCompatibleDeque(log)
+            if len(self._log_sizes) != len(log):
+                # the entries have been modified outside of this method
+                self._log_sizes = deque(map(_log_entry_size, log))
+                self._log_body_bytes = sum(self._log_sizes)
+
+            log.append(entry)
+            self._log_sizes.append(size)
+            self._log_body_bytes += size
+            while log and self._exceeds_log_limits(settings):
+                # the new entry is discarded when the first entries are kept
+                if settings.keep is LogRetention.FIRST:
+                    log.pop()
+                    self._log_body_bytes -= self._log_sizes.pop()
+                else:
+                    log.popleft()
+                    self._log_body_bytes -= self._log_sizes.popleft()
+                self.log_evicted_count += 1
+
+    def _exceeds_log_limits(self, settings: LogSettings) -> bool:
+        if settings.max_entries is not None and len(self.log) > settings.max_entries:
+            return True
+        return settings.max_body_bytes is not None and self._log_body_bytes > settings.max_body_bytes
+
+    def clear_connections(self) -> None:
+        """
+        Clears the list of connection counters
         """
 
-        self.log = []
+        self.connections = []
 
     def url_for(self, suffix: str) -> str:
         """
@@ -737,10 +3505,47 @@ class HTTPServerBase(abc.ABC):  # pylint: disable=too-many-instance-attributes
         else:
             protocol = "https"
 
+        if self.unix_socket is not None:
+            # the host of the url is sent in the Host header only
+            return "{}://{}{}".format(protocol, UNIX_SOCKET_URL_HOST, suffix)
+
         host = self.format_host(self.host)
 
         return "{}://{}:{}{}".format(protocol, host, self.port, suffix)
 
+    @property
+    def unix_socket(self) -> str | None:
+        """
+        The path of the Unix domain socket where the server listens, when its host is
+        specified as ``unix://`` followed by the path, otherwise `None`.
+        """
+        if not self.host.startswith(UNIX_SOCKET_PREFIX):
+            return None
+        return self.host.removeprefix(UNIX_SOCKET_PREFIX)
+
+    def unix_url_for(self, suffix: str) -> str:
+        """
+        Return an url for a given suffix, addressing the Unix domain socket of the server.
+
+        The url has the form of ``http+unix://$PATH/$SUFFIX``, where $PATH is the
+        percent-encoded path of the socket, which is understood by clients such as
+        *requests-unixsocket*. Clients connecting to the socket by themselves (such as
+        *httpx* with its ``uds`` parameter) can use :py:meth:`url_for`.
+
+        :param suffix: the suffix which will be added to the base url. It can start with ``/`` (slash) or
+            not, the url will be the same.
+        :return: the full url which refers to the server
+        :raises HTTPServerError: when the server is not listening on a Unix domain socket
+        """
+        if self.unix_socket is None:
+            raise HTTPServerError("Server is not listening on a Unix domain socket")
+
+        if not suffix.startswith("/"):
+            suffix = "/" + suffix
+
+        protocol = "http+unix" if self.ssl_context is None else "https+unix"
+        return "{}://{}{}".format(protocol, urllib.parse.quote(self.unix_socket, safe=""), suffix)
+
     def create_matcher(self, *args: Any, **kwargs: Any) -> RequestMatcher:
         """
         Creates a :py:class:`.RequestMatcher` instance with the specified parameters.
@@ -763,6 +3568,8 @@ class HTTPServerBase(abc.ABC):  # pylint: disable=too-many-instance-attributes
         """
         Returns `True` when the server is running, otherwise `False`.
         """
+        if self.engine is not None:
+            return self.engine.is_running()
         return bool(self.server)
 
     def start(self) -> None:
@@ -786,13 +3593,24 @@ class HTTPServerBase(abc.ABC):  # pylint: disable=too-many-instance-attributes
 
         app = Request.application(self.application)
 
-        self.server = make_server(
-            self.host,
-            self.port,
-            app,
-            ssl_context=self.ssl_context,
-            threaded=self.threaded,
-        )
+        if self.engine is not None:
+            self.engine.start(self.host, self.port, app, self.ssl_context)
+            self.port = self.engine.port  # Update port (needed if `port` was set to 0)
+            return
+
+        handler = _WSGIRequestHandler.configure(self, threaded=self.threaded or self.worker_pool is not None)
+        if self.worker_pool is not None:
+            self.server = _PooledWSGIServer(
+                self.host,
+                self.port,
+                app,
+                self.worker_pool,
+                handler=handler,
+                ssl_context=self.ssl_context,
+            )
+        else:
+            server_class = _ThreadedWSGIServer if self.threaded else _WSGIServer
+            self.server = server_class(self.host, self.port, app, handler, ssl_context=self.ssl_context)
 
         self.port = self.server.port  # Update port (needed if `port` was set to 0)
         # Explicitly make the new thread daemonic to avoid shutdown issues
@@ -803,20 +3621,32 @@ class HTTPServerBase(abc.ABC):  # pylint: disable=too-many-instance-attributes
         """
         Stop the running server.
 
-        Notifies the server thread about the intention of the stopping, and the thread will
-        terminate itself. This needs about 0.5 seconds in worst case.
+        Notifies the server thread about the intention of the stopping, and waits until the
+        thread terminates itself. The thread is woken up immediately, so this returns as soon
+        as the request being served (if any) is finished.
 
         Only a running server can be stopped. If the sever is not running, :py:class`HTTPServerError`
         will be raised.
         """
-        assert self.server is not None
-        assert self.server_thread is not None
         if not self.is_running():
             raise HTTPServerError("Server is not running")
+        if self.engine is not None:
+            self.engine.stop()
+            self._remove_unix_socket()
+            return
+        assert self.server is not None
+        assert self.server_thread is not None
         self.server.shutdown()
         self.server_thread.join()
         self.server = None
         self.server_thread = None
+        self._remove_unix_socket()
+
+    def _remove_unix_socket(self) -> None:
+        # the socket file is left behind by werkzeug
+        if self.unix_socket is not None:
+            with suppress(FileNotFoundError):
+                os.unlink(self.unix_socket)
 
     def add_assertion(self, obj: str | AssertionError) -> None:
         """
@@ -898,8 +3728,9 @@ class HTTPServerBase(abc.ABC):  # pylint: disable=too-many-instance-attributes
         :return: the response object what the dispatch returned
         """
         request.get_data()
+        RequestCache.attach(request)
         response = self.dispatch(request)
-        self.log.append((request, response))
+        self.add_log_entry(request, response)
         return response
 
     def __enter__(self) -> Self:
@@ -923,7 +3754,6 @@ class HTTPServerBase(abc.ABC):  # pylint: disable=too-many-instance-attributes
         Provide the context API
 
         It stops the server if the server is running.
-        Please note that depending on the internal things of werkzeug, it may take 0.5 seconds.
         """
         if self.is_running():
             self.stop()
@@ -951,8 +3781,10 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
     """
     Server instance which manages handlers to serve pre-defined requests.
 
-    :param host: the host or IP where the server will listen
-    :param port: the TCP port where the server will listen
+    :param host: the host or IP where the server will listen, or ``unix://`` followed by
+        the path of a Unix domain socket, such as ``unix:///tmp/server.sock``
+    :param port: the TCP port where the server will listen (it is ignored for a Unix
+        domain socket)
     :param ssl_context: the ssl context object to use for https connections
 
     :param default_waiting_settings: the waiting settings object to use as default settings for :py:meth:`wait` context
@@ -960,9 +3792,39 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
 
     :param threaded: whether to handle concurrent requests in separate threads
 
-    :param startup_timeout: maximum time in seconds to wait for server readiness.
+    :param startup_timeout: maximum time in seconds to wait for server readiness,
+        that is, for the thread of the server to enter its serve loop.
         By default, no readiness check is performed.
 
+    :param readiness_probe: whether to also check that the server accepts
+        connections, by connecting to it, when the server is started. It has no effect
+        without *startup_timeout*.
+
+    :param engine: the :py:class:`ServerEngine` serving the requests, such as
+        :py:class:`AsyncioEngine`. By default, the werkzeug development server is used.
+        The *threaded* parameter has no effect when an engine is specified.
+
+    :param worker_pool: the :py:class:`WorkerPool` serving the connections, instead of
+        starting a new thread for each connection. It implies *threaded*, and it has
+        no effect when an engine is specified.
+
+    :param keep_alive: the :py:class:`KeepAliveSettings` of the persistent connections.
+        By default, the connections are closed after each response. It has no effect
+        when an engine is specified, and it is not supported with *processes*.
+
+    :param log_settings: the :py:class:`LogSettings` limiting the size of the log.
+        By default, the log is not limited.
+
+    :param processes: the number of worker processes serving the requests. When it
+        is greater than 1, the handlers registered before the server is started are
+        sent to the worker processes, which listen on the same port. Only permanent
+        handlers which can be pickled are supported in this mode, and it is not
+        supported with *ssl_context*, *engine*, *worker_pool* and *keep_alive*.
+
+    :param json_dumps: the JSON serializer used by the ``respond_with_json`` methods of
+        the handlers created by this server, such as :py:data:`JSON_DUMPS_COMPACT`.
+        By default, :py:data:`JSON_DUMPS_INDENTED` is used.
+
     .. py:attribute:: no_handler_status_code
 
         Attribute containing the http status code (int) which will be the response
@@ -982,14 +3844,37 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
         *,
         threaded: bool = False,
         startup_timeout: float | None = None,
+        readiness_probe: bool = False,
+        json_dumps: JSON_DUMPS_T | None = None,
+        engine: ServerEngine | None = None,
+        worker_pool: WorkerPool | None = None,
+        processes: int = 1,
+        keep_alive: KeepAliveSettings | None = None,
+        log_settings: LogSettings | None = None,
     ) -> None:
         """
         Initializes the instance.
         """
-        super().__init__(host, port, ssl_context, threaded=threaded)
+        super().__init__(
+            host,
+            port,
+            ssl_context,
+            threaded=threaded,
+            engine=engine,
+            worker_pool=worker_pool,
+            keep_alive=keep_alive,
+            log_settings=log_settings,
+        )
 
-        self.ordered_handlers: list[RequestHandler] = []
-        self.oneshot_handlers = RequestHandlerList()
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        self.processes = processes
+        self._worker_processes: WorkerProcesses | None = None
+
+        # guards the handler lists, which are consumed by the threads serving the requests
+        self._handlers_lock = threading.RLock()
+        self.ordered_handlers = OrderedRequestHandlerList()
+        self.oneshot_handlers = OneshotRequestHandlerList()
         self.handlers = RequestHandlerList()
         self.permanently_failed = False
         if default_waiting_settings is not None:
@@ -999,31 +3884,131 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
         self._waiting_settings = copy(self.default_waiting_settings)
         self._waiting_result: queue.LifoQueue[bool] = queue.LifoQueue(maxsize=1)
         self.startup_timeout = startup_timeout
-        self._readiness_check_pending = False
+        self.readiness_probe = readiness_probe
+        self.json_dumps = json_dumps
+
+    def _process_worker_reports(self) -> None:
+        worker_processes = self.__dict__.get("_worker_processes")
+        if worker_processes is not None:
+            worker_processes.process_reports()
+
+    # the reports of the worker processes are processed when these are accessed
+
+    @property  # type: ignore[override]
+    def log(self) -> MutableSequence[tuple[Request, Response]]:
+        self._process_worker_reports()
+        return self._log
+
+    @log.setter
+    def log(self, value: MutableSequence[tuple[Request, Response]]) -> None:
+        self._log = value
+
+    @property  # type: ignore[override]
+    def assertions(self) -> list[str | AssertionError]:
+        self._process_worker_reports()
+        return self._assertions
+
+    @assertions.setter
+    def assertions(self, value: list[str | AssertionError]) -> None:
+        self._assertions = value
+
+    @property  # type: ignore[override]
+    def handler_errors(self) -> list[Exception]:
+        self._process_worker_reports()
+        return self._handler_errors
+
+    @handler_errors.setter
+    def handler_errors(self, value: list[Exception]) -> None:
+        self._handler_errors = value
+
+    def clear_assertions(self) -> None:
+        self._process_worker_reports()
+        super().clear_assertions()
+
+    def clear_handler_errors(self) -> None:
+        self._process_worker_reports()
+        super().clear_handler_errors()
+
+    def clear_log(self) -> None:
+        self._process_worker_reports()
+        super().clear_log()
+
+    def is_running(self) -> bool:
+        return self._worker_processes is not None or super().is_running()
 
     def start(self) -> None:
+        if self.processes > 1:
+            self._start_worker_processes()
+            return
+
         super().start()
-        self._readiness_check_pending = self.startup_timeout is not None
         try:
             self.wait_for_server_ready()
         except Exception:
             self.stop()
             raise
 
+    def _start_worker_processes(self) -> None:
+        if self.is_running():
+            raise HTTPServerError("Server is already running")
+        if self.engine is not None or self.worker_pool is not None or self.keep_alive is not None:
+            raise HTTPServerError("Worker processes do not support engine, worker_pool and keep_alive")
+        if self.unix_socket is not None:
+            raise HTTPServerError("Worker processes do not support Unix domain sockets")
+
+        from .multiprocess import WorkerProcesses  # noqa: PLC0415
+
+        worker_processes = WorkerProcesses(self, self.processes)
+        worker_processes.start()
+        self._worker_processes = worker_processes
+        self.port = worker_processes.port
+
+    def stop(self) -> None:
+        if self._worker_processes is not None:
+            self._worker_processes.stop()
+            self._worker_processes = None
+            return
+
+        super().stop()
+
+    def _connect(self, timeout: float) -> socket.socket:
+        if self.unix_socket is None:
+            return socket.create_connection((self.host, self.port), timeout=timeout)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout)
+            sock.connect(self.unix_socket)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def _check_registration(self) -> None:
+        if self._worker_processes is not None:
+            raise HTTPServerError("Handlers can't be registered while the worker processes are running")
+
     def wait_for_server_ready(self) -> None:
         """
         Waits until the server is ready to serve requests.
+
+        The listening socket is already bound when the server is started, so this waits
+        until the thread of the server enters its serve loop (engines are ready when
+        they are started). When *readiness_probe* is set, it also connects to the server.
+
+        No request is sent to the server, so the log and the handlers are not affected.
         """
-        if not self._readiness_check_pending:
+        if self.startup_timeout is None:
             return
 
-        url = self.url_for("/")
-        if not url.startswith(("http://", "https://")):
-            raise ValueError(f"Invalid URL generated for readiness check : {url}")  # noqa: EM102
+        if isinstance(self.server, _WakeupServerMixin) and not self.server.serving.wait(self.startup_timeout):
+            raise HTTPServerError(f"Server is not ready in {self.startup_timeout} seconds")
 
-        with urllib.request.urlopen(url, timeout=self.startup_timeout) as resp:  # noqa: S310
-            if resp.status != HTTPStatus.OK.value or resp.read() != b"OK":
-                raise HTTPServerError("Readiness check failed with status code: {}".format(resp.status))
+        if self.readiness_probe:
+            try:
+                self._connect(self.startup_timeout).close()
+            except OSError as err:
+                raise HTTPServerError(f"Readiness probe failed: {err}") from err
 
     def clear(self) -> None:
         """
@@ -1041,9 +4026,19 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
         Clears all types of the handlers (ordered, oneshot, permanent)
         """
 
-        self.ordered_handlers = []
-        self.oneshot_handlers = RequestHandlerList()
-        self.handlers = RequestHandlerList()
+        with self._handlers_lock:
+            self.ordered_handlers = OrderedRequestHandlerList()
+            self.oneshot_handlers = OneshotRequestHandlerList()
+            self.handlers = RequestHandlerList()
+
+    def _register_handler(self, request_handler: RequestHandler, handler_type: HandlerType) -> None:
+        with self._handlers_lock:
+            if handler_type == HandlerType.PERMANENT:
+                self.handlers.append(request_handler)
+            elif handler_type == HandlerType.ONESHOT:
+                self.oneshot_handlers.append(request_handler)
+            elif handler_type == HandlerType.ORDERED:
+                self.ordered_handlers.append(request_handler)
 
     def expect(self, matcher: RequestMatcher, handler_type: HandlerType = HandlerType.PERMANENT) -> RequestHandler:
         """
@@ -1052,13 +4047,10 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
         :param matcher: :py:class:`RequestMatcher` used to match requests.
         :param handler_type: type of handler
         """
-        request_handler = RequestHandler(matcher)
-        if handler_type == HandlerType.PERMANENT:
-            self.handlers.append(request_handler)
-        elif handler_type == HandlerType.ONESHOT:
-            self.oneshot_handlers.append(request_handler)
-        elif handler_type == HandlerType.ORDERED:
-            self.ordered_handlers.append(request_handler)
+        self._check_registration()
+        matcher.compile()
+        request_handler = RequestHandler(matcher, self.json_dumps)
+        self._register_handler(request_handler, handler_type)
         return request_handler
 
     def expect_request(
@@ -1125,6 +4117,7 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
         Parameters `json` and `data` are mutually exclusive.
         """
 
+        self._check_registration()
         matcher = self.create_matcher(
             uri,
             method=method.upper(),
@@ -1135,13 +4128,9 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
             header_value_matcher=header_value_matcher,
             json=json,
         )
-        request_handler = RequestHandler(matcher)
-        if handler_type == HandlerType.PERMANENT:
-            self.handlers.append(request_handler)
-        elif handler_type == HandlerType.ONESHOT:
-            self.oneshot_handlers.append(request_handler)
-        elif handler_type == HandlerType.ORDERED:
-            self.ordered_handlers.append(request_handler)
+        matcher.compile()
+        request_handler = RequestHandler(matcher, self.json_dumps)
+        self._register_handler(request_handler, handler_type)
         return request_handler
 
     def expect_oneshot_request(
@@ -1254,6 +4243,59 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
             json=json,
         )
 
+    def expect_requests(self, specs: Iterable[RequestSpec]) -> list[RequestHandler]:
+        """
+        Create and register request handlers in a batch.
+
+        This is the bulk version of :py:meth:`expect_request`: each spec is a dict
+        containing the ``uri`` and the keyword arguments of ``expect_request()``,
+        including ``handler_type``. If the spec has a ``response`` key, the static
+        response it specifies is also registered (see :py:class:`ResponseSpec`).
+
+        The handlers are registered when all the specs have been processed, so
+        either all of them are registered or none if a spec is invalid.
+
+        Specs can be loaded from files by :py:func:`pytest_httpserver.specs.load_json_specs` and
+        :py:func:`pytest_httpserver.specs.load_jsonl_specs`.
+
+        :param specs: an iterable of :py:class:`RequestSpec` dicts
+        :return: the created handlers, in the order of the specs
+        :raises ValueError: when the uri is missing from a spec or the handler type is invalid
+        """
+
+        self._check_registration()
+        created: list[RequestHandler] = []
+        batches: dict[HandlerType, list[RequestHandler]] = {handler_type: [] for handler_type in HandlerType}
+
+        for spec in specs:
+            kwargs: dict[str, Any] = dict(spec)
+            if "uri" not in kwargs:
+                raise ValueError("Request spec has no uri: {!r}".format(spec))
+
+            uri = kwargs.pop("uri")
+            handler_type = HandlerType(kwargs.pop("handler_type", HandlerType.PERMANENT))
+            response = kwargs.pop("response", None)
+            kwargs["method"] = kwargs.get("method", METHOD_ALL).upper()
+
+            matcher = self.create_matcher(uri, **kwargs)
+            matcher.compile()
+            request_handler = RequestHandler(matcher, self.json_dumps)
+            if response is not None:
+                response_kwargs = dict(response)
+                if "json" in response_kwargs:
+                    request_handler.respond_with_json(response_kwargs.pop("json"), **response_kwargs)
+                else:
+                    request_handler.respond_with_data(response_kwargs.pop("data", ""), **response_kwargs)
+
+            created.append(request_handler)
+            batches[handler_type].append(request_handler)
+
+        with self._handlers_lock:
+            self.handlers.extend(batches[HandlerType.PERMANENT])
+            self.oneshot_handlers.extend(batches[HandlerType.ONESHOT])
+            self.ordered_handlers.extend(batches[HandlerType.ORDERED])
+        return created
+
     def format_matchers(self) -> str:
         """
         Return a string representation of the matchers
@@ -1264,7 +4306,7 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
         This method is primarily used when reporting errors.
         """
 
-        def format_handlers(handlers: list[RequestHandler]) -> list[str]:
+        def format_handlers(handlers: Sequence[RequestHandler]) -> list[str]:
             if handlers:
                 return ["    {!r}".format(handler.matcher) for handler in handlers]
             else:
@@ -1324,38 +4366,59 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
         :param request: the request object from the werkzeug library
         :return: the response object what the handler responded, or a response which contains the error
         """
-        if self._readiness_check_pending:
-            self._readiness_check_pending = False
+        handler = self._find_handler(request)
+        if isinstance(handler, Response):
+            return handler
+
+        with self._collect_handler_errors():
+            response = handler.respond(request)
+
+        return _to_response(response)
+
+    def _find_handler(self, request: Request) -> RequestHandler | Response:
+        """
+        Find the handler of the request, or return the error response when there's no handler.
+        """
+        with self._handlers_lock:
+            handler = self._consume_handler(request)
+            if handler is None:
+                # the index is built while no handlers are registered, and new handlers
+                # can be added to it while the permanent handlers are evaluated
+                self.handlers._get_index()  # noqa: SLF001
+
+        if handler is None:
+            handler = self.handlers.match(request)
 
-            return Response(HTTPStatus.OK.phrase, status=HTTPStatus.OK.value)
+        if not handler:
+            return self.respond_nohandler(request)
+
+        return handler
 
+    def _consume_handler(self, request: Request) -> RequestHandler | Response | None:
+        # the ordered and oneshot handlers are looked up and removed atomically
         if self.permanently_failed:
             return self.respond_permanent_failure()
 
-        handler = None
         if self.ordered_handlers:
             handler = self.ordered_handlers[0]
             if not handler.matcher.match(request):
                 self.permanently_failed = True
-                response = self.respond_nohandler(request)
-                return response
+                return self.respond_nohandler(request)
 
-            self.ordered_handlers.pop(0)
+            self.ordered_handlers.popleft()
             self._update_waiting_result()
+            return handler
 
-        if not handler:
-            handler = self.oneshot_handlers.match(request)
-            if handler:
-                self.oneshot_handlers.remove(handler)
-                self._update_waiting_result()
-            else:
-                handler = self.handlers.match(request)
-
-            if not handler:
-                return self.respond_nohandler(request)
+        handler = self.oneshot_handlers.match(request)
+        if handler:
+            self.oneshot_handlers.remove(handler)
+            self._update_waiting_result()
+        return handler
 
+    @contextmanager
+    def _collect_handler_errors(self) -> Iterator[None]:
         try:
-            response = handler.respond(request)
+            yield
         except Error:
             # don't collect package-internal errors
             raise
@@ -1366,13 +4429,6 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
             self.handler_errors.append(e)
             raise
 
-        if response is None:
-            response = Response("")
-        if isinstance(response, str):
-            response = Response(response)
-
-        return response
-
     def _set_waiting_result(self, value: bool) -> None:  # noqa: FBT001
         """Set waiting_result
 
@@ -1450,24 +4506,43 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
         """
         Queries log for matching requests.
 
+        When some entries have been evicted from the log due to the *log_settings*,
+        a :py:class:`LogEvictionWarning` is issued as the matching requests may
+        be incomplete.
 
         :param matcher: the matcher object to match requests
         :return: an iterator with request-response pair from the log
         """
 
-        for request, response in self.log:
-            if matcher.match(request):
-                yield (request, response)
+        self._warn_log_evicted()
+        return ((request, response) for request, response in self.log if matcher.match(request))
 
     def get_matching_requests_count(self, matcher: RequestMatcher) -> int:
         """
         Queries the log for matching requests, returning the number of log
         entries matching for the specified matcher.
 
+        When some entries have been evicted from the log due to the *log_settings*,
+        a :py:class:`LogEvictionWarning` is issued as the number may be lower than
+        the number of the matching requests made.
+
         :param matcher: the matcher object to match requests
         :return: the number of log entries matching
         """
-        return len(list(self.iter_matching_requests(matcher)))
+        self._warn_log_evicted()
+        return self._count_matching_requests(matcher)
+
+    def _count_matching_requests(self, matcher: RequestMatcher) -> int:
+        return sum(1 for request, _ in self.log if matcher.match(request))
+
+    def _log_evicted_message(self) -> str:
+        return f"{self.log_evicted_count} log entries have been evicted due to the log settings"
+
+    def _warn_log_evicted(self) -> None:
+        if self.log_evicted_count:
+            message = f"{self._log_evicted_message()}, some matching requests may be missing"
+            # reported at the caller of the public query method
+            warnings.warn(message, LogEvictionWarning, stacklevel=3)
 
     def assert_request_made(self, matcher: RequestMatcher, *, count: int = 1) -> None:
         """
@@ -1477,14 +4552,21 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
         (including zero, which asserts that no requests made for the given
         matcher).
 
+        When some entries have been evicted from the log due to the *log_settings*,
+        the matching requests may be missing from the log: in this case a
+        :py:class:`LogEvictionWarning` is issued when the assertion succeeds, and
+        the message of the assertion mentions it when it fails.
+
         :param matcher: the matcher object to match requests
         :param count: the expected number of matches in the log
         :return: ``None`` if the assert succeeded, raises
             :py:class:`AssertionError` if not.
         """
 
-        matching_count = self.get_matching_requests_count(matcher)
-        if matching_count != count:
+        matching_count = self._count_matching_requests(matcher)
+        if matching_count == count:
+            self._warn_log_evicted()
+        else:
             similar_requests: list[Request] = []
             for request, _ in self.log:
                 if request.path == matcher.uri:
@@ -1512,6 +4594,9 @@ class HTTPServer(HTTPServerBase):  # pylint: disable=too-many-instance-attribute
             else:
                 assert_msg_lines.append("No similar requests found.")
 
+            if self.log_evicted_count:
+                assert_msg_lines.append(f"Note: {self._log_evicted_message()}, the result may be affected.")
+
             assert_msg = "\n".join(assert_msg_lines) + "\n"
 
             assert matching_count == count, assert_msg
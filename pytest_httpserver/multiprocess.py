@@ -0,0 +1,300 @@
+"""
+Multi-process mode of :py:class:`HTTPServer`.
+
+In this mode the requests are served by worker processes listening on the same
+port (using ``SO_REUSEPORT``), each of them having a snapshot of the handlers
+registered before the server was started. The log entries, the assertions and the
+handler errors of the workers are sent to the server before the response is sent
+to the client, without waiting for the server. They are processed when the log,
+the assertions or the handler errors of the server are accessed, so they can be
+checked in the same way as in the single-process mode.
+"""
+
+from __future__ import annotations
+
+import io
+import multiprocessing
+import pickle
+import socket
+import threading
+import time
+from contextlib import suppress
+from multiprocessing.connection import wait
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import NamedTuple
+
+from werkzeug import Request
+from werkzeug import Response
+from werkzeug.serving import BaseWSGIServer
+from werkzeug.serving import get_sockaddr
+from werkzeug.serving import select_address_family
+
+from .httpserver import HTTPServer
+from .httpserver import HTTPServerError
+from .httpserver import RequestCache
+from .httpserver import RequestHandler
+from .httpserver import _WSGIRequestHandler
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+    from .httpserver import JSON_DUMPS_T
+
+WORKER_STARTUP_TIMEOUT = 60
+
+# environ, request body, status, headers, response body
+_LogEntry = tuple[dict[str, Any], bytes, str, list[tuple[str, str]], bytes]
+
+
+class _Snapshot(NamedTuple):
+    handlers: list[RequestHandler]
+    no_handler_status_code: int
+    json_dumps: JSON_DUMPS_T | None
+
+
+def _picklable(obj: Any) -> Any:
+    try:
+        pickle.dumps(obj)
+    except Exception:  # noqa: BLE001
+        return HTTPServerError(f"{obj!r} (raised in a worker process)")
+    return obj
+
+
+def _serialize_log_entry(request: Request, response: Response) -> _LogEntry:
+    environ = {
+        key: value for key, value in request.environ.items() if isinstance(value, (str, bytes, int, float, tuple))
+    }
+    # the body of a streamed response is sent to the client only after the log entry
+    response_body = b"" if response.is_streamed else response.get_data()
+    return environ, request.get_data(), response.status, response.headers.to_wsgi_list(), response_body
+
+
+def _deserialize_log_entry(entry: _LogEntry) -> tuple[Request, Response]:
+    environ, body, status, headers, response_body = entry
+    environ["wsgi.input"] = io.BytesIO(body)
+    environ["CONTENT_LENGTH"] = str(len(body))
+    request = Request(environ)
+    request.get_data()
+    RequestCache.attach(request)
+    return request, Response(response_body, status, headers)
+
+
+class _ReusePortWSGIServer(BaseWSGIServer):
+    def server_bind(self) -> None:
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+class _WorkerHTTPServer(HTTPServer):
+    """
+    Server of a worker process, reporting its state to the parent after each request.
+    """
+
+    def __init__(self, conn: Connection, snapshot: _Snapshot) -> None:
+        super().__init__(json_dumps=snapshot.json_dumps)
+        self.no_handler_status_code = snapshot.no_handler_status_code
+        self.handlers.extend(snapshot.handlers)
+        self._conn = conn
+
+    def application(self, request: Request) -> Response:
+        try:
+            return super().application(request)
+        finally:
+            self._report()
+
+    def _report(self) -> None:
+        report = (
+            [_serialize_log_entry(request, response) for request, response in self.log],
+            [_picklable(assertion) for assertion in self.assertions],
+            [_picklable(error) for error in self.handler_errors],
+        )
+        self.clear_log()
+        self.clear_assertions()
+        self.clear_handler_errors()
+
+        # the report is in the pipe by the time the client gets the response, and the
+        # parent reads it from there when its log or its errors are accessed
+        self._conn.send(report)
+
+
+def _serve_worker(conn: Connection, host: str, port: int, snapshot: bytes) -> None:
+    try:
+        server = _WorkerHTTPServer(conn, pickle.loads(snapshot))  # noqa: S301
+        wsgi_server = _ReusePortWSGIServer(
+            host,
+            port,
+            Request.application(server.application),
+            handler=_WSGIRequestHandler,
+        )
+    except BaseException as err:  # noqa: BLE001
+        conn.send(_picklable(err))
+        return
+
+    conn.send(None)
+    wsgi_server.serve_forever()
+
+
+class WorkerProcesses:
+    """
+    Worker processes serving the requests of a :py:class:`HTTPServer`.
+
+    This class should not be instantiated directly, it is created by the server
+    when its ``processes`` parameter is greater than 1.
+
+    :param server: the server whose handlers are served, and which receives the
+        log entries, assertions and handler errors of the workers
+    :param processes: the number of worker processes
+    """
+
+    def __init__(self, server: HTTPServer, processes: int) -> None:
+        self.server = server
+        self.processes = processes
+        self.port = server.port
+        self._port_socket: socket.socket | None = None
+        self._workers: list[tuple[BaseProcess, Connection]] = []
+        self._receiver: threading.Thread | None = None
+        self._reports: list[bytes] = []
+        self._reports_lock = threading.RLock()
+        self._processing = False
+
+    def _snapshot(self) -> bytes:
+        server = self.server
+        if server.oneshot_handlers or server.ordered_handlers:
+            raise HTTPServerError("Oneshot and ordered handlers are not supported by worker processes")
+
+        for handler in server.handlers:
+            try:
+                pickle.dumps(handler)
+            except Exception as err:
+                raise HTTPServerError(f"Handler can't be sent to the worker processes: {handler!r}") from err
+
+        return pickle.dumps(_Snapshot(list(server.handlers), server.no_handler_status_code, server.json_dumps))
+
+    def _reserve_port(self) -> None:
+        # the socket is bound but not listening, so it does not receive connections
+        family = select_address_family(self.server.host, self.port)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            sock.bind(get_sockaddr(self.server.host, self.port, family))
+        except BaseException:
+            sock.close()
+            raise
+        self._port_socket = sock
+        self.port = sock.getsockname()[1]
+
+    def start(self) -> None:
+        """
+        Start the worker processes and wait until all of them are listening.
+        """
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise HTTPServerError("Worker processes require SO_REUSEPORT, which is not supported on this platform")
+        if self.server.ssl_context is not None:
+            raise HTTPServerError("Worker processes do not support ssl_context")
+
+        snapshot = self._snapshot()
+        self._reserve_port()
+
+        context = multiprocessing.get_context("spawn")
+        for _ in range(self.processes):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_serve_worker,
+                args=(child_conn, self.server.host, self.port, snapshot),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._workers.append((process, parent_conn))
+
+        try:
+            self._wait_for_workers()
+        except BaseException:
+            self.stop()
+            raise
+
+        self._receiver = threading.Thread(target=self._receive_reports, daemon=True)
+        self._receiver.start()
+
+    def _wait_for_workers(self) -> None:
+        deadline = time.monotonic() + WORKER_STARTUP_TIMEOUT
+        for _, conn in self._workers:
+            try:
+                if not conn.poll(max(deadline - time.monotonic(), 0)):
+                    raise HTTPServerError("Timed out waiting for the worker processes to start")
+                error = conn.recv()
+            except EOFError:
+                raise HTTPServerError("Worker process exited while starting") from None
+
+            if error is not None:
+                raise HTTPServerError(f"Worker process failed to start: {error!r}") from error
+
+    def _read_reports(self, conn: Connection) -> None:
+        # the reports are only read here, so the pipes of the workers don't fill up
+        while conn.poll():
+            self._reports.append(conn.recv_bytes())
+
+    def _receive_reports(self) -> None:
+        connections = [conn for _, conn in self._workers]
+        while connections:
+            for conn in wait(connections):
+                with self._reports_lock:
+                    try:
+                        self._read_reports(conn)
+                    except (EOFError, OSError):
+                        connections.remove(conn)
+
+    def process_reports(self) -> None:
+        """
+        Add the log entries, the assertions and the handler errors reported by the
+        workers to the server.
+
+        This is called by the server when its log, assertions or handler errors are
+        accessed. The reports of the requests which have been responded are in the
+        pipes of the workers already, so they are read here if they have not been
+        read yet.
+        """
+        with self._reports_lock:
+            if self._processing:
+                # the server is accessed while the reports are processed
+                return
+
+            self._processing = True
+            try:
+                for _, conn in self._workers:
+                    with suppress(EOFError, OSError):
+                        self._read_reports(conn)
+
+                reports, self._reports = self._reports, []
+                for report in reports:
+                    log, assertions, handler_errors = pickle.loads(report)  # noqa: S301
+                    for entry in log:
+                        self.server.add_log_entry(*_deserialize_log_entry(entry))
+                    self.server.assertions.extend(assertions)
+                    self.server.handler_errors.extend(handler_errors)
+            finally:
+                self._processing = False
+
+    def stop(self) -> None:
+        """
+        Terminate the worker processes.
+        """
+        for process, _ in self._workers:
+            process.terminate()
+        for process, _ in self._workers:
+            process.join()
+
+        if self._receiver is not None:
+            self._receiver.join()
+            self._receiver = None
+
+        self.process_reports()
+        for _, conn in self._workers:
+            conn.close()
+        self._workers = []
+
+        if self._port_socket is not None:
+            self._port_socket.close()
+            self._port_socket = None
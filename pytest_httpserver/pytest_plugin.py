@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import json
 import os
 from typing import TYPE_CHECKING
 
 import pytest
 
+from .async_httpserver import AsyncHTTPServer
 from .httpserver import HTTPServer
+from .httpserver import UNIX_SOCKET_PREFIX
+from .tls import TLSCertificates
+from .tls import get_tls_certificates
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
     from collections.abc import Generator
+    from pathlib import Path
     from ssl import SSLContext
 
 
@@ -26,19 +33,103 @@ class PluginHTTPServer(HTTPServer):
         Plugin.SERVER = None
 
 
+MAX_PORT = 65535
+
+#: the name of the file the port map is published in, in the base temporary directory of the session
+PORT_MAP_FILE_NAME = "pytest-httpserver-ports.json"
+
+#: the environment variable containing the path of the published port map
+PORT_MAP_FILE_ENV = "PYTEST_HTTPSERVER_PORT_MAP_FILE"
+
+
+def get_xdist_worker_index() -> int | None:
+    """
+    Returns the index of the pytest-xdist worker running the tests (e.g. 3 for
+    ``gw3``), or `None` when the tests are not run by pytest-xdist workers.
+    """
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+    if not worker_id:
+        return None
+    return int(worker_id.removeprefix("gw"))
+
+
+def _worker_port(base_port: int, worker_index: int) -> int:
+    port = base_port + worker_index
+    if port > MAX_PORT:
+        raise ValueError(f"Port of worker gw{worker_index} is out of range: {port}")
+    return port
+
+
+def _worker_unix_socket(host: str, worker_index: int) -> str:
+    root, ext = os.path.splitext(host)
+    return f"{root}.gw{worker_index}{ext}"
+
+
 def get_httpserver_listen_address() -> tuple[str | None, int | None]:
     listen_host = os.environ.get("PYTEST_HTTPSERVER_HOST")
     listen_port_str = os.environ.get("PYTEST_HTTPSERVER_PORT")
     listen_port: int | None = int(listen_port_str) if listen_port_str else None
 
+    # each pytest-xdist worker listens on its own port, counted from the specified one
+    worker_index = get_xdist_worker_index()
+    if listen_port and worker_index is not None:
+        listen_port = _worker_port(listen_port, worker_index)
+    # or on its own socket file, named after the specified one
+    if listen_host and listen_host.startswith(UNIX_SOCKET_PREFIX) and worker_index is not None:
+        listen_host = _worker_unix_socket(listen_host, worker_index)
+
     return listen_host, listen_port
 
 
+def get_httpserver_port_map() -> dict[str, int]:
+    """
+    Returns the ports of the session servers by the ids of the pytest-xdist
+    workers (``"master"`` when the tests are not run by pytest-xdist).
+
+    The ports are known only when ``PYTEST_HTTPSERVER_PORT`` is set, otherwise an
+    empty dict is returned.
+    """
+    listen_port_str = os.environ.get("PYTEST_HTTPSERVER_PORT")
+    if not listen_port_str:
+        return {}
+
+    base_port = int(listen_port_str)
+    worker_count_str = os.environ.get("PYTEST_XDIST_WORKER_COUNT")
+    if not worker_count_str:
+        return {"master": base_port}
+
+    return {f"gw{index}": _worker_port(base_port, index) for index in range(int(worker_count_str))}
+
+
+def publish_httpserver_port_map(directory: Path) -> Path:
+    """
+    Writes the ports returned by :py:func:`get_httpserver_port_map` into the
+    ``pytest-httpserver-ports.json`` file of the directory, so the processes
+    which can't call the function (such as the ones not written in Python) can
+    read them.
+
+    :param directory: the directory to write the file into
+    :return: the path of the file written
+    """
+    path = directory / PORT_MAP_FILE_NAME
+    path.write_text(json.dumps(get_httpserver_port_map()))
+    return path
+
+
 @pytest.fixture(scope="session")
 def httpserver_listen_address() -> tuple[str | None, int | None]:
     return get_httpserver_listen_address()
 
 
+@pytest.fixture(scope="session")
+def httpserver_port_map(tmp_path_factory: pytest.TempPathFactory) -> Generator[dict[str, int], None, None]:
+    # the map is published for the processes started by the tests
+    path = publish_httpserver_port_map(tmp_path_factory.getbasetemp())
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv(PORT_MAP_FILE_ENV, str(path))
+        yield get_httpserver_port_map()
+
+
 @pytest.fixture(scope="session")
 def httpserver_ssl_context() -> None:
     return None
@@ -113,3 +204,60 @@ def httpserver_ipv6(make_httpserver_ipv6: HTTPServer) -> HTTPServer:
     server = make_httpserver_ipv6
     server.clear()
     return server
+
+
+@pytest.fixture(scope="session")
+def httpsserver_certificates(
+    request: pytest.FixtureRequest,
+    tmp_path_factory: pytest.TempPathFactory,
+) -> TLSCertificates:
+    cache = getattr(request.config, "cache", None)
+    if cache is not None:
+        directory = cache.mkdir("pytest-httpserver") / "tls"
+    else:
+        # the cache provider plugin is disabled, so the certificates are kept for the session only
+        directory = tmp_path_factory.getbasetemp() / "pytest-httpserver-tls"
+    return get_tls_certificates(directory)
+
+
+@pytest.fixture(scope="session")
+def httpsserver_ssl_context(httpsserver_certificates: TLSCertificates) -> SSLContext:
+    return httpsserver_certificates.server_context()
+
+
+@pytest.fixture(scope="session")
+def httpsserver_ca_bundle(httpsserver_certificates: TLSCertificates) -> str:
+    return httpsserver_certificates.ca_bundle
+
+
+@pytest.fixture(scope="session")
+def make_httpsserver(
+    httpsserver_ssl_context: SSLContext,
+) -> Generator[HTTPServer, None, None]:
+    server = HTTPServer(host="localhost", port=0, ssl_context=httpsserver_ssl_context)
+    server.start()
+    yield server
+    server.clear()
+    if server.is_running():
+        server.stop()
+
+
+@pytest.fixture
+def httpsserver(make_httpsserver: HTTPServer) -> HTTPServer:
+    server = make_httpsserver
+    server.clear()
+    return server
+
+
+try:
+    import pytest_asyncio  # type: ignore[import-not-found]
+except ImportError:
+    pass
+else:
+
+    @pytest_asyncio.fixture
+    async def async_httpserver(
+        httpserver_ssl_context: SSLContext | None,
+    ) -> AsyncGenerator[AsyncHTTPServer, None]:
+        async with AsyncHTTPServer(ssl_context=httpserver_ssl_context) as server:
+            yield server
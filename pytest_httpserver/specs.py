@@ -0,0 +1,76 @@
+"""
+Loaders of request specs for :py:meth:`pytest_httpserver.HTTPServer.expect_requests`.
+
+A spec file describes request handlers and their static responses, for example::
+
+    [
+        {"uri": "/users", "method": "GET", "response": {"json": []}},
+        {"uri": "/users", "method": "POST", "handler_type": "oneshot", "response": {"status": 201}}
+    ]
+
+The keys of the specs are described in :py:class:`pytest_httpserver.httpserver.RequestSpec`.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Any
+
+if TYPE_CHECKING:
+    import os
+
+    from .httpserver import RequestSpec
+
+
+def _check_spec(spec: Any, location: str) -> RequestSpec:
+    if not isinstance(spec, dict):
+        raise ValueError("Request spec must be an object, got {} at {}".format(type(spec).__name__, location))
+    return spec  # type: ignore[return-value]
+
+
+def load_json_specs(path: str | os.PathLike[str]) -> list[RequestSpec]:
+    """
+    Loads request specs from a JSON file containing a list of specs.
+
+    :param path: path of the JSON file
+    :return: the list of the specs loaded
+    :raises ValueError: when the file is not a valid JSON or it does not contain a list of objects
+    """
+
+    path = Path(path)
+    with path.open(encoding="utf-8") as infile:
+        specs = json.load(infile)
+
+    if not isinstance(specs, list):
+        raise ValueError("Request spec file must contain a list: {}".format(path))
+
+    return [_check_spec(spec, "{}[{}]".format(path, idx)) for idx, spec in enumerate(specs)]
+
+
+def load_jsonl_specs(path: str | os.PathLike[str]) -> list[RequestSpec]:
+    """
+    Loads request specs from a JSON lines file, containing one spec per line.
+
+    Empty lines are ignored.
+
+    :param path: path of the JSON lines file
+    :return: the list of the specs loaded
+    :raises ValueError: when a line is not a valid JSON or it is not an object
+    """
+
+    path = Path(path)
+    specs: list[RequestSpec] = []
+    with path.open(encoding="utf-8") as infile:
+        for lineno, line in enumerate(infile, start=1):
+            if not line.strip():
+                continue
+            location = "{}:{}".format(path, lineno)
+            try:
+                spec = json.loads(line)
+            except json.JSONDecodeError as err:
+                raise ValueError("Invalid JSON at {}: {}".format(location, err)) from err
+            specs.append(_check_spec(spec, location))
+
+    return specs
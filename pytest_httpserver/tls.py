@@ -0,0 +1,282 @@
+"""
+Certificates for running an HTTPS server.
+
+The certificates are generated by the ``openssl`` command line tool, and they are
+kept in a directory, so they are generated only when they are missing or about to
+expire, and the tests don't pay for the key generation on every run.
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import json
+import os
+import secrets
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextlib import suppress
+from pathlib import Path
+
+from .httpserver import HTTPServerError
+
+__all__ = ["TLSCertificates", "get_tls_certificates"]
+
+#: the names which the server certificate is valid for
+TLS_HOSTNAMES = ("localhost", "127.0.0.1", "::1")
+
+#: the number of days the generated certificates are valid for
+TLS_CERTIFICATE_DAYS = 825
+
+# certificates expiring in less than this (in seconds) are generated again
+_EXPIRY_MARGIN = 24 * 60 * 60
+
+# the expiry and the hostnames of the certificates, so they are checked without openssl
+_METADATA_FILE = "certificates.json"
+
+_CA_CONFIG = """\
+[req]
+distinguished_name = dn
+prompt = no
+x509_extensions = ext
+
+[dn]
+CN = pytest-httpserver test CA
+
+[ext]
+basicConstraints = critical, CA:TRUE
+keyUsage = critical, keyCertSign, cRLSign
+subjectKeyIdentifier = hash
+"""
+
+_SERVER_CONFIG = """\
+[req]
+distinguished_name = dn
+prompt = no
+
+[dn]
+CN = {common_name}
+"""
+
+_SERVER_EXTENSIONS = """\
+basicConstraints = critical, CA:FALSE
+keyUsage = critical, digitalSignature, keyEncipherment
+extendedKeyUsage = serverAuth
+subjectAltName = {alt_names}
+subjectKeyIdentifier = hash
+authorityKeyIdentifier = keyid, issuer
+"""
+
+
+class TLSCertificates:
+    """
+    Paths of a test CA and a server certificate issued by it.
+
+    This class should not be instantiated directly, it is returned by
+    :py:func:`get_tls_certificates`.
+
+    :param directory: the directory containing the files
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    @property
+    def ca_bundle(self) -> str:
+        """
+        Path of the certificate of the CA in PEM format, which can be passed to the
+        clients to verify the server (such as the ``verify`` parameter of *requests*
+        or the ``cafile`` parameter of :py:func:`ssl.create_default_context`).
+        """
+        return str(self.directory / "ca.crt")
+
+    @property
+    def server_cert(self) -> str:
+        """
+        Path of the server certificate in PEM format.
+        """
+        return str(self.directory / "server.crt")
+
+    @property
+    def server_key(self) -> str:
+        """
+        Path of the private key of the server certificate in PEM format.
+        """
+        return str(self.directory / "server.key")
+
+    def server_context(self) -> ssl.SSLContext:
+        """
+        Create a server side ssl context loaded with the server certificate.
+
+        Session tickets and the session cache of the server are enabled, so the
+        clients can resume their sessions without a full handshake. The sessions
+        can be resumed only by the context which created them, so the context
+        should be created once and re-used for the servers.
+        """
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.server_cert, self.server_key)
+        context.options &= ~ssl.OP_NO_TICKET
+        # the session cache of the server is enabled by OpenSSL by default
+        return context
+
+    def client_context(self) -> ssl.SSLContext:
+        """
+        Create a client side ssl context trusting the CA.
+        """
+        return ssl.create_default_context(cafile=self.ca_bundle)
+
+    def is_valid(self) -> bool:
+        """
+        Return whether the certificates exist, they were issued for the
+        :py:data:`TLS_HOSTNAMES`, and they don't expire in a day.
+        """
+        try:
+            metadata = json.loads(self.directory.joinpath(_METADATA_FILE).read_text())
+        except (OSError, ValueError):
+            return False
+
+        return (
+            metadata.get("hostnames") == list(TLS_HOSTNAMES)
+            and metadata.get("not_after", 0) - _EXPIRY_MARGIN > time.time()
+            and all(os.path.exists(path) for path in (self.ca_bundle, self.server_cert, self.server_key))
+        )
+
+
+def _run_openssl(*args: str, cwd: Path) -> subprocess.CompletedProcess[str]:
+    openssl = shutil.which("openssl")
+    if openssl is None:
+        raise HTTPServerError("The openssl command is required for generating the certificates")
+    return subprocess.run([openssl, *args], cwd=cwd, capture_output=True, text=True, check=False)  # noqa: S603
+
+
+def _alt_names(hostnames: tuple[str, ...]) -> str:
+    names = []
+    for hostname in hostnames:
+        try:
+            ipaddress.ip_address(hostname)
+        except ValueError:
+            names.append(f"DNS:{hostname}")
+        else:
+            names.append(f"IP:{hostname}")
+    return ", ".join(names)
+
+
+def _generate(directory: Path) -> None:
+    directory.joinpath("ca.cnf").write_text(_CA_CONFIG)
+    directory.joinpath("server.cnf").write_text(_SERVER_CONFIG.format(common_name=TLS_HOSTNAMES[0]))
+    directory.joinpath("server.ext").write_text(_SERVER_EXTENSIONS.format(alt_names=_alt_names(TLS_HOSTNAMES)))
+
+    # elliptic curve keys are generated much faster than rsa keys
+    key_options = ["-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1", "-nodes"]
+    days = ["-days", str(TLS_CERTIFICATE_DAYS)]
+    commands = [
+        ["req", "-x509", *key_options, "-keyout", "ca.key", "-out", "ca.crt", "-config", "ca.cnf", *days],
+        ["req", "-new", *key_options, "-keyout", "server.key", "-out", "server.csr", "-config", "server.cnf"],
+        ["x509", "-req", "-in", "server.csr", "-CA", "ca.crt", "-CAkey", "ca.key", "-out", "server.crt", *days],
+    ]
+    commands[2] += ["-set_serial", str(secrets.randbits(63)), "-extfile", "server.ext"]
+
+    not_after = time.time() + TLS_CERTIFICATE_DAYS * 24 * 60 * 60
+    for command in commands:
+        result = _run_openssl(*command, cwd=directory)
+        if result.returncode != 0:
+            raise HTTPServerError(f"Generating the certificates failed: {result.stderr.strip()}")
+
+    metadata = {"hostnames": list(TLS_HOSTNAMES), "not_after": not_after}
+    directory.joinpath(_METADATA_FILE).write_text(json.dumps(metadata))
+
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_file(fd: int) -> None:
+        # msvcrt can only wait for a lock for a few seconds, so it is polled
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            except OSError:
+                time.sleep(0.1)
+            else:
+                return
+
+else:
+    import fcntl
+
+    def _lock_file(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    # the lock is released when the file is closed, also when the process is killed
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        _lock_file(fd)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _replace_directory(generated: Path, certificates: TLSCertificates) -> None:
+    # the invalid directory is moved aside by an atomic rename first, so the
+    # directory removed is the one moved aside by this process, not the
+    # certificates put in place by another process
+    stale = Path(tempfile.mkdtemp(prefix=".tls-stale-", dir=generated.parent))
+    try:
+        with suppress(FileNotFoundError):
+            certificates.directory.rename(stale / certificates.directory.name)
+
+        try:
+            generated.rename(certificates.directory)
+        except OSError:
+            # another process has put its certificates in place in the meantime
+            if not certificates.is_valid():
+                raise
+    finally:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def get_tls_certificates(directory: str | os.PathLike[str]) -> TLSCertificates:
+    """
+    Return a test CA and a server certificate issued by it for ``localhost``,
+    ``127.0.0.1`` and ``::1``, generating them when they are missing from the
+    directory or they are about to expire.
+
+    The certificates are generated into a temporary directory which is then
+    renamed, so the processes using the same directory concurrently (such as the
+    workers of pytest-xdist) don't see the files half-written. The certificates
+    are checked again and generated while holding a lock on the
+    ``.<directory name>.lock`` file next to the directory, so only one of the
+    processes generates them and the others use the certificates it generated.
+
+    :param directory: the directory where the certificates are kept. It is created
+        when it does not exist.
+    :return: the paths of the certificates
+    :raises HTTPServerError: when the certificates can't be generated, for example
+        because the ``openssl`` command is not available
+    """
+    certificates = TLSCertificates(Path(directory))
+    if certificates.is_valid():
+        return certificates
+
+    parent = certificates.directory.parent
+    parent.mkdir(parents=True, exist_ok=True)
+
+    with _locked(parent / f".{certificates.directory.name}.lock"):
+        # another process may have generated the certificates while waiting for the lock
+        if certificates.is_valid():
+            return certificates
+
+        generated = Path(tempfile.mkdtemp(prefix=".tls-", dir=parent))
+        try:
+            _generate(generated)
+            _replace_directory(generated, certificates)
+        finally:
+            shutil.rmtree(generated, ignore_errors=True)
+
+    return certificates
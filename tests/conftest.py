@@ -4,6 +4,7 @@ import pytest
 def pytest_addoption(parser):
     parser.addoption("--ssl", action="store_true", default=False, help="run ssl tests")
     parser.addoption("--release", action="store_true", default=False, help="run release tests")
+    parser.addoption("--benchmark", action="store_true", default=False, help="run benchmarks")
 
 
 def pytest_runtest_setup(item):
@@ -15,3 +16,5 @@ def pytest_runtest_setup(item):
         pytest.skip()
     if not item.config.getoption("--release") and "release" in markers:
         pytest.skip()
+    if not item.config.getoption("--benchmark") and "benchmark" in markers:
+        pytest.skip()
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+import requests
+from werkzeug import Request
+from werkzeug import Response
+
+from pytest_httpserver import AsyncHTTPServer
+
+pytest.importorskip("pytest_asyncio")
+
+
+@pytest.mark.asyncio
+async def test_async_handler(async_httpserver: AsyncHTTPServer):
+    released = asyncio.Event()
+
+    async def handler(_request: Request) -> Response:
+        # the handler runs on the event loop of the test, so it can await anything
+        await released.wait()
+        return Response("OK")
+
+    async_httpserver.expect_request("/foobar").respond_with_handler(handler)
+
+    # the client is run in a thread here, an async client can be awaited directly
+    response = asyncio.create_task(asyncio.to_thread(requests.get, async_httpserver.url_for("/foobar")))
+    released.set()
+
+    assert (await response).text == "OK"
+    async_httpserver.check_assertions()
@@ -0,0 +1,25 @@
+from collections.abc import Iterable
+
+import pytest
+import requests
+
+from pytest_httpserver import AsyncioEngine
+from pytest_httpserver import HTTPServer
+
+
+@pytest.fixture(scope="session")
+def make_httpserver() -> Iterable[HTTPServer]:
+    server = HTTPServer(engine=AsyncioEngine())
+    server.start()
+    yield server
+    server.clear()
+    if server.is_running():
+        server.stop()
+
+
+def test_load(httpserver: HTTPServer):
+    httpserver.expect_request("/foobar").respond_with_json({"foo": "bar"})
+
+    with requests.Session() as session:
+        for _ in range(100):
+            assert session.get(httpserver.url_for("/foobar")).json() == {"foo": "bar"}
@@ -0,0 +1,12 @@
+import requests
+
+from pytest_httpserver import HTTPServer
+
+
+def test_compression(httpserver: HTTPServer):
+    httpserver.expect_request("/report").respond_with_json({"rows": list(range(1000))}, compress=["gzip"])
+
+    response = requests.get(httpserver.url_for("/report"), headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.json() == {"rows": list(range(1000))}
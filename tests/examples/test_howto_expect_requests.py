@@ -0,0 +1,15 @@
+import requests
+
+from pytest_httpserver import HTTPServer
+
+
+def test_expect_requests(httpserver: HTTPServer):
+    httpserver.expect_requests(
+        [
+            {"uri": "/users", "method": "GET", "response": {"json": ["john", "jane"]}},
+            {"uri": "/users", "method": "POST", "handler_type": "oneshot", "response": {"status": 201}},
+        ]
+    )
+
+    assert requests.get(httpserver.url_for("/users")).json() == ["john", "jane"]
+    assert requests.post(httpserver.url_for("/users")).status_code == 201
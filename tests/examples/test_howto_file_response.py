@@ -0,0 +1,16 @@
+from pathlib import Path
+
+import requests
+
+from pytest_httpserver import HTTPServer
+
+
+def test_file_response(httpserver: HTTPServer, tmp_path: Path):
+    artifact = tmp_path / "artifact.zip"
+    artifact.write_bytes(b"PK" + bytes(1024))
+
+    httpserver.expect_request("/download/artifact.zip").respond_with_file(artifact)
+
+    response = requests.get(httpserver.url_for("/download/artifact.zip"))
+    assert response.headers["Content-Type"] == "application/zip"
+    assert response.content == artifact.read_bytes()
@@ -0,0 +1,10 @@
+import requests
+
+from pytest_httpserver import HTTPServer
+
+
+def test_https(httpsserver: HTTPServer, httpsserver_ca_bundle: str):
+    httpsserver.expect_request("/foobar").respond_with_data("OK")
+
+    response = requests.get(httpsserver.url_for("/foobar"), verify=httpsserver_ca_bundle)
+    assert response.text == "OK"
@@ -0,0 +1,18 @@
+import requests
+
+from pytest_httpserver import JSON_DUMPS_COMPACT
+from pytest_httpserver import HTTPServer
+
+
+def test_json_response(httpserver: HTTPServer):
+    httpserver.expect_request("/compact").respond_with_json({"foo": [1, 2]}, json_dumps=JSON_DUMPS_COMPACT)
+    httpserver.expect_request("/dynamic").respond_with_dynamic_json(lambda request: {"path": request.path})
+
+    assert requests.get(httpserver.url_for("/compact")).text == '{"foo":[1,2]}'
+    assert requests.get(httpserver.url_for("/dynamic")).json() == {"path": "/dynamic"}
+
+
+def test_server_wide_serializer():
+    with HTTPServer(json_dumps=JSON_DUMPS_COMPACT) as server:
+        server.expect_request("/foo").respond_with_json({"foo": "bar"})
+        assert requests.get(server.url_for("/foo")).text == '{"foo":"bar"}'
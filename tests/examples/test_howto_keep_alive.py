@@ -0,0 +1,18 @@
+import requests
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import KeepAliveSettings
+
+
+def test_connection_reuse():
+    keep_alive = KeepAliveSettings(idle_timeout=5, max_requests=100)
+    with HTTPServer(keep_alive=keep_alive, threaded=True) as httpserver:
+        httpserver.expect_request("/foobar").respond_with_data("OK")
+
+        with requests.Session() as session:
+            for _ in range(3):
+                assert session.get(httpserver.url_for("/foobar")).text == "OK"
+
+        # all the requests were sent on the same connection
+        assert len(httpserver.connections) == 1
+        assert httpserver.connections[0].request_count == 3
@@ -0,0 +1,17 @@
+import requests
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import LogSettings
+
+
+def test_log_retention():
+    # keep the last 100 requests, with at most 1 MiB of bodies
+    log_settings = LogSettings(max_entries=100, max_body_bytes=1024 * 1024, keep="last")
+    with HTTPServer(log_settings=log_settings) as httpserver:
+        httpserver.expect_request("/foobar").respond_with_data("OK")
+
+        for _ in range(150):
+            requests.get(httpserver.url_for("/foobar"))
+
+        assert len(httpserver.log) == 100
+        assert httpserver.log_evicted_count == 50
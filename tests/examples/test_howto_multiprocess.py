@@ -0,0 +1,26 @@
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import RequestMatcher
+
+
+@pytest.fixture(scope="module")
+def upstream() -> Iterable[HTTPServer]:
+    server = HTTPServer(processes=4)
+    # handlers need to be registered before the server is started
+    server.expect_request("/items").respond_with_json({"items": [1, 2, 3]})
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_concurrent_clients(upstream: HTTPServer):
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        responses = list(executor.map(requests.get, [upstream.url_for("/items")] * 100))
+
+    assert all(response.json() == {"items": [1, 2, 3]} for response in responses)
+    upstream.assert_request_made(RequestMatcher("/items"), count=100)
@@ -0,0 +1,15 @@
+import requests
+from werkzeug import Request
+from werkzeug import Response
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import PathTemplate
+
+
+def test_path_template(httpserver: HTTPServer):
+    def handler(request: Request, user_id: str, order_id: int) -> Response:
+        return Response(f"order #{order_id} of {user_id}")
+
+    httpserver.expect_request(PathTemplate("/users/{user_id}/orders/{order_id:int}")).respond_with_handler(handler)
+
+    assert requests.get(httpserver.url_for("/users/john/orders/42")).text == "order #42 of john"
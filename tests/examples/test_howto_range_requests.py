@@ -0,0 +1,15 @@
+import requests
+
+from pytest_httpserver import HTTPServer
+
+
+def test_range_requests(httpserver: HTTPServer):
+    httpserver.expect_request("/download").respond_with_data(b"0123456789", conditional=True)
+
+    response = requests.get(httpserver.url_for("/download"), headers={"Range": "bytes=5-"})
+    assert response.status_code == 206
+    assert response.content == b"56789"
+
+    etag = response.headers["ETag"]
+    response = requests.get(httpserver.url_for("/download"), headers={"If-None-Match": etag})
+    assert response.status_code == 304
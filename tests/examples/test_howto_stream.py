@@ -0,0 +1,20 @@
+from collections.abc import Iterator
+
+import requests
+
+from pytest_httpserver import HTTPServer
+
+
+def generate_export() -> Iterator[bytes]:
+    for idx in range(1000):
+        yield f"{idx},row {idx}\n".encode()
+
+
+def test_stream(httpserver: HTTPServer):
+    httpserver.expect_request("/export.csv").respond_with_stream(generate_export, content_type="text/csv")
+
+    with requests.get(httpserver.url_for("/export.csv"), stream=True) as response:
+        lines = list(response.iter_lines())
+
+    assert len(lines) == 1000
+    assert lines[0] == b"0,row 0"
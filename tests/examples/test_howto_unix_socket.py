@@ -0,0 +1,27 @@
+import http.client
+import socket
+
+import pytest
+
+from pytest_httpserver import HTTPServer
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str) -> None:
+        super().__init__("localhost")
+        self.socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not supported")
+def test_unix_socket():
+    with HTTPServer(host="unix:///tmp/pytest-httpserver-howto.sock") as httpserver:
+        httpserver.expect_request("/foobar").respond_with_data("OK")
+
+        conn = UnixHTTPConnection(httpserver.unix_socket)
+        conn.request("GET", "/foobar")
+        assert conn.getresponse().read() == b"OK"
+        conn.close()
@@ -0,0 +1,34 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug import Request
+from werkzeug import Response
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import WorkerPool
+
+
+def test_saturation():
+    release = threading.Event()
+
+    def handler(_request: Request) -> Response:
+        release.wait(5)
+        return Response("OK")
+
+    worker_pool = WorkerPool(max_workers=1, queue_size=0, overflow="reject")
+    with HTTPServer(worker_pool=worker_pool) as httpserver, ThreadPoolExecutor() as executor:
+        httpserver.expect_request("/slow").respond_with_handler(handler)
+
+        # the only worker is busy with the first request
+        future = executor.submit(requests.get, httpserver.url_for("/slow"))
+        while worker_pool.active_count == 0:
+            time.sleep(0.01)
+
+        # so the next one is rejected
+        assert requests.get(httpserver.url_for("/slow")).status_code == 503
+        assert worker_pool.rejected_count == 1
+
+        release.set()
+        assert future.result().text == "OK"
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Awaitable
+from collections.abc import Callable
+
+import pytest
+from werkzeug import Request
+from werkzeug import Response
+
+from pytest_httpserver import AsyncHTTPServer
+from pytest_httpserver import HTTPServerError
+from pytest_httpserver import PathTemplate
+
+
+async def fetch(
+    server: AsyncHTTPServer,
+    path: str,
+    method: str = "GET",
+    body: bytes = b"",
+) -> tuple[int, dict[str, str], bytes]:
+    """Send a request on a new connection, and return the status, the headers and the body."""
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    try:
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode()
+            + body
+        )
+        data = await reader.read()
+    finally:
+        writer.close()
+
+    head, _, response_body = data.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in header_lines)
+    return int(status_line.split()[1]), headers, response_body
+
+
+def run(test: Callable[[AsyncHTTPServer], Awaitable[None]]) -> None:
+    async def main() -> None:
+        async with AsyncHTTPServer() as server:
+            await test(server)
+
+    asyncio.run(main())
+
+
+def test_async_server_responses():
+    async def test(server: AsyncHTTPServer) -> None:
+        server.expect_request("/foo", method="POST", json={"a": 1}).respond_with_json({"b": 2})
+        server.expect_oneshot_request("/once").respond_with_data("once")
+
+        status, headers, body = await fetch(server, "/foo", "POST", json.dumps({"a": 1}).encode())
+        assert status == 200
+        assert headers["Content-Type"] == "application/json"
+        assert json.loads(body) == {"b": 2}
+
+        assert (await fetch(server, "/once"))[2] == b"once"
+        assert (await fetch(server, "/once"))[0] == 500
+
+        assert len(server.log) == 3
+        server.assert_request_made(server.create_matcher("/once"), count=2)
+        with pytest.raises(AssertionError, match="No handler found"):
+            server.check_assertions()
+
+    run(test)
+
+
+def test_async_server_coroutine_handler():
+    async def test(server: AsyncHTTPServer) -> None:
+        event = asyncio.Event()
+
+        async def waiting_handler(_request: Request) -> Response:
+            await event.wait()
+            return Response("released")
+
+        async def releasing_handler(_request: Request) -> Response:
+            event.set()
+            return Response("released the other")
+
+        server.expect_request("/wait").respond_with_handler(waiting_handler)
+        server.expect_request("/release").respond_with_handler(releasing_handler)
+
+        waiting = asyncio.create_task(fetch(server, "/wait"))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+        # the handlers run on the event loop of the test
+        assert (await fetch(server, "/release"))[2] == b"released the other"
+        assert (await waiting)[2] == b"released"
+
+    run(test)
+
+
+def test_async_server_handler_hooks_and_templates():
+    async def test(server: AsyncHTTPServer) -> None:
+        async def handler(_request: Request, user_id: int) -> Response:
+            return Response(f"user {user_id}")
+
+        def hook(_request: Request, response: Response) -> Response:
+            response.headers["X-Hook"] = "called"
+            return response
+
+        server.expect_request(PathTemplate("/users/{user_id:int}")).with_post_hook(hook).respond_with_handler(handler)
+
+        status, headers, body = await fetch(server, "/users/42")
+        assert status == 200
+        assert headers["X-Hook"] == "called"
+        assert body == b"user 42"
+
+    run(test)
+
+
+def test_async_server_handler_errors():
+    async def test(server: AsyncHTTPServer) -> None:
+        async def failing_handler(_request: Request) -> Response:
+            raise ValueError("handler failed")
+
+        server.expect_request("/error").respond_with_handler(failing_handler)
+
+        assert (await fetch(server, "/error"))[0] == 500
+        with pytest.raises(ValueError, match="handler failed"):
+            server.check_handler_errors()
+
+    run(test)
+
+
+def test_async_server_start_stop():
+    async def main() -> None:
+        server = AsyncHTTPServer()
+        assert not server.is_running()
+
+        for _ in range(2):
+            await server.start_async()
+            assert server.is_running()
+            server.expect_request("/foo").respond_with_data("OK")
+            # an idle connection does not prevent stopping the server
+            _, writer = await asyncio.open_connection(server.host, server.port)
+            assert (await fetch(server, "/foo"))[2] == b"OK"
+            await server.stop_async()
+            assert not server.is_running()
+            writer.close()
+
+        with pytest.raises(HTTPServerError):
+            await server.stop_async()
+
+    asyncio.run(main())
+
+
+def test_async_server_sync_start():
+    server = AsyncHTTPServer()
+    with pytest.raises(HTTPServerError, match="start_async"):
+        server.start()
+    with pytest.raises(HTTPServerError, match="start_async"), server:
+        pass
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import http.client
+import multiprocessing
+import os
+import re
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from werkzeug import Request
+from werkzeug import Response
+from werkzeug.test import EnvironBuilder
+
+from pytest_httpserver import AsyncioEngine
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import KeepAliveSettings
+from pytest_httpserver import PathTemplate
+from pytest_httpserver import RequestMatcher
+from pytest_httpserver import RequestSpec
+from pytest_httpserver import StaticResponse
+from pytest_httpserver.httpserver import HandlerType
+from pytest_httpserver.httpserver import RequestCache
+
+pytestmark = pytest.mark.benchmark
+
+
+def make_request(path: str, method: str = "GET") -> Request:
+    return Request(EnvironBuilder(path=path, method=method).get_environ())
+
+
+def measure(func: Callable[[], object], rounds: int = 1000) -> float:
+    """Returns the best time of a few runs, in seconds per call."""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        best = min(best, (time.perf_counter() - start) / rounds)
+    return best
+
+
+@pytest.mark.parametrize("handler_count", [10, 100, 1000, 10000])
+def test_dispatch_time_is_flat(handler_count: int, capsys: pytest.CaptureFixture[str]):
+    baseline_server = HTTPServer()
+    baseline_server.expect_request("/path/0", method="GET").respond_with_data("OK")
+
+    server = HTTPServer()
+    for idx in range(handler_count):
+        server.expect_request(f"/path/{idx}", method="GET").respond_with_data("OK")
+
+    last = make_request(f"/path/{handler_count - 1}")
+    first = make_request("/path/0")
+
+    baseline = measure(lambda: baseline_server.dispatch(first))
+    elapsed = measure(lambda: server.dispatch(last))
+
+    with capsys.disabled():
+        print(f"\ndispatch with {handler_count} handlers: {elapsed * 1e6:.2f}us (baseline: {baseline * 1e6:.2f}us)")
+
+    assert elapsed < baseline * 3
+
+
+def test_compiled_matcher():
+    matcher = RequestMatcher(
+        "/foo",
+        method="POST",
+        query_string={"k1": "v1", "k2": "v2"},
+        headers={"X-Foo": "bar", "Authorization": "Bearer token"},
+        json={"foo": ["bar"] * 100},
+    )
+    matcher.compile()
+    request = Request(
+        EnvironBuilder(
+            path="/foo",
+            method="POST",
+            query_string="k1=v1&k2=v2",
+            headers={"X-Foo": "bar", "Authorization": "Bearer token"},
+            json={"foo": ["bar"] * 99},
+        ).get_environ()
+    )
+    request.get_data()
+    RequestCache.attach(request)
+
+    # the request does not match, only the difference of the json is found
+    assert [field for field, _, _ in matcher.difference(request)] == ["json"]
+
+    compiled = measure(lambda: matcher.match(request), rounds=10000)
+    uncompiled = measure(lambda: not matcher.difference(request), rounds=10000)
+
+    print(f"\nmatch: {compiled * 1e6:.2f}us, difference: {uncompiled * 1e6:.2f}us")
+    assert compiled < uncompiled
+
+
+@pytest.mark.parametrize("handler_count", [1000, 10000])
+def test_regex_dispatch(handler_count: int, capsys: pytest.CaptureFixture[str]):
+    # the patterns share their literal prefix
+    patterns = [re.compile(rf"^/v1/items/\d+/field{idx}$") for idx in range(handler_count)]
+    server = HTTPServer()
+    for pattern in patterns:
+        server.expect_request(pattern).respond_with_data("OK")
+
+    path = f"/v1/items/12/field{handler_count - 1}"
+    request = make_request(path)
+    elapsed = measure(lambda: server.dispatch(request), rounds=100)
+    linear = measure(lambda: [pattern for pattern in patterns if pattern.match(path)], rounds=100)
+
+    with capsys.disabled():
+        print(f"\nregex dispatch with {handler_count} handlers: {elapsed * 1e6:.2f}us (linear: {linear * 1e6:.2f}us)")
+
+    # the patterns are combined, so they are not evaluated one by one
+    assert elapsed < linear
+
+
+@pytest.mark.parametrize("handler_count", [10, 100, 1000])
+def test_path_template_dispatch(handler_count: int, capsys: pytest.CaptureFixture[str]):
+    baseline_server = HTTPServer()
+    baseline_server.expect_request(PathTemplate("/v1/items0/{item_id:int}")).respond_with_data("OK")
+
+    server = HTTPServer()
+    for idx in range(handler_count):
+        server.expect_request(PathTemplate(f"/v1/items{idx}/{{item_id:int}}")).respond_with_data("OK")
+
+    first = make_request("/v1/items0/12")
+    last = make_request(f"/v1/items{handler_count - 1}/12")
+    baseline = measure(lambda: baseline_server.dispatch(first), rounds=100)
+    elapsed = measure(lambda: server.dispatch(last), rounds=100)
+
+    with capsys.disabled():
+        print(
+            f"\npath template dispatch with {handler_count} handlers: {elapsed * 1e6:.2f}us "
+            f"(baseline: {baseline * 1e6:.2f}us)"
+        )
+
+    # only the template matching the path is evaluated
+    index = server.handlers._get_index()  # noqa: SLF001
+    assert list(index.candidates(last)) == [server.handlers[-1]]
+    assert elapsed < baseline * 3
+
+
+def measure_consumption(handler_count: int, handler_type: HandlerType) -> float:
+    server = HTTPServer()
+    for idx in range(handler_count):
+        server.expect_request(f"/path/{idx}", handler_type=handler_type).respond_with_data("OK")
+
+    requests = [make_request(f"/path/{idx}") for idx in range(handler_count)]
+    start = time.perf_counter()
+    for request in requests:
+        server.dispatch(request)
+    elapsed = (time.perf_counter() - start) / handler_count
+
+    assert len(server.oneshot_handlers) == 0
+    assert len(server.ordered_handlers) == 0
+    return elapsed
+
+
+@pytest.mark.parametrize("handler_count", [1000, 50000])
+@pytest.mark.parametrize("handler_type", [HandlerType.ONESHOT, HandlerType.ORDERED])
+def test_consume_handlers(handler_count: int, handler_type: HandlerType, capsys: pytest.CaptureFixture[str]):
+    baseline = measure_consumption(100, handler_type)
+    elapsed = measure_consumption(handler_count, handler_type)
+
+    with capsys.disabled():
+        print(
+            f"\nconsuming {handler_count} {handler_type.value} handlers: {elapsed * 1e6:.2f}us per request "
+            f"(100 handlers: {baseline * 1e6:.2f}us per request)"
+        )
+
+    # consuming a handler must not depend on the number of handlers registered
+    assert elapsed < baseline * 3
+
+
+def measure_bulk_registration(handler_count: int) -> float:
+    specs: list[RequestSpec] = [
+        {"uri": f"/path/{idx}", "method": "GET", "response": {"json": {"id": idx}}} for idx in range(handler_count)
+    ]
+
+    start = time.perf_counter()
+    server = HTTPServer()
+    server.expect_requests(specs)
+    server.dispatch(make_request("/path/0"))
+    return time.perf_counter() - start
+
+
+@pytest.mark.parametrize("handler_count", [15000])
+def test_bulk_registration(handler_count: int, capsys: pytest.CaptureFixture[str]):
+    baseline = measure_bulk_registration(500) / 500
+    elapsed = measure_bulk_registration(handler_count)
+
+    with capsys.disabled():
+        print(
+            f"\nregistering {handler_count} handlers in a batch: {elapsed * 1e3:.2f}ms "
+            f"({elapsed / handler_count * 1e6:.2f}us per handler, 500 handlers: {baseline * 1e6:.2f}us per handler)"
+        )
+
+    # registration time must grow linearly with the number of handlers
+    assert elapsed / handler_count < baseline * 3
+
+
+def test_static_response(capsys: pytest.CaptureFixture[str]):
+    body = b'{"foo": "bar"}' * 100
+    static_response = StaticResponse(body, headers={"X-Foo": "bar"}, content_type="application/json")
+
+    static = measure(static_response.make_response, rounds=10000)
+    built = measure(lambda: Response(body, 200, {"X-Foo": "bar"}, content_type="application/json"), rounds=10000)
+
+    with capsys.disabled():
+        print(f"\nstatic response: {static * 1e6:.2f}us, building a response: {built * 1e6:.2f}us")
+
+    assert static < built
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param({}, id="default"),
+        pytest.param({"threaded": True}, id="threaded"),
+        pytest.param({"startup_timeout": 5, "readiness_probe": True}, id="readiness"),
+    ],
+)
+def test_start_stop_cycles(kwargs: dict, capsys: pytest.CaptureFixture[str]):
+    server = HTTPServer(**kwargs)
+    count = 100
+
+    start = time.perf_counter()
+    for _ in range(count):
+        server.start()
+        server.stop()
+    elapsed = time.perf_counter() - start
+
+    with capsys.disabled():
+        print(f"\n{kwargs}: {count / elapsed:.0f} start/stop cycles/s")
+
+    # the server loop used to be woken up twice a second only
+    assert elapsed / count < 0.1
+
+
+def measure_throughput(server: HTTPServer, count: int = 1000) -> float:
+    """Returns the number of requests served in a second over a single client connection."""
+    server.expect_request("/foo").respond_with_data("OK")
+    conn = http.client.HTTPConnection(server.host, server.port)
+    start = time.perf_counter()
+    for _ in range(count):
+        conn.request("GET", "/foo")
+        conn.getresponse().read()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return count / elapsed
+
+
+def test_asyncio_engine_throughput(capsys: pytest.CaptureFixture[str]):
+    with HTTPServer() as server:
+        werkzeug = measure_throughput(server)
+    with HTTPServer(engine=AsyncioEngine()) as server:
+        engine = measure_throughput(server)
+
+    with capsys.disabled():
+        print(f"\nasyncio engine: {engine:.0f} requests/s, werkzeug server: {werkzeug:.0f} requests/s")
+
+    assert engine > werkzeug
+
+
+def test_keep_alive_throughput(capsys: pytest.CaptureFixture[str]):
+    with HTTPServer() as server:
+        closing = measure_throughput(server)
+    with HTTPServer(keep_alive=KeepAliveSettings()) as server:
+        keep_alive = measure_throughput(server)
+        assert [stats.request_count for stats in server.connections] == [1000]
+
+    with capsys.disabled():
+        print(f"\nkeep-alive: {keep_alive:.0f} requests/s, closing connections: {closing:.0f} requests/s")
+
+    assert keep_alive > closing
+
+
+def multiprocess_client(host: str, port: int, count: int) -> None:
+    for _ in range(count):
+        conn = http.client.HTTPConnection(host, port)
+        conn.request("GET", "/foo")
+        conn.getresponse().read()
+        conn.close()
+
+
+def measure_multiprocess_throughput(processes: int, clients: int, count: int = 300) -> float:
+    """Returns the number of requests served in a second by the worker processes."""
+    server = HTTPServer(processes=processes)
+    server.expect_request("/foo").respond_with_data("OK")
+    context = multiprocessing.get_context("spawn")
+
+    # the clients run in separate processes, so they are not limited by the GIL of this process
+    with server, ProcessPoolExecutor(max_workers=clients, mp_context=context) as executor:
+        list(executor.map(multiprocess_client, [server.host] * clients, [server.port] * clients, [1] * clients))
+        server.clear_log()
+
+        start = time.perf_counter()
+        list(executor.map(multiprocess_client, [server.host] * clients, [server.port] * clients, [count] * clients))
+        elapsed = time.perf_counter() - start
+
+        # the reports of the workers are processed when the log is accessed
+        assert len(server.log) == clients * count
+
+    return clients * count / elapsed
+
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 4, reason="at least 4 CPUs are needed")
+def test_multiprocess_throughput(capsys: pytest.CaptureFixture[str]):
+    processes = (os.cpu_count() or 1) // 2
+    single = measure_multiprocess_throughput(1, processes)
+    multiple = measure_multiprocess_throughput(processes, processes)
+
+    with capsys.disabled():
+        print(f"\n1 process: {single:.0f} requests/s, {processes} processes: {multiple:.0f} requests/s")
+
+    # the workers report to the server without waiting for it, so they serve the requests in parallel
+    assert multiple > single * 1.5
@@ -0,0 +1,102 @@
+import gzip
+import zlib
+
+import pytest
+import requests
+from werkzeug import Request
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import StaticResponse
+
+BODY = b"compressible " * 1000
+
+
+def make_request(accept_encoding: str) -> Request:
+    return Request.from_values("/", headers={"Accept-Encoding": accept_encoding})
+
+
+def test_variants_are_compressed_once():
+    static_response = StaticResponse(BODY, compress=["gzip", "deflate"])
+
+    assert static_response.encodings == ("gzip", "deflate", "identity")
+    assert static_response.body == BODY
+    assert gzip.decompress(static_response.variant("gzip")[0]) == BODY
+    assert zlib.decompress(static_response.variant("deflate")[0]) == BODY
+    assert static_response.make_response(make_request("gzip")).response[0] is static_response.variant("gzip")[0]
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected_encoding"),
+    [
+        pytest.param("gzip", "gzip", id="gzip"),
+        pytest.param("deflate", "deflate", id="deflate"),
+        pytest.param("gzip;q=0.5, deflate", "deflate", id="quality"),
+        pytest.param("gzip;q=0, deflate;q=0", None, id="refused"),
+        pytest.param("br", None, id="unavailable"),
+        pytest.param("", None, id="empty"),
+    ],
+)
+def test_variant_negotiation(accept_encoding: str, expected_encoding: str | None):
+    static_response = StaticResponse(BODY, compress=["gzip", "deflate"])
+
+    response = static_response.make_response(make_request(accept_encoding))
+    assert response.headers.get("Content-Encoding") == expected_encoding
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["Content-Length"] == str(len(response.get_data()))
+
+    body = response.get_data()
+    if expected_encoding == "gzip":
+        body = gzip.decompress(body)
+    elif expected_encoding == "deflate":
+        body = zlib.decompress(body)
+    assert body == BODY
+
+
+def test_identity_keeps_content_encoding():
+    body = gzip.compress(BODY)
+    static_response = StaticResponse(body, headers={"Content-Encoding": "gzip"})
+
+    response = static_response.make_response(make_request("gzip"))
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.get_data() == body
+
+    static_response = StaticResponse(BODY, headers={"Content-Encoding": "identity"}, compress=["gzip"])
+    assert static_response.make_response(make_request("gzip")).headers["Content-Encoding"] == "gzip"
+    assert static_response.make_response(make_request("")).headers["Content-Encoding"] == "identity"
+
+
+def test_compress_all():
+    static_response = StaticResponse(BODY, compress=True)
+
+    assert {"gzip", "deflate", "identity"} <= set(static_response.encodings)
+
+
+def test_unsupported_encoding():
+    with pytest.raises(ValueError, match="Unsupported content encoding: 'lzma'"):
+        StaticResponse(BODY, compress=["lzma"])
+
+
+def test_conditional_variants_have_own_etag():
+    static_response = StaticResponse(BODY, conditional=True, compress=["gzip"])
+
+    gzip_response = static_response.make_response(make_request("gzip"))
+    identity_response = static_response.make_response(make_request("identity"))
+    assert gzip_response.headers["ETag"] != identity_response.headers["ETag"]
+
+    request = Request.from_values("/", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-1"})
+    response = static_response.make_response(request)
+    assert response.status_code == 206
+    assert response.get_data() == static_response.variant("gzip")[0][:2]
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_respond_with_compressed_json(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_json({"foo": "bar" * 100}, compress=True)
+
+    response = requests.get(httpserver.url_for("/foo"), headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.json() == {"foo": "bar" * 100}
+
+    response = requests.get(httpserver.url_for("/foo"), headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.json() == {"foo": "bar" * 100}
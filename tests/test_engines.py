@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import http.client
+import socket
+from collections.abc import Iterator
+from multiprocessing.pool import ThreadPool
+
+import pytest
+import requests
+
+from pytest_httpserver import AsyncioEngine
+from pytest_httpserver import BlockingHTTPServer
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import HTTPServerError
+
+
+@pytest.fixture(scope="module")
+def engine_server() -> Iterator[HTTPServer]:
+    server = HTTPServer(engine=AsyncioEngine())
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def server(engine_server: HTTPServer) -> Iterator[HTTPServer]:
+    yield engine_server
+    engine_server.clear()
+
+
+def send_raw(server: HTTPServer, data: bytes) -> bytes:
+    with socket.create_connection((server.host, server.port)) as sock:
+        sock.sendall(data)
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def test_engine_start_stop():
+    engine = AsyncioEngine()
+    server = HTTPServer(engine=engine)
+    assert not server.is_running()
+
+    for _ in range(2):
+        server.start()
+        assert server.is_running()
+        assert engine.is_running()
+        assert server.port == engine.port != 0
+        server.expect_request("/foo").respond_with_data("OK")
+        assert requests.get(server.url_for("/foo")).text == "OK"
+        server.stop()
+        assert not server.is_running()
+
+    with pytest.raises(HTTPServerError):
+        server.stop()
+
+
+def test_engine_request(server: HTTPServer):
+    server.expect_request("/foo", method="POST", query_string="a=1", data="payload").respond_with_json({"a": 1})
+
+    response = requests.post(server.url_for("/foo?a=1"), data="payload")
+    assert response.status_code == 200
+    assert response.json() == {"a": 1}
+    assert response.headers["Content-Type"] == "application/json"
+
+    request, logged_response = server.log[0]
+    assert request.path == "/foo"
+    assert logged_response.status_code == 200
+
+    assert requests.get(server.url_for("/bar")).status_code == 500
+    server.clear_assertions()
+
+
+def test_engine_keep_alive(server: HTTPServer):
+    server.expect_request("/foo").respond_with_data("OK")
+
+    with requests.Session() as session:
+        for _ in range(3):
+            assert session.get(server.url_for("/foo")).text == "OK"
+
+    remote_ports = {request.environ["REMOTE_PORT"] for request, _ in server.log}
+    assert len(remote_ports) == 1
+
+
+def test_engine_chunked_request(server: HTTPServer):
+    server.expect_request("/foo", data="hello world").respond_with_data("OK")
+
+    response = requests.post(server.url_for("/foo"), data=iter([b"hello", b" ", b"world"]))
+    assert response.text == "OK"
+
+
+def test_engine_streamed_response(server: HTTPServer):
+    server.expect_request("/foo").respond_with_stream(lambda: iter([b"foo", b"bar"]))
+
+    response = requests.get(server.url_for("/foo"))
+    assert response.headers["Transfer-Encoding"] == "chunked"
+    assert response.content == b"foobar"
+
+
+def test_engine_head_request(server: HTTPServer):
+    server.expect_request("/foo").respond_with_data("OK")
+
+    conn = http.client.HTTPConnection(server.host, server.port)
+    conn.request("HEAD", "/foo")
+    response = conn.getresponse()
+    assert response.getheader("Content-Length") == "2"
+    assert response.read() == b""
+
+    conn.request("GET", "/foo")
+    assert conn.getresponse().read() == b"OK"
+    conn.close()
+
+
+def test_engine_pipelining(server: HTTPServer):
+    server.expect_request("/foo").respond_with_data("foo")
+    server.expect_request("/bar").respond_with_data("bar")
+
+    data = send_raw(
+        server,
+        b"GET /foo HTTP/1.1\r\nHost: localhost\r\n\r\n"
+        b"GET /bar HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n",
+    )
+
+    assert data.count(b"HTTP/1.1 200 OK") == 2
+    assert data.index(b"\r\n\r\nfoo") < data.index(b"\r\n\r\nbar")
+    assert b"Connection: close" in data
+
+
+def test_engine_http10(server: HTTPServer):
+    server.expect_request("/foo").respond_with_stream(lambda: iter([b"foo", b"bar"]))
+
+    data = send_raw(server, b"GET /foo HTTP/1.0\r\n\r\n")
+
+    assert data.startswith(b"HTTP/1.1 200 OK")
+    assert b"Transfer-Encoding" not in data
+    assert data.endswith(b"\r\n\r\nfoobar")
+
+
+def test_engine_bad_request(server: HTTPServer):
+    data = send_raw(server, b"NONSENSE\r\n\r\n")
+
+    assert data.startswith(b"HTTP/1.1 400 Bad Request")
+    assert server.log == []
+
+
+def test_engine_blocking_server():
+    with BlockingHTTPServer(engine=AsyncioEngine(), timeout=5) as server, ThreadPool(1) as pool:
+        result = pool.apply_async(requests.get, (server.url_for("/foo"),))
+        server.assert_request("/foo").respond_with_data("OK")
+        assert result.get(timeout=5).text == "OK"
@@ -0,0 +1,127 @@
+import json
+from pathlib import Path
+
+import pytest
+import requests
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import RequestSpec
+from pytest_httpserver import load_json_specs
+from pytest_httpserver import load_jsonl_specs
+from pytest_httpserver.httpserver import HandlerType
+
+
+def test_expect_requests(httpserver: HTTPServer):
+    specs: list[RequestSpec] = [
+        {"uri": "/users", "method": "get", "response": {"json": ["john"]}},
+        {"uri": "/users", "method": "POST", "response": {"data": "created", "status": 201}},
+        {"uri": "/login", "handler_type": "oneshot", "response": {"data": "OK"}},
+        {"uri": "/first", "handler_type": HandlerType.ORDERED},
+    ]
+
+    handlers = httpserver.expect_requests(specs)
+
+    assert len(handlers) == 4
+    assert list(httpserver.handlers) == handlers[:2]
+    assert list(httpserver.oneshot_handlers) == [handlers[2]]
+    assert list(httpserver.ordered_handlers) == [handlers[3]]
+
+    handlers[3].respond_with_data("first")
+    assert requests.get(httpserver.url_for("/first")).text == "first"
+
+    response = requests.get(httpserver.url_for("/users"))
+    assert response.json() == ["john"]
+    assert response.headers["Content-Type"] == "application/json"
+
+    response = requests.post(httpserver.url_for("/users"))
+    assert response.status_code == 201
+    assert response.text == "created"
+
+    assert requests.get(httpserver.url_for("/login")).text == "OK"
+    assert requests.get(httpserver.url_for("/login")).status_code == 500
+
+    httpserver.clear_handler_errors()
+    httpserver.clear_assertions()
+
+
+def test_expect_requests_matcher_kwargs(httpserver: HTTPServer):
+    httpserver.expect_requests(
+        [
+            {"uri": "/foo", "query_string": {"a": "1"}, "response": {"data": "query"}},
+            {"uri": "/foo", "headers": {"X-Foo": "bar"}, "response": {"data": "header"}},
+            {"uri": "/foo", "json": {"key": "value"}, "response": {"data": "json"}},
+        ]
+    )
+
+    assert requests.get(httpserver.url_for("/foo?a=1")).text == "query"
+    assert requests.get(httpserver.url_for("/foo"), headers={"X-Foo": "bar"}).text == "header"
+    assert requests.post(httpserver.url_for("/foo"), json={"key": "value"}).text == "json"
+
+
+def test_expect_requests_after_dispatch(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_data("foo")
+    assert requests.get(httpserver.url_for("/foo")).text == "foo"
+
+    httpserver.expect_requests([{"uri": "/bar", "response": {"data": "bar"}}])
+    assert requests.get(httpserver.url_for("/bar")).text == "bar"
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        pytest.param({"method": "GET"}, id="no-uri"),
+        pytest.param({"uri": "/foo", "handler_type": "invalid"}, id="invalid-handler-type"),
+    ],
+)
+def test_expect_requests_invalid_spec(httpserver: HTTPServer, spec: RequestSpec):
+    with pytest.raises(ValueError):
+        httpserver.expect_requests([{"uri": "/valid"}, spec])
+
+    assert len(httpserver.handlers) == 0
+
+
+def test_expect_requests_baked(httpserver: HTTPServer):
+    server = httpserver.bake(method="POST")
+    server.expect_requests([{"uri": "/foo", "response": {"data": "OK"}}])
+
+    assert requests.post(httpserver.url_for("/foo")).text == "OK"
+    assert requests.get(httpserver.url_for("/foo")).status_code == 500
+    httpserver.clear_assertions()
+
+
+def test_load_json_specs(tmp_path: Path):
+    specs = [{"uri": "/foo", "response": {"data": "OK"}}, {"uri": "/bar", "handler_type": "oneshot"}]
+    path = tmp_path / "specs.json"
+    path.write_text(json.dumps(specs))
+
+    assert load_json_specs(path) == specs
+
+
+def test_load_json_specs_not_a_list(tmp_path: Path):
+    path = tmp_path / "specs.json"
+    path.write_text(json.dumps({"uri": "/foo"}))
+
+    with pytest.raises(ValueError, match="must contain a list"):
+        load_json_specs(path)
+
+
+def test_load_jsonl_specs(tmp_path: Path):
+    path = tmp_path / "specs.jsonl"
+    path.write_text('{"uri": "/foo"}\n\n{"uri": "/bar", "method": "POST"}\n')
+
+    assert load_jsonl_specs(path) == [{"uri": "/foo"}, {"uri": "/bar", "method": "POST"}]
+
+
+@pytest.mark.parametrize(
+    ("content", "message"),
+    [
+        pytest.param('{"uri": "/foo"}\n{"uri"\n', r"Invalid JSON at .*specs.jsonl:2", id="invalid-json"),
+        pytest.param('{"uri": "/foo"}\n["/bar"]\n', r"must be an object, got list at .*specs.jsonl:2", id="not-object"),
+    ],
+)
+def test_load_jsonl_specs_invalid(tmp_path: Path, content: str, message: str):
+    path = tmp_path / "specs.jsonl"
+    path.write_text(content)
+
+    with pytest.raises(ValueError, match=message):
+        load_jsonl_specs(path)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import os
+import socket
+import ssl
+from os.path import join as pjoin
+from pathlib import Path
+
+import pytest
+import requests
+from werkzeug import Request
+from werkzeug import Response
+from werkzeug.utils import send_file
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver.hooks import Garbage
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+assets_dir = pjoin(test_dir, "assets")
+
+
+@pytest.fixture
+def data_file(tmp_path: Path) -> Path:
+    path = tmp_path / "data.bin"
+    path.write_bytes(os.urandom(300 * 1024))
+    return path
+
+
+def test_file_response(httpserver: HTTPServer, data_file: Path, monkeypatch: pytest.MonkeyPatch):
+    sendfile_calls: list[int] = []
+    orig_sendfile = socket.socket.sendfile
+
+    def sendfile(sock: socket.socket, file, *args, **kwargs):
+        sendfile_calls.append(file.fileno())
+        return orig_sendfile(sock, file, *args, **kwargs)
+
+    monkeypatch.setattr(socket.socket, "sendfile", sendfile)
+    httpserver.expect_request("/data").respond_with_file(data_file)
+
+    for _ in range(2):
+        response = requests.get(httpserver.url_for("/data"))
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "application/octet-stream"
+        assert response.headers["Content-Length"] == str(300 * 1024)
+        assert response.content == data_file.read_bytes()
+
+    assert len(sendfile_calls) == 2
+
+
+def test_file_response_content_type(httpserver: HTTPServer, tmp_path: Path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n")
+    httpserver.expect_request("/guessed").respond_with_file(path)
+    httpserver.expect_request("/explicit").respond_with_file(str(path), "text/plain", headers={"X-Foo": "bar"})
+
+    assert requests.get(httpserver.url_for("/guessed")).headers["Content-Type"] == "text/csv"
+
+    response = requests.get(httpserver.url_for("/explicit"))
+    assert response.headers["Content-Type"] == "text/plain"
+    assert response.headers["X-Foo"] == "bar"
+    assert response.text == "a,b\n"
+
+
+def test_file_response_empty_file(httpserver: HTTPServer, tmp_path: Path):
+    path = tmp_path / "empty"
+    path.write_bytes(b"")
+    httpserver.expect_request("/empty").respond_with_file(path)
+
+    response = requests.get(httpserver.url_for("/empty"))
+    assert response.headers["Content-Length"] == "0"
+    assert response.content == b""
+
+
+def test_file_response_head(httpserver: HTTPServer, data_file: Path):
+    httpserver.expect_request("/data").respond_with_file(data_file)
+
+    response = requests.head(httpserver.url_for("/data"))
+    assert response.headers["Content-Length"] == str(300 * 1024)
+    assert response.content == b""
+
+
+def test_file_response_with_hook(httpserver: HTTPServer, data_file: Path):
+    httpserver.expect_request("/data").with_post_hook(Garbage(suffix_size=10)).respond_with_file(data_file)
+
+    response = requests.get(httpserver.url_for("/data"))
+    assert response.headers["Content-Length"] == str(300 * 1024 + 10)
+    assert response.content[:-10] == data_file.read_bytes()
+
+
+def test_send_file_range(httpserver: HTTPServer, tmp_path: Path):
+    path = tmp_path / "data.txt"
+    path.write_bytes(b"0123456789" * 100)
+
+    def handler(request: Request) -> Response:
+        return send_file(path, request.environ, conditional=True)
+
+    httpserver.expect_request("/data").respond_with_handler(handler)
+
+    response = requests.get(httpserver.url_for("/data"), headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == "bytes 10-19/1000"
+    assert response.content == b"0123456789"
+
+    response = requests.get(httpserver.url_for("/data"))
+    assert response.status_code == 200
+    assert response.content == path.read_bytes()
+
+
+def test_file_response_missing_file(httpserver: HTTPServer, tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        httpserver.expect_request("/data").respond_with_file(tmp_path / "missing")
+
+
+def test_file_response_ssl(data_file: Path):
+    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ssl_context.load_cert_chain(pjoin(assets_dir, "server.crt"), pjoin(assets_dir, "server.key"))
+
+    with HTTPServer(ssl_context=ssl_context) as server:
+        server.expect_request("/data").respond_with_file(data_file)
+        url = f"https://localhost:{server.port}/data"
+        response = requests.get(url, verify=pjoin(assets_dir, "rootCA.crt"))
+
+    assert response.content == data_file.read_bytes()
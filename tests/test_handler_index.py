@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+from werkzeug import Request
+from werkzeug.test import EnvironBuilder
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import RequestMatcher
+from pytest_httpserver import URIPattern
+from pytest_httpserver.httpserver import RequestHandler
+from pytest_httpserver.httpserver import RequestHandlerList
+from pytest_httpserver.httpserver import _literal_prefix
+
+
+class PrefixMatch(URIPattern):
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+
+    def match(self, uri):
+        return uri.startswith(self.prefix)
+
+
+class CountingMatcher(RequestMatcher):
+    calls = 0
+
+    def match(self, request: Request) -> bool:
+        CountingMatcher.calls += 1
+        return super().match(request)
+
+
+def make_request(path: str, method: str = "GET") -> Request:
+    return Request(EnvironBuilder(path=path, method=method).get_environ())
+
+
+@pytest.fixture
+def server() -> HTTPServer:
+    return HTTPServer()
+
+
+def test_first_registered_wins_across_buckets(server: HTTPServer):
+    server.expect_request(re.compile("/foo")).respond_with_data("regex")
+    server.expect_request("/foo", method="GET").respond_with_data("exact")
+    server.expect_request("/foo").respond_with_data("any method")
+
+    assert server.dispatch(make_request("/foo")).get_data() == b"regex"
+
+    server.clear_all_handlers()
+    server.expect_request("/foo").respond_with_data("any method")
+    server.expect_request("/foo", method="GET").respond_with_data("exact")
+    server.expect_request(PrefixMatch("/f")).respond_with_data("prefix")
+
+    assert server.dispatch(make_request("/foo")).get_data() == b"any method"
+    assert server.dispatch(make_request("/foobar")).get_data() == b"prefix"
+
+
+def test_method_buckets(server: HTTPServer):
+    server.expect_request("/foo", method="POST").respond_with_data("post")
+    server.expect_request("/foo", method="GET").respond_with_data("get")
+
+    assert server.dispatch(make_request("/foo", "GET")).get_data() == b"get"
+    assert server.dispatch(make_request("/foo", "POST")).get_data() == b"post"
+    assert server.dispatch(make_request("/foo", "PUT")).status_code == 500
+
+
+def test_default_uri_matches_everything(server: HTTPServer):
+    server.expect_request("/foo").respond_with_data("foo")
+    server.expect_request("").respond_with_data("default")
+
+    assert server.dispatch(make_request("/foo")).get_data() == b"foo"
+    assert server.dispatch(make_request("/bar")).get_data() == b"default"
+
+
+def test_index_follows_list_modifications(server: HTTPServer):
+    server.expect_request("/foo").respond_with_data("foo")
+    server.expect_request("/bar").respond_with_data("bar")
+    assert server.dispatch(make_request("/foo")).get_data() == b"foo"
+
+    del server.handlers[0]
+    assert server.dispatch(make_request("/foo")).status_code == 500
+
+    handler = RequestHandler(server.create_matcher("/foo"))
+    handler.respond_with_data("inserted")
+    server.handlers.insert(0, handler)
+    assert server.dispatch(make_request("/foo")).get_data() == b"inserted"
+
+    server.handlers.remove(handler)
+    assert server.dispatch(make_request("/foo")).status_code == 500
+
+    server.handlers.clear()
+    assert server.dispatch(make_request("/bar")).status_code == 500
+
+
+@pytest.mark.parametrize("expect", ["expect_request", "expect_oneshot_request"])
+def test_index_follows_matcher_modifications(server: HTTPServer, expect: str):
+    handler = getattr(server, expect)("/foo")
+    handler.respond_with_data("moved")
+    assert server.dispatch(make_request("/bar")).status_code == 500
+
+    handler.matcher.uri = "/bar"
+    assert server.dispatch(make_request("/foo")).status_code == 500
+    assert server.dispatch(make_request("/bar")).get_data() == b"moved"
+
+
+def test_oneshot_handlers_indexed(server: HTTPServer):
+    server.expect_oneshot_request("/foo").respond_with_data("first")
+    server.expect_oneshot_request("/foo").respond_with_data("second")
+
+    assert server.dispatch(make_request("/foo")).get_data() == b"first"
+    assert server.dispatch(make_request("/foo")).get_data() == b"second"
+    assert server.dispatch(make_request("/foo")).status_code == 500
+    assert len(server.oneshot_handlers) == 0
+
+
+def test_subclassed_matchers_are_not_indexed():
+    handlers = RequestHandlerList()
+    for idx in range(10):
+        handlers.append(RequestHandler(CountingMatcher(f"/path/{idx}", method="GET")))
+
+    CountingMatcher.calls = 0
+    assert handlers.match(make_request("/path/9")) is handlers[9]
+    assert CountingMatcher.calls == 10
+
+    index = handlers._get_index()  # noqa: SLF001
+    assert len(list(index.candidates(make_request("/path/100")))) == 10
+
+
+def test_plain_matchers_are_indexed():
+    handlers = RequestHandlerList(RequestHandler(RequestMatcher(f"/path/{idx}")) for idx in range(100))
+    index = handlers._get_index()  # noqa: SLF001
+
+    assert list(index.candidates(make_request("/path/42"))) == [handlers[42]]
+    assert list(index.candidates(make_request("/path/100"))) == []
+
+
+def test_regex_routes(server: HTTPServer):
+    for idx in range(100):
+        server.expect_request(re.compile(rf"^/v1/items{idx}/\d+$")).respond_with_data(str(idx))
+
+    assert server.dispatch(make_request("/v1/items42/12")).get_data() == b"42"
+    assert server.dispatch(make_request("/v1/items99/1")).get_data() == b"99"
+    assert server.dispatch(make_request("/v1/items42/abc")).status_code == 500
+
+    index = server.handlers._get_index()  # noqa: SLF001
+    assert list(index.candidates(make_request("/v1/items42/12"))) == [server.handlers[42]]
+
+
+def test_regex_routes_keep_registration_order(server: HTTPServer):
+    server.expect_request(re.compile("^/foo"), method="POST").respond_with_data("post")
+    server.expect_request("/foobar").respond_with_data("exact")
+    server.expect_request(re.compile("^/foo")).respond_with_data("regex")
+
+    assert server.dispatch(make_request("/foobar", "POST")).get_data() == b"post"
+    assert server.dispatch(make_request("/foobar")).get_data() == b"exact"
+    assert server.dispatch(make_request("/foobaz")).get_data() == b"regex"
+
+
+@pytest.mark.parametrize(
+    ("pattern", "path"),
+    [
+        (re.compile(r"(?i)^/case"), "/CASE"),
+        (re.compile(r"^/case", re.IGNORECASE), "/CASE"),
+        (re.compile(r"^/(a)\1$"), "/aa"),
+        (re.compile(r"^/(?P<name>a)(?P=name)$"), "/aa"),
+        (re.compile(r"^/(\d+)/(\w+)$"), "/12/foo"),
+        (re.compile(r"^/verbose  # comment", re.VERBOSE), "/verbose"),
+        (re.compile(r"^/first$|^/second$"), "/second"),
+    ],
+)
+def test_regex_flavours(server: HTTPServer, pattern: re.Pattern[str], path: str):
+    server.expect_request(re.compile(r"^/other")).respond_with_data("other")
+    server.expect_request(pattern).respond_with_data("OK")
+    server.expect_request(re.compile(r"^/(\d+)/(\w+)/other")).respond_with_data("other")
+
+    assert server.dispatch(make_request(path)).get_data() == b"OK"
+    assert server.dispatch(make_request("/nomatch")).status_code == 500
+
+
+def test_regex_routes_sharing_prefix():
+    patterns = [re.compile(rf"^/v1/items/\d+/field{idx}$") for idx in range(50)]
+    # the patterns which can't be combined are evaluated one by one
+    patterns[10] = re.compile(r"^/v1/items/(\d+)/\1$")
+    patterns[20] = re.compile(r"^/v1/items/(?P<id>\d+)/field20$")
+    patterns[30] = re.compile(r"^/v1/items/\d+/FIELD30$", re.IGNORECASE)
+    patterns[40] = re.compile(r"^/v1/items/\d+/")
+
+    handlers = RequestHandlerList(RequestHandler(RequestMatcher(pattern)) for pattern in patterns)
+
+    def expected(path: str) -> list[RequestHandler]:
+        return [handler for handler, pattern in zip(handlers, patterns) if pattern.match(path)]
+
+    paths = ["/v1/items/12/field5", "/v1/items/12/12", "/v1/items/12/field20", "/v1/items/12/field30"]
+    paths += ["/v1/items/12/field45", "/v1/items/12/nomatch", "/v1/other"]
+    for path in paths:
+        assert list(handlers._get_index().candidates(make_request(path))) == expected(path)  # noqa: SLF001
+
+    # the patterns are added and removed after they have been combined
+    for idx in range(50, 100):
+        pattern = re.compile(rf"^/v1/items/\d+/field{idx}$")
+        patterns.append(pattern)
+        handlers.append(RequestHandler(RequestMatcher(pattern)))
+    for idx in range(0, 100, 3):
+        handlers.remove(handlers[idx - idx // 3])
+        del patterns[idx - idx // 3]
+
+    for path in [*paths, "/v1/items/12/field99", "/v1/items/12/field98", "/v1/items/12/field3"]:
+        assert list(handlers._get_index().candidates(make_request(path))) == expected(path)  # noqa: SLF001
+
+
+def test_regex_router_follows_removal(server: HTTPServer):
+    server.expect_oneshot_request(re.compile(r"^/foo/\d+$")).respond_with_data("first")
+    server.expect_oneshot_request(re.compile(r"^/foo/\d+$")).respond_with_data("second")
+
+    assert server.dispatch(make_request("/foo/1")).get_data() == b"first"
+    assert server.dispatch(make_request("/foo/2")).get_data() == b"second"
+    assert server.dispatch(make_request("/foo/3")).status_code == 500
+
+
+@pytest.mark.parametrize(
+    ("pattern", "prefix"),
+    [
+        (r"^/v1/items/\d+$", "/v1/items/"),
+        (r"/foo/\d+/bar/", "/foo/"),
+        (r"\A/foo", "/foo"),
+        (r"^/a\.b?c", "/a."),
+        (r"^/ab+c", "/ab"),
+        (r"^/x{2}", "/"),
+        (r"^/a|^/b", ""),
+        (r"(?i)^/foo", ""),
+        (r"^/(foo)", "/"),
+        (r"^/foo[0-9]", "/foo"),
+    ],
+)
+def test_literal_prefix(pattern: str, prefix: str):
+    assert _literal_prefix(re.compile(pattern)) == prefix
+    assert _literal_prefix(re.compile(pattern, re.IGNORECASE)) == ""
@@ -97,3 +97,9 @@ def test_header_one_key_multiple_values(httpserver: HTTPServer):
 
         assert response.status == 200
         assert response.headers.get_all("X-Foo") == ["123", "456"]
+
+
+def test_header_name_underscore_matches_dash(httpserver: HTTPServer):
+    httpserver.expect_request("/h", headers={"X_Foo": "bar"}).respond_with_data("OK")
+    response = requests.get(httpserver.url_for("/h"), headers={"X-Foo": "bar"})
+    assert response.status_code == 200
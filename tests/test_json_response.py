@@ -0,0 +1,76 @@
+import json
+from functools import partial
+
+import pytest
+import requests
+from werkzeug import Request
+
+from pytest_httpserver import JSON_DUMPS_COMPACT
+from pytest_httpserver import JSON_DUMPS_INDENTED
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import RequestHandler
+from pytest_httpserver import RequestMatcher
+
+
+def test_respond_with_json_indented_by_default(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_json({"foo": ["bar"]})
+
+    assert requests.get(httpserver.url_for("/foo")).text == json.dumps({"foo": ["bar"]}, indent=4)
+
+
+def test_respond_with_json_compact(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_json({"foo": ["bar"]}, json_dumps=JSON_DUMPS_COMPACT)
+
+    assert requests.get(httpserver.url_for("/foo")).text == '{"foo":["bar"]}'
+
+
+def test_respond_with_json_bytes_serializer(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_json({"foo": "bar"}, json_dumps=lambda obj: b'{"custom":true}')
+
+    response = requests.get(httpserver.url_for("/foo"))
+    assert response.json() == {"custom": True}
+    assert response.headers["Content-Type"] == "application/json"
+
+
+def test_server_default_serializer():
+    server = HTTPServer(json_dumps=JSON_DUMPS_COMPACT)
+    server.expect_request("/foo").respond_with_json({"foo": "bar"})
+    server.expect_requests([{"uri": "/bar", "response": {"json": {"bar": "baz"}}}])
+
+    with server:
+        assert requests.get(server.url_for("/foo")).text == '{"foo":"bar"}'
+        assert requests.get(server.url_for("/bar")).text == '{"bar":"baz"}'
+
+
+@pytest.mark.parametrize(
+    "json_dumps",
+    [
+        pytest.param(JSON_DUMPS_INDENTED, id="indented"),
+        pytest.param(JSON_DUMPS_COMPACT, id="compact"),
+        pytest.param(partial(json.dumps, sort_keys=True, cls=json.JSONEncoder), id="encoder-class"),
+        pytest.param(lambda obj: json.dumps(obj).encode(), id="custom"),
+    ],
+)
+def test_respond_with_dynamic_json(json_dumps):
+    handler = RequestHandler(RequestMatcher("/foo"))
+    handler.respond_with_dynamic_json(
+        lambda request: {"path": request.path, "items": list(range(3)), "text": "árvíztűrő"},
+        status=201,
+        json_dumps=json_dumps,
+    )
+
+    request = Request.from_values("/foo")
+    response = handler.respond(request)
+    expected = json_dumps({"path": "/foo", "items": [0, 1, 2], "text": "árvíztűrő"})
+
+    assert response.status_code == 201
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.get_data() == (expected.encode() if isinstance(expected, str) else expected)
+
+
+def test_respond_with_dynamic_json_called_per_request(httpserver: HTTPServer):
+    counter = iter(range(10))
+    httpserver.expect_request("/foo").respond_with_dynamic_json(lambda request: {"count": next(counter)})
+
+    assert requests.get(httpserver.url_for("/foo")).json() == {"count": 0}
+    assert requests.get(httpserver.url_for("/foo")).json() == {"count": 1}
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import http.client
+import socket
+import time
+from collections.abc import Iterator
+
+import pytest
+import requests
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import KeepAliveSettings
+from pytest_httpserver import WorkerPool
+
+
+@pytest.fixture
+def server() -> Iterator[HTTPServer]:
+    server = HTTPServer(keep_alive=KeepAliveSettings(idle_timeout=1), threaded=True)
+    server.expect_request("/foo").respond_with_data("OK")
+    server.expect_request("/stream").respond_with_stream(lambda: iter([b"foo", b"bar"]))
+    server.start()
+    yield server
+    server.stop()
+
+
+def send_raw(server: HTTPServer, data: bytes) -> bytes:
+    with socket.create_connection((server.host, server.port), timeout=5) as sock:
+        sock.sendall(data)
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def test_keep_alive_session(server: HTTPServer):
+    with requests.Session() as session:
+        for _ in range(3):
+            assert session.get(server.url_for("/foo")).text == "OK"
+        assert session.post(server.url_for("/foo"), data=b"x" * 100000).text == "OK"
+
+        response = session.get(server.url_for("/stream"))
+        assert response.headers["Transfer-Encoding"] == "chunked"
+        assert response.text == "foobar"
+
+    assert len(server.connections) == 1
+    assert server.connections[0].request_count == 5
+
+    server.clear()
+    assert server.connections == []
+
+
+def test_keep_alive_connection_close(server: HTTPServer):
+    for _ in range(2):
+        response = requests.get(server.url_for("/foo"), headers={"Connection": "close"})
+        assert response.headers["Connection"] == "close"
+
+    assert [stats.request_count for stats in server.connections] == [1, 1]
+
+
+def test_keep_alive_max_requests():
+    with HTTPServer(keep_alive=KeepAliveSettings(max_requests=2)) as server, requests.Session() as session:
+        server.expect_request("/foo").respond_with_data("OK")
+        responses = [session.get(server.url_for("/foo")) for _ in range(5)]
+
+        assert [response.headers.get("Connection") for response in responses] == [None, "close"] * 2 + [None]
+        assert [stats.request_count for stats in server.connections] == [2, 2, 1]
+
+
+def test_keep_alive_idle_timeout(server: HTTPServer):
+    conn = http.client.HTTPConnection(server.host, server.port)
+    conn.request("GET", "/foo")
+    assert conn.getresponse().read() == b"OK"
+
+    stats = server.connections[0]
+    deadline = time.monotonic() + 5
+    while not stats.closed:
+        assert time.monotonic() < deadline, "connection was not closed"
+        time.sleep(0.05)
+    assert stats.request_count == 1
+    conn.close()
+
+
+def test_keep_alive_pipelining(server: HTTPServer):
+    data = send_raw(
+        server,
+        b"GET /foo HTTP/1.1\r\nHost: localhost\r\n\r\n"
+        b"GET /stream HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n",
+    )
+
+    assert data.count(b"HTTP/1.1 200 OK") == 2
+    assert data.index(b"\r\n\r\nOK") < data.index(b"\r\n\r\n3\r\nfoo\r\n3\r\nbar\r\n0\r\n\r\n")
+    assert server.connections[0].request_count == 2
+
+
+def test_keep_alive_pipelining_disabled():
+    with HTTPServer(keep_alive=KeepAliveSettings(pipelining=False)) as server:
+        server.expect_request("/foo").respond_with_data("OK")
+        data = send_raw(
+            server,
+            b"GET /foo HTTP/1.1\r\nHost: localhost\r\n\r\nGET /foo HTTP/1.1\r\nHost: localhost\r\n\r\n",
+        )
+
+        assert data.count(b"HTTP/1.1 200 OK") == 1
+        assert b"Connection: close" in data
+        assert server.connections[0].request_count == 1
+
+
+def test_keep_alive_http10(server: HTTPServer):
+    data = send_raw(
+        server,
+        b"GET /foo HTTP/1.0\r\nConnection: keep-alive\r\n\r\n"
+        b"GET /stream HTTP/1.0\r\nConnection: keep-alive\r\n\r\n",
+    )
+
+    first, second = data.split(b"HTTP/1.1 200 OK")[1:]
+    assert b"Connection: keep-alive" in first
+    # the end of the body can be only marked by closing the connection
+    assert b"Connection: close" in second
+    assert second.endswith(b"\r\n\r\nfoobar")
+
+
+def test_keep_alive_worker_pool():
+    server = HTTPServer(keep_alive=KeepAliveSettings(), worker_pool=WorkerPool(max_workers=2))
+    server.expect_request("/foo").respond_with_data("OK")
+
+    with server, requests.Session() as session:
+        for _ in range(3):
+            assert session.get(server.url_for("/foo")).text == "OK"
+
+    assert [stats.request_count for stats in server.connections] == [3]
+
+
+def test_no_keep_alive():
+    with HTTPServer() as server, requests.Session() as session:
+        server.expect_request("/foo").respond_with_data("OK")
+        assert session.get(server.url_for("/foo")).headers["Connection"] == "close"
+        assert server.connections == []
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param({"idle_timeout": 0}, id="zero-idle-timeout"),
+        pytest.param({"max_requests": 0}, id="zero-max-requests"),
+    ],
+)
+def test_keep_alive_invalid(kwargs: dict):
+    with pytest.raises(ValueError):
+        KeepAliveSettings(**kwargs)
+
+
+def test_keep_alive_stop_with_idle_connection():
+    server = HTTPServer(keep_alive=KeepAliveSettings(idle_timeout=30))
+    server.expect_request("/foo").respond_with_data("OK")
+    server.start()
+
+    conn = http.client.HTTPConnection(server.host, server.port)
+    conn.request("GET", "/foo")
+    assert conn.getresponse().read() == b"OK"
+
+    start = time.monotonic()
+    server.stop()
+    assert time.monotonic() - start < 5
+    assert server.connections[0].closed
+    conn.close()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import warnings
+
+import pytest
+import requests
+from werkzeug import Request
+from werkzeug import Response
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import LogEvictionWarning
+from pytest_httpserver import LogRetention
+from pytest_httpserver import LogSettings
+from pytest_httpserver import RequestMatcher
+from pytest_httpserver import httpserver as httpserver_module
+
+
+def make_server(log_settings: LogSettings) -> HTTPServer:
+    server = HTTPServer(log_settings=log_settings)
+    server.expect_request("/echo").respond_with_handler(lambda request: Response(request.get_data()))
+    return server
+
+
+def logged_paths(server: HTTPServer) -> list[str]:
+    return [request.args["n"] for request, _ in server.log]
+
+
+@pytest.mark.parametrize(
+    ("keep", "expected"),
+    [
+        pytest.param(LogRetention.LAST, ["3", "4"], id="last"),
+        pytest.param("first", ["0", "1"], id="first"),
+    ],
+)
+def test_max_entries(keep: LogRetention | str, expected: list[str]):
+    with make_server(LogSettings(max_entries=2, keep=keep)) as server:
+        for n in range(5):
+            assert requests.get(server.url_for(f"/echo?n={n}")).status_code == 200
+
+    assert logged_paths(server) == expected
+    assert server.log_evicted_count == 3
+
+
+def test_max_body_bytes():
+    # each entry counts the body of the request and of the response
+    with make_server(LogSettings(max_body_bytes=25)) as server:
+        for n in range(4):
+            requests.post(server.url_for(f"/echo?n={n}"), data=b"x" * 5)
+        requests.post(server.url_for("/echo?n=big"), data=b"x" * 20)
+
+    assert logged_paths(server) == []
+    assert server.log_evicted_count == 5
+
+    server.clear_log()
+    assert server.log_evicted_count == 0
+
+    with server:
+        for n in range(4):
+            requests.post(server.url_for(f"/echo?n={n}"), data=b"x" * 5)
+
+    assert logged_paths(server) == ["2", "3"]
+    assert server.log_evicted_count == 2
+
+
+def test_eviction_does_not_measure_entries_again(monkeypatch: pytest.MonkeyPatch):
+    sizes: list[int] = []
+    entry_size = httpserver_module._log_entry_size  # noqa: SLF001
+
+    def log_entry_size(entry: tuple[Request, Response]) -> int:
+        sizes.append(entry_size(entry))
+        return sizes[-1]
+
+    monkeypatch.setattr(httpserver_module, "_log_entry_size", log_entry_size)
+    server = HTTPServer(log_settings=LogSettings(max_entries=3, max_body_bytes=1000))
+    for n in range(10):
+        server.add_log_entry(Request.from_values(f"/echo?n={n}", data=b"x" * 5), Response(b"y" * 5))
+
+    assert len(sizes) == 10
+    assert logged_paths(server) == ["7", "8", "9"]
+    assert server.log[-1][0].args["n"] == "9"
+    assert [request.args["n"] for request, _ in server.log[1:]] == ["8", "9"]
+    assert server.log != []
+
+    del server.log[0]
+    server.add_log_entry(Request.from_values("/echo?n=10"), Response(b""))
+    assert logged_paths(server) == ["8", "9", "10"]
+
+
+def test_unlimited_by_default():
+    with make_server(LogSettings()) as server:
+        for n in range(5):
+            requests.get(server.url_for(f"/echo?n={n}"))
+
+    assert len(server.log) == 5
+    assert server.log_evicted_count == 0
+
+
+def test_query_warns_after_eviction():
+    with make_server(LogSettings(max_entries=1)) as server:
+        requests.get(server.url_for("/echo?n=0"))
+
+        matcher = RequestMatcher("/echo")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            server.assert_request_made(matcher)
+
+        requests.get(server.url_for("/echo?n=1"))
+
+        with pytest.warns(LogEvictionWarning, match="1 log entries have been evicted"):
+            assert len(list(server.iter_matching_requests(matcher))) == 1
+        with pytest.warns(LogEvictionWarning):
+            assert server.get_matching_requests_count(matcher) == 1
+        with pytest.warns(LogEvictionWarning):
+            server.assert_request_made(matcher)
+
+        with pytest.raises(AssertionError, match="1 log entries have been evicted"):
+            server.assert_request_made(matcher, count=2)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param({"max_entries": -1}, id="negative-entries"),
+        pytest.param({"max_body_bytes": -1}, id="negative-bytes"),
+        pytest.param({"keep": "middle"}, id="invalid-keep"),
+    ],
+)
+def test_log_settings_invalid(kwargs: dict):
+    with pytest.raises(ValueError):
+        LogSettings(**kwargs)
@@ -1,6 +1,11 @@
+from __future__ import annotations
+
 import requests
+from werkzeug import Request
+from werkzeug.test import EnvironBuilder
 
 from pytest_httpserver import HTTPServer
+from pytest_httpserver import RequestMatcher
 
 
 def test_expect_method(httpserver: HTTPServer):
@@ -9,3 +14,120 @@ def test_expect_method(httpserver: HTTPServer):
     httpserver.expect(matcher).respond_with_data(expected_response)
     resp = requests.post(httpserver.url_for("/test"), json={"list": [1, 2, 3, 4]})
     assert resp.text == expected_response
+
+
+class RecordingMatcher(RequestMatcher):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.calls: list[str] = []
+
+    def match_uri(self, request: Request) -> bool:
+        self.calls.append("uri")
+        return super().match_uri(request)
+
+    def match_headers(self, request: Request) -> bool:
+        self.calls.append("headers")
+        return super().match_headers(request)
+
+    def match_data(self, request: Request) -> bool:
+        self.calls.append("data")
+        return super().match_data(request)
+
+    def match_json(self, request: Request) -> bool:
+        self.calls.append("json")
+        return super().match_json(request)
+
+
+def make_request(path: str, method: str = "GET", **kwargs) -> Request:
+    return Request(EnvironBuilder(path=path, method=method, **kwargs).get_environ())
+
+
+def test_match_stops_at_first_difference():
+    matcher = RecordingMatcher("/foo", method="POST", json={"foo": "bar"})
+
+    assert not matcher.match(make_request("/foo", "GET", json={"foo": "bar"}))
+    assert matcher.calls == []
+
+    assert not matcher.match(make_request("/bar", "POST", json={"foo": "bar"}))
+    assert matcher.calls == ["uri"]
+
+    matcher.calls.clear()
+    assert matcher.match(make_request("/foo", "POST", json={"foo": "bar"}))
+    assert matcher.calls == ["uri", "headers", "data", "json"]
+
+
+def test_difference_evaluates_all_fields():
+    matcher = RecordingMatcher("/foo", method="POST", json={"foo": "bar"})
+    difference = matcher.difference(make_request("/bar", "GET", json={"foo": "baz"}))
+
+    assert [field for field, _, _ in difference] == ["uri", "method", "json"]
+    assert matcher.calls == ["uri", "data", "json"]
+
+
+def test_match_uses_overridden_difference():
+    class NeverMatcher(RequestMatcher):
+        def difference(self, request: Request):
+            return [("custom", request.path, self.uri)]
+
+    assert not NeverMatcher("/foo").match(make_request("/foo"))
+
+
+def test_compiled_matcher():
+    matcher = RequestMatcher(
+        "/foo",
+        method="POST",
+        query_string={"k1": "v1"},
+        headers={"X-Foo": "bar"},
+        json={"foo": "bar"},
+    )
+    matcher.compile()
+
+    request = make_request("/foo", "POST", query_string="k1=v1", headers={"X-Foo": "bar"}, json={"foo": "bar"})
+    assert matcher.match(request)
+    assert not matcher.match(make_request("/foo", "POST", query_string="k1=v2", json={"foo": "bar"}))
+    assert not matcher.match(make_request("/foo", "POST", query_string="k1=v1", json={"foo": "bar"}))
+
+
+def test_compile_freezes_expected_values():
+    query_string = {"k1": "v1"}
+    matcher = RequestMatcher("/foo", query_string=query_string)
+    matcher.compile()
+
+    query_string["k1"] = "v2"
+    assert matcher.match(make_request("/foo", query_string="k1=v1"))
+
+    matcher.compile()
+    assert matcher.match(make_request("/foo", query_string="k1=v2"))
+
+
+def test_setting_attributes_recompiles():
+    matcher = RequestMatcher("/foo", query_string={"k1": "v1"})
+    matcher.compile()
+
+    matcher.uri = "/bar"
+    assert matcher.match(make_request("/bar", query_string="k1=v1"))
+    assert not matcher.match(make_request("/foo", query_string="k1=v1"))
+
+    matcher.query_string = "k1=v2"
+    assert matcher.match(make_request("/bar", query_string="k1=v2"))
+
+    matcher.method = "POST"
+    assert not matcher.match(make_request("/bar", query_string="k1=v2"))
+
+
+def test_compiled_header_value_matcher():
+    def case_insensitive_matcher(header_name: str, actual: str | None, expected: str) -> bool:
+        assert header_name == "X-Foo"
+        return actual is not None and actual.lower() == expected.lower()
+
+    matcher = RequestMatcher("/foo", headers={"X-Foo": "bar"}, header_value_matcher=case_insensitive_matcher)
+    matcher.compile()
+
+    assert matcher.match(make_request("/foo", headers={"X-Foo": "BAR"}))
+    assert not matcher.match(make_request("/foo", headers={"X-Foo": "baz"}))
+
+
+def test_match_compiles_on_first_use():
+    matcher = RequestMatcher("/foo", query_string=b"k1=v1")
+    assert matcher.match(make_request("/foo", query_string="k1=v1"))
+    assert not matcher.match(make_request("/foo", query_string="k1=v2"))
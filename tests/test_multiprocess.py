@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import pickle
+import socket
+from collections.abc import Iterator
+
+import pytest
+import requests
+from werkzeug import Request
+from werkzeug import Response
+from werkzeug.test import EnvironBuilder
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import HTTPServerError
+from pytest_httpserver import RequestMatcher
+from pytest_httpserver.httpserver import HandlerType
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="SO_REUSEPORT is not supported")
+
+
+def pid_handler(_request: Request) -> Response:
+    return Response(str(os.getpid()))
+
+
+def failing_handler(_request: Request) -> Response:
+    raise ValueError("handler failed")
+
+
+@pytest.fixture(scope="module")
+def multiprocess_server() -> Iterator[HTTPServer]:
+    server = HTTPServer(processes=2)
+    server.expect_request("/data", query_string={"a": "1"}).respond_with_data("OK", headers={"X-Foo": "bar"})
+    server.expect_request("/json", method="POST", json={"key": "value"}).respond_with_json({"foo": "bar"})
+    server.expect_request("/pid").respond_with_handler(pid_handler)
+    server.expect_request("/error").respond_with_handler(failing_handler)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def server(multiprocess_server: HTTPServer) -> Iterator[HTTPServer]:
+    yield multiprocess_server
+    multiprocess_server.clear_log()
+    multiprocess_server.clear_assertions()
+    multiprocess_server.clear_handler_errors()
+
+
+def test_multiprocess_responses(server: HTTPServer):
+    response = requests.get(server.url_for("/data?a=1"))
+    assert response.text == "OK"
+    assert response.headers["X-Foo"] == "bar"
+
+    assert requests.post(server.url_for("/json"), json={"key": "value"}).json() == {"foo": "bar"}
+
+    pids = {requests.get(server.url_for("/pid")).text for _ in range(10)}
+    assert str(os.getpid()) not in pids
+
+
+def test_multiprocess_log(server: HTTPServer):
+    requests.get(server.url_for("/data?a=1"))
+    requests.post(server.url_for("/json"), json={"key": "value"})
+
+    assert len(server.log) == 2
+    request, response = server.log[1]
+    assert request.path == "/json"
+    assert request.get_json() == {"key": "value"}
+    assert response.get_json() == {"foo": "bar"}
+
+    server.assert_request_made(RequestMatcher("/data", query_string={"a": "1"}))
+    server.assert_request_made(RequestMatcher("/json", json={"key": "value"}))
+
+
+def test_multiprocess_assertions(server: HTTPServer):
+    assert requests.get(server.url_for("/missing")).status_code == 500
+
+    with pytest.raises(AssertionError, match="No handler found for request"):
+        server.check_assertions()
+
+
+def test_multiprocess_handler_errors(server: HTTPServer):
+    assert requests.get(server.url_for("/error")).status_code == 500
+
+    with pytest.raises(ValueError, match="handler failed"):
+        server.check_handler_errors()
+
+
+def test_multiprocess_registration_while_running(server: HTTPServer):
+    assert server.is_running()
+    with pytest.raises(HTTPServerError):
+        server.expect_request("/foo")
+
+
+@pytest.mark.parametrize("handler_type", [HandlerType.ONESHOT, HandlerType.ORDERED])
+def test_multiprocess_unsupported_handler_type(handler_type: HandlerType):
+    server = HTTPServer(processes=2)
+    server.expect_request("/foo", handler_type=handler_type).respond_with_data("OK")
+
+    with pytest.raises(HTTPServerError, match="not supported"):
+        server.start()
+    assert not server.is_running()
+
+
+def test_multiprocess_unpicklable_handler():
+    server = HTTPServer(processes=2)
+    server.expect_request("/foo").respond_with_handler(lambda _: Response("OK"))
+
+    with pytest.raises(HTTPServerError, match="can't be sent to the worker processes"):
+        server.start()
+    assert not server.is_running()
+
+
+def test_handler_pickling():
+    server = HTTPServer()
+    handler = server.expect_request(
+        "/foo",
+        method="POST",
+        headers={"Authorization": "Basic Zm9vOmJhcg=="},
+        query_string={"a": "1"},
+        json={"key": "value"},
+    )
+    handler.respond_with_data("OK", compress=True, conditional=True)
+
+    request = Request(
+        EnvironBuilder(
+            path="/foo",
+            method="POST",
+            headers={"Authorization": "Basic Zm9vOmJhcg==", "Accept-Encoding": "gzip"},
+            query_string="a=1",
+            json={"key": "value"},
+        ).get_environ()
+    )
+
+    restored = pickle.loads(pickle.dumps(handler))
+    assert restored.matcher.match(request)
+    response = restored.respond(request)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.get_data() == handler.respond(request).get_data()
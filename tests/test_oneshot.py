@@ -1,3 +1,4 @@
+import pytest
 import requests
 
 from pytest_httpserver import HTTPServer
@@ -52,3 +53,54 @@ def test_oneshot_any_method(httpserver: HTTPServer):
     assert response.status_code == 200
 
     assert len(httpserver.oneshot_handlers) == 0
+
+
+def test_oneshot_consumed_out_of_order(httpserver: HTTPServer):
+    for idx in range(100):
+        httpserver.expect_oneshot_request(f"/foo/{idx}").respond_with_data(str(idx))
+
+    for idx in reversed(range(0, 100, 2)):
+        assert requests.get(httpserver.url_for(f"/foo/{idx}")).text == str(idx)
+
+    assert len(httpserver.oneshot_handlers) == 50
+    expected_uris = [f"/foo/{idx}" for idx in range(1, 100, 2)]
+    assert [handler.matcher.uri for handler in httpserver.oneshot_handlers] == expected_uris
+
+    for idx in range(1, 100, 2):
+        assert requests.get(httpserver.url_for(f"/foo/{idx}")).text == str(idx)
+
+    assert httpserver.oneshot_handlers == []
+    assert requests.get(httpserver.url_for("/foo/1")).status_code == 500
+
+
+def test_oneshot_handler_list_operations(httpserver: HTTPServer):
+    handlers = [httpserver.expect_oneshot_request(f"/foo/{idx}") for idx in range(3)]
+    for handler in handlers:
+        handler.respond_with_data("OK")
+
+    oneshot_handlers = httpserver.oneshot_handlers
+    assert oneshot_handlers == handlers
+    assert oneshot_handlers[-1] is handlers[2]
+
+    oneshot_handlers.remove(handlers[1])
+    assert oneshot_handlers == [handlers[0], handlers[2]]
+    assert oneshot_handlers[1] is handlers[2]
+    assert handlers[1] not in oneshot_handlers
+
+    with pytest.raises(ValueError):
+        oneshot_handlers.remove(handlers[1])
+
+    oneshot_handlers.insert(0, handlers[1])
+    assert oneshot_handlers == [handlers[1], handlers[0], handlers[2]]
+    assert oneshot_handlers[:2] == [handlers[1], handlers[0]]
+    assert oneshot_handlers + [handlers[1]] == [handlers[1], handlers[0], handlers[2], handlers[1]]
+    assert [handlers[1]] + oneshot_handlers == [handlers[1], handlers[1], handlers[0], handlers[2]]
+    assert requests.get(httpserver.url_for("/foo/1")).status_code == 200
+    assert oneshot_handlers == [handlers[0], handlers[2]]
+
+    assert oneshot_handlers.pop() is handlers[2]
+    assert oneshot_handlers == [handlers[0]]
+
+    oneshot_handlers.clear()
+    assert len(oneshot_handlers) == 0
+    assert requests.get(httpserver.url_for("/foo/0")).status_code == 500
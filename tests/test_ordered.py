@@ -43,3 +43,22 @@ def test_ordered_invalid_order(httpserver: HTTPServer):
 
     # as no ordered handlers are triggered yet, these must be intact..
     assert len(httpserver.ordered_handlers) == 2
+
+
+def test_ordered_handler_list_operations(httpserver: HTTPServer):
+    handlers = [httpserver.expect_ordered_request(f"/foo/{idx}") for idx in range(4)]
+    for handler in handlers:
+        handler.respond_with_data("OK")
+
+    ordered_handlers = httpserver.ordered_handlers
+    assert ordered_handlers == handlers
+    assert ordered_handlers[1:3] == handlers[1:3]
+    assert ordered_handlers[-1] is handlers[3]
+
+    assert requests.get(httpserver.url_for("/foo/0")).status_code == 200
+    assert ordered_handlers == handlers[1:]
+
+    assert ordered_handlers.pop(1) is handlers[2]
+    assert ordered_handlers.pop(0) is handlers[1]
+    del ordered_handlers[:]
+    assert ordered_handlers == []
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+from typing import ClassVar
+
+import pytest
+import requests
+from werkzeug import Request
+from werkzeug import Response
+from werkzeug.test import EnvironBuilder
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import PathTemplate
+from pytest_httpserver import RequestMatcher
+from pytest_httpserver.httpserver import RequestHandler
+from pytest_httpserver.httpserver import RequestHandlerList
+
+
+def make_request(path: str, method: str = "GET") -> Request:
+    return Request(EnvironBuilder(path=path, method=method).get_environ())
+
+
+@pytest.mark.parametrize(
+    ("template", "uri", "expected"),
+    [
+        ("/users", "/users", {}),
+        ("/users", "/users/", None),
+        ("/users/{user_id}", "/users/john", {"user_id": "john"}),
+        ("/users/{user_id}", "/users/", None),
+        ("/users/{user_id}", "/users/john/orders", None),
+        ("/users/{user_id:str}", "/users/john", {"user_id": "john"}),
+        ("/orders/{order_id:int}", "/orders/42", {"order_id": 42}),
+        ("/orders/{order_id:int}", "/orders/abc", None),
+        ("/files/{name:path}", "/files/a/b/c.txt", {"name": "a/b/c.txt"}),
+        ("/files/{name:path}", "/files/", None),
+        ("/a/{x}/b/{y:int}/", "/a/foo/b/1/", {"x": "foo", "y": 1}),
+        ("/a.b/{x}", "/aXb/foo", None),
+    ],
+)
+def test_parse(template: str, uri: str, expected: dict | None):
+    pattern = PathTemplate(template)
+    assert pattern.parse(uri) == expected
+    assert pattern.match(uri) is (expected is not None)
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "users/{id}",
+        "/users/id-{id}",
+        "/users/{id",
+        "/users/{id:float}",
+        "/users/{1id}",
+        "/files/{name:path}/raw",
+        "/{id}/{id}",
+    ],
+)
+def test_invalid_template(template: str):
+    with pytest.raises(ValueError):
+        PathTemplate(template)
+
+
+def test_equality():
+    assert PathTemplate("/users/{id}") == PathTemplate("/users/{id}")
+    assert PathTemplate("/users/{id}") != PathTemplate("/users/{id:int}")
+    assert len({PathTemplate("/users/{id}"), PathTemplate("/users/{id}")}) == 1
+
+
+def test_captured_params_passed_to_handler(httpserver: HTTPServer):
+    def handler(request: Request, user_id: str, order_id: int) -> Response:
+        return Response(f"{request.method} {user_id} {order_id + 1}")
+
+    httpserver.expect_request(PathTemplate("/users/{user_id}/orders/{order_id:int}")).respond_with_handler(handler)
+    httpserver.expect_request(PathTemplate("/users/{user_id}")).respond_with_data("user")
+
+    assert requests.get(httpserver.url_for("/users/john/orders/41")).text == "GET john 42"
+    assert requests.get(httpserver.url_for("/users/john")).text == "user"
+    assert requests.get(httpserver.url_for("/users/john/orders/foo")).status_code == 500
+
+
+def test_template_without_placeholders(httpserver: HTTPServer):
+    httpserver.expect_request(PathTemplate("/foo")).respond_with_handler(lambda request: Response(request.path))
+    assert requests.get(httpserver.url_for("/foo")).text == "/foo"
+
+
+def test_templates_keep_registration_order(httpserver: HTTPServer):
+    httpserver.expect_request(PathTemplate("/items/{item_id}")).respond_with_data("str")
+    httpserver.expect_request(PathTemplate("/items/{item_id:int}")).respond_with_data("int")
+    httpserver.expect_request(PathTemplate("/items/new"), method="POST").respond_with_data("new")
+    httpserver.expect_request(PathTemplate("/{rest:path}")).respond_with_data("rest")
+
+    assert httpserver.dispatch(make_request("/items/1")).get_data() == b"str"
+    assert httpserver.dispatch(make_request("/items/new", "POST")).get_data() == b"str"
+    assert httpserver.dispatch(make_request("/other/path")).get_data() == b"rest"
+
+    httpserver.clear_all_handlers()
+    httpserver.expect_request(PathTemplate("/items/new"), method="POST").respond_with_data("new")
+    httpserver.expect_request(PathTemplate("/items/{item_id:int}")).respond_with_data("int")
+    httpserver.expect_request(PathTemplate("/items/{item_id}")).respond_with_data("str")
+
+    assert httpserver.dispatch(make_request("/items/new", "POST")).get_data() == b"new"
+    assert httpserver.dispatch(make_request("/items/1")).get_data() == b"int"
+    assert httpserver.dispatch(make_request("/items/new")).get_data() == b"str"
+
+
+def test_template_router_candidates():
+    handlers = RequestHandlerList()
+    for idx in range(100):
+        handlers.append(RequestHandler(RequestMatcher(PathTemplate(f"/v{idx}/users/{{user_id}}"))))
+
+    index = handlers._get_index()  # noqa: SLF001
+    assert list(index.candidates(make_request("/v42/users/john"))) == [handlers[42]]
+    assert list(index.candidates(make_request("/v42/users"))) == []
+    assert handlers.match(make_request("/v42/users/john")) is handlers[42]
+
+
+class SlugTemplate(PathTemplate):
+    CONVERTERS: ClassVar[dict[str, tuple[str, Callable[[str], Any]]]] = {**PathTemplate.CONVERTERS, "slug": (r"[a-z0-9-]+", str), "str": (r"[^/]*", str)}
+
+
+def test_subclass_converters(httpserver: HTTPServer):
+    httpserver.expect_request(SlugTemplate("/posts/{slug:slug}")).respond_with_data("slug")
+    httpserver.expect_request(SlugTemplate("/tags/{tag}")).respond_with_data("tag")
+    httpserver.expect_request(PathTemplate("/tags/{tag}")).respond_with_data("default")
+
+    assert httpserver.dispatch(make_request("/posts/hello-world")).get_data() == b"slug"
+    assert httpserver.dispatch(make_request("/posts/Hello")).status_code == 500
+    assert httpserver.dispatch(make_request("/tags/")).get_data() == b"tag"
+    assert httpserver.dispatch(make_request("/tags/python")).get_data() == b"tag"
+
+
+def test_oneshot_template(httpserver: HTTPServer):
+    httpserver.expect_oneshot_request(PathTemplate("/users/{user_id}")).respond_with_data("first")
+    httpserver.expect_oneshot_request(PathTemplate("/users/{user_id}")).respond_with_data("second")
+
+    assert httpserver.dispatch(make_request("/users/a")).get_data() == b"first"
+    assert httpserver.dispatch(make_request("/users/b")).get_data() == b"second"
+    assert httpserver.dispatch(make_request("/users/c")).status_code == 500
+    assert len(httpserver.oneshot_handlers) == 0
+
+
+def test_log_querying(httpserver: HTTPServer):
+    httpserver.expect_request(PathTemplate("/users/{user_id}")).respond_with_data("OK")
+    requests.get(httpserver.url_for("/users/john"))
+
+    httpserver.assert_request_made(httpserver.create_matcher(PathTemplate("/users/{user_id}")))
+    httpserver.assert_request_made(httpserver.create_matcher(PathTemplate("/users/{user_id:int}")), count=0)
@@ -1,9 +1,16 @@
+import json
 import os
+import subprocess
+import sys
+from pathlib import Path
 
 import pytest
 
 from pytest_httpserver import HTTPServer
 from pytest_httpserver.pytest_plugin import get_httpserver_listen_address
+from pytest_httpserver.pytest_plugin import PORT_MAP_FILE_ENV
+from pytest_httpserver.pytest_plugin import get_httpserver_port_map
+from pytest_httpserver.pytest_plugin import publish_httpserver_port_map
 
 PORT_KEY = "PYTEST_HTTPSERVER_PORT"
 HOST_KEY = "PYTEST_HTTPSERVER_HOST"
@@ -37,7 +44,58 @@ def test_port_changing_by_environment(httpserver: HTTPServer):
     assert httpserver.port == int(os.environ[PORT_KEY])
 
 
-def test_get_httpserver_listen_address_with_env(tmpenv):  # noqa: ARG001
+def test_get_httpserver_listen_address_with_env(tmpenv, monkeypatch: pytest.MonkeyPatch):  # noqa: ARG001
+    monkeypatch.delenv("PYTEST_XDIST_WORKER", raising=False)
     address = get_httpserver_listen_address()
     assert address[0] == "5.5.5.5"
     assert address[1] == 12345
+
+
+def test_get_httpserver_listen_address_with_xdist(tmpenv, monkeypatch: pytest.MonkeyPatch):  # noqa: ARG001
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw3")
+    assert get_httpserver_listen_address() == ("5.5.5.5", 12348)
+
+    monkeypatch.setenv(PORT_KEY, "65535")
+    with pytest.raises(ValueError, match="out of range"):
+        get_httpserver_listen_address()
+
+
+def test_get_httpserver_listen_address_with_xdist_ephemeral_port(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw3")
+    monkeypatch.delenv(PORT_KEY, raising=False)
+    assert get_httpserver_listen_address()[1] is None
+
+
+def test_get_httpserver_port_map(tmpenv, monkeypatch: pytest.MonkeyPatch):  # noqa: ARG001
+    monkeypatch.delenv("PYTEST_XDIST_WORKER_COUNT", raising=False)
+    assert get_httpserver_port_map() == {"master": 12345}
+
+    monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "3")
+    assert get_httpserver_port_map() == {"gw0": 12345, "gw1": 12346, "gw2": 12347}
+
+    monkeypatch.delenv(PORT_KEY)
+    assert get_httpserver_port_map() == {}
+
+
+def test_publish_httpserver_port_map(tmpenv, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):  # noqa: ARG001
+    monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "2")
+    path = publish_httpserver_port_map(tmp_path)
+    assert path.parent == tmp_path
+
+    script = "import json, sys; print(json.load(open(sys.argv[1]))['gw1'])"
+    result = subprocess.run([sys.executable, "-c", script, str(path)], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "12346"
+
+
+def test_httpserver_port_map_published(httpserver_port_map: dict[str, int]):
+    # the processes started by the tests find the map by the environment variable
+    script = f"import json, os; print(open(os.environ[{PORT_MAP_FILE_ENV!r}]).read())"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == httpserver_port_map
+
+
+def test_get_httpserver_listen_address_with_xdist_unix_socket(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw3")
+    monkeypatch.setenv(HOST_KEY, "unix:///tmp/httpserver.sock")
+    monkeypatch.delenv(PORT_KEY, raising=False)
+    assert get_httpserver_listen_address() == ("unix:///tmp/httpserver.gw3.sock", None)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import email
+import os
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
+
+import pytest
+import requests
+from werkzeug import Request
+
+from pytest_httpserver import BlockingHTTPServer
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import StaticResponse
+
+BODY = bytes(range(256)) * 4
+
+
+def test_not_conditional_by_default(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_data(BODY)
+
+    response = requests.get(httpserver.url_for("/foo"), headers={"Range": "bytes=0-9"})
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert response.content == BODY
+
+
+def test_etag_computed_once():
+    static_response = StaticResponse(BODY, conditional=True)
+
+    assert static_response.etag is not None
+    assert (
+        static_response.make_response().headers["ETag"]
+        == static_response.make_response(Request.from_values("/")).headers["ETag"]
+    )
+    assert static_response.make_response().headers["Accept-Ranges"] == "bytes"
+
+
+def test_if_none_match(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_data(BODY, conditional=True)
+
+    response = requests.get(httpserver.url_for("/foo"))
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = requests.get(httpserver.url_for("/foo"), headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    response = requests.get(httpserver.url_for("/foo"), headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+    assert response.content == BODY
+
+
+@pytest.mark.parametrize(
+    ("range_header", "expected_range", "expected_body"),
+    [
+        pytest.param("bytes=0-9", "bytes 0-9/1024", BODY[:10], id="first"),
+        pytest.param("bytes=1000-", "bytes 1000-1023/1024", BODY[1000:], id="open-ended"),
+        pytest.param("bytes=-24", "bytes 1000-1023/1024", BODY[-24:], id="suffix"),
+        pytest.param("bytes=1000-5000", "bytes 1000-1023/1024", BODY[1000:], id="past-the-end"),
+    ],
+)
+def test_single_range(httpserver: HTTPServer, range_header: str, expected_range: str, expected_body: bytes):
+    httpserver.expect_request("/foo").respond_with_json(
+        {"data": BODY.hex()}, content_type="application/json", conditional=True
+    )
+    httpserver.expect_request("/bar").respond_with_data(BODY, content_type="application/octet-stream", conditional=True)
+
+    response = requests.get(httpserver.url_for("/bar"), headers={"Range": range_header})
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == expected_range
+    assert response.headers["Content-Type"] == "application/octet-stream"
+    assert response.headers["Content-Length"] == str(len(expected_body))
+    assert response.content == expected_body
+
+    response = requests.get(httpserver.url_for("/foo"), headers={"Range": "bytes=0-0"})
+    assert response.status_code == 206
+    assert response.content == b"{"
+
+
+def test_multiple_ranges(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_data(BODY, content_type="application/octet-stream", conditional=True)
+
+    response = requests.get(httpserver.url_for("/foo"), headers={"Range": "bytes=0-9,100-109,-5"})
+    assert response.status_code == 206
+    assert response.headers["Content-Type"].startswith("multipart/byteranges; boundary=")
+    assert response.headers["Content-Length"] == str(len(response.content))
+
+    message = email.message_from_bytes(
+        b"Content-Type: " + response.headers["Content-Type"].encode() + b"\r\n\r\n" + response.content
+    )
+    parts = [(part["Content-Range"], part.get_payload(decode=True)) for part in message.get_payload()]
+    assert parts == [
+        ("bytes 0-9/1024", BODY[0:10]),
+        ("bytes 100-109/1024", BODY[100:110]),
+        ("bytes 1019-1023/1024", BODY[-5:]),
+    ]
+
+
+def test_unsatisfiable_range(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_data(BODY, conditional=True)
+
+    response = requests.get(httpserver.url_for("/foo"), headers={"Range": "bytes=2000-3000"})
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == "bytes */1024"
+
+
+def test_if_range(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_data(BODY, conditional=True)
+    etag = requests.get(httpserver.url_for("/foo")).headers["ETag"]
+
+    response = requests.get(httpserver.url_for("/foo"), headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert response.status_code == 206
+    assert response.content == BODY[:10]
+
+    response = requests.get(httpserver.url_for("/foo"), headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+    assert response.status_code == 200
+    assert response.content == BODY
+
+
+def test_non_ok_status_is_not_conditional(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_data(BODY, status=404, conditional=True)
+
+    response = requests.get(httpserver.url_for("/foo"), headers={"Range": "bytes=0-9"})
+    assert response.status_code == 404
+    assert response.content == BODY
+
+
+def test_file_conditional(httpserver: HTTPServer, tmp_path: Path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(BODY)
+    os.utime(path, (1_700_000_000, 1_700_000_000))
+    httpserver.expect_request("/data").respond_with_file(path, conditional=True)
+
+    response = requests.get(httpserver.url_for("/data"))
+    assert response.status_code == 200
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.headers["Last-Modified"] == "Tue, 14 Nov 2023 22:13:20 GMT"
+    assert response.content == BODY
+    etag = response.headers["ETag"]
+
+    response = requests.get(httpserver.url_for("/data"), headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = requests.get(httpserver.url_for("/data"), headers={"If-Modified-Since": "Tue, 14 Nov 2023 22:13:20 GMT"})
+    assert response.status_code == 304
+
+    response = requests.get(httpserver.url_for("/data"), headers={"Range": "bytes=10-19,-4"})
+    assert response.status_code == 206
+    assert BODY[10:20] in response.content
+    assert BODY[-4:] in response.content
+
+    response = requests.get(
+        httpserver.url_for("/data"), headers={"Range": "bytes=10-19", "If-Range": "Tue, 14 Nov 2023 22:13:20 GMT"}
+    )
+    assert response.status_code == 206
+    assert response.content == BODY[10:20]
+
+    path.write_bytes(BODY[::-1])
+    response = requests.get(httpserver.url_for("/data"), headers={"Range": "bytes=10-19", "If-Range": etag})
+    assert response.status_code == 200
+    assert response.content == BODY[::-1]
+
+
+def test_blocking_httpserver_conditional():
+    with BlockingHTTPServer(timeout=1) as server, ThreadPool(1) as pool:
+        result = pool.apply_async(requests.get, (server.url_for("/foo"),), {"headers": {"Range": "bytes=0-1"}})
+        server.assert_request("/foo").respond_with_data(BODY, conditional=True)
+        response = result.get(timeout=9)
+
+    assert response.status_code == 206
+    assert response.content == BODY[:2]
@@ -1,4 +1,6 @@
+import ssl
 from collections.abc import Generator
+from pathlib import Path
 from typing import Any
 
 import pytest
@@ -7,6 +9,8 @@ import requests
 from pytest_httpserver.httpserver import HTTPServer
 from pytest_httpserver.httpserver import HTTPServerError
 
+ASSETS_DIR = Path(__file__).parent / "assets"
+
 
 @pytest.fixture
 def httpserver() -> Generator[HTTPServer, None, None]:
@@ -32,14 +36,13 @@ class RecordingHTTPServer(HTTPServer):
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self.wait_for_ready_call_count = 0
-        self.readiness_pending_before_wait: list[bool] = []
-        self.readiness_pending_after_wait: list[bool] = []
+        self.serving_after_wait: list[bool] = []
 
     def wait_for_server_ready(self) -> None:
         self.wait_for_ready_call_count += 1
-        self.readiness_pending_before_wait.append(self._readiness_check_pending)
         super().wait_for_server_ready()
-        self.readiness_pending_after_wait.append(self._readiness_check_pending)
+        assert self.server is not None
+        self.serving_after_wait.append(self.server.serving.is_set())  # type: ignore[attr-defined]
 
 
 @pytest.fixture
@@ -58,16 +61,13 @@ def test_wait_for_server_ready_called_with_timeout(
     recording_server_with_timeout: RecordingHTTPServer,
 ) -> None:
     assert recording_server_with_timeout.wait_for_ready_call_count == 1
-    assert recording_server_with_timeout.readiness_pending_before_wait == [True]
-    assert recording_server_with_timeout.readiness_pending_after_wait == [False]
+    assert recording_server_with_timeout.serving_after_wait == [True]
 
 
 def test_wait_for_server_ready_called_without_timeout(
     recording_server_without_timeout: RecordingHTTPServer,
 ) -> None:
     assert recording_server_without_timeout.wait_for_ready_call_count == 1
-    assert recording_server_without_timeout.readiness_pending_before_wait == [False]
-    assert recording_server_without_timeout.readiness_pending_after_wait == [False]
 
 
 def test_wait_for_server_ready_called_each_start_stop_cycle() -> None:
@@ -83,19 +83,36 @@ def test_wait_for_server_ready_called_each_start_stop_cycle() -> None:
             server.clear()
             server.stop()
 
-    assert server.readiness_pending_before_wait == [True, True, True]
-    assert server.readiness_pending_after_wait == [False, False, False]
+    assert server.serving_after_wait == [True, True, True]
+
+
+@pytest.mark.parametrize("readiness_probe", [False, True])
+def test_readiness_check_sends_no_request(readiness_probe: bool) -> None:  # noqa: FBT001
+    with HTTPServer(startup_timeout=5, readiness_probe=readiness_probe) as server:
+        # the first request is served by the handler, not answered by the readiness check
+        server.expect_oneshot_request("/").respond_with_data("handler response")
+        resp = requests.get(server.url_for("/"))
+        assert resp.text == "handler response"
+
+        assert len(server.log) == 1
+        assert server.assertions == []
 
 
-def test_double_start_does_not_poison_readiness_flag() -> None:
+def test_readiness_probe_with_ssl() -> None:
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(ASSETS_DIR / "server.crt", ASSETS_DIR / "server.key")
+
+    with HTTPServer(ssl_context=context, startup_timeout=5, readiness_probe=True) as server:
+        assert server.is_running()
+
+
+def test_double_start_does_not_affect_readiness() -> None:
     server = HTTPServer(startup_timeout=5)
     server.start()
     try:
         with pytest.raises(HTTPServerError, match="already running"):
             server.start()
 
-        assert server._readiness_check_pending is False  # noqa: SLF001
-
         server.expect_request("/test").respond_with_data("normal response")
         resp = requests.get(server.url_for("/test"))
         assert resp.status_code == 200
@@ -163,12 +163,17 @@ def test_wheel_no_extra_contents(build: Build, version: str):
     package_contents = {path.name for path in wheel_dir.joinpath(NAME_UNDERSCORE).iterdir()}
     assert package_contents == {
         "__init__.py",
+        "async_httpserver.py",
         "bake.py",
         "blocking_httpserver.py",
+        "engines.py",
         "hooks.py",
         "httpserver.py",
+        "multiprocess.py",
         "py.typed",
         "pytest_plugin.py",
+        "specs.py",
+        "tls.py",
     }
 
 
@@ -206,42 +211,66 @@ def test_sdist_contents(build: Build, version: str):
         },
         "pytest_httpserver": {
             "__init__.py",
+            "async_httpserver.py",
             "bake.py",
             "blocking_httpserver.py",
+            "engines.py",
             "hooks.py",
             "httpserver.py",
+            "multiprocess.py",
             "py.typed",
             "pytest_plugin.py",
+            "specs.py",
+            "tls.py",
         },
         "tests": {
             "assets",
             "conftest.py",
             "examples",
+            "test_async_httpserver.py",
             "test_bake.py",
+            "test_benchmark.py",
             "test_blocking_httpserver.py",
+            "test_compression.py",
+            "test_engines.py",
+            "test_file_response.py",
             "test_handler_errors.py",
+            "test_handler_index.py",
             "test_headers.py",
             "test_hooks.py",
             "test_ip_protocols.py",
             "test_json_matcher.py",
+            "test_json_response.py",
+            "test_keep_alive.py",
             "test_log_leak.py",
             "test_log_querying.py",
+            "test_log_retention.py",
             "test_mixed.py",
+            "test_multiprocess.py",
             "test_oneshot.py",
             "test_ordered.py",
             "test_permanent.py",
             "test_parse_qs.py",
+            "test_path_template.py",
             "test_port_changing.py",
             "test_querymatcher.py",
             "test_querystring.py",
+            "test_range_requests.py",
             "test_readiness.py",
             "test_release.py",
+            "test_request_cache.py",
             "test_ssl.py",
+            "test_stream.py",
+            "test_static_response.py",
             "test_thread_type.py",
             "test_threaded.py",
+            "test_tls.py",
+            "test_unix_socket.py",
             "test_urimatch.py",
             "test_wait.py",
             "test_with_statement.py",
+            "test_worker_pool.py",
+            "test_expect_requests.py",
             "test_matcher.py",
         },
     }
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+import requests
+from werkzeug import Request
+from werkzeug.test import EnvironBuilder
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver.httpserver import UNDEFINED
+from pytest_httpserver.httpserver import RequestCache
+
+
+def make_request(path: str = "/foo", **kwargs) -> Request:
+    return Request(EnvironBuilder(path=path, **kwargs).get_environ())
+
+
+@pytest.fixture
+def json_loads_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+    original = json.loads
+
+    def loads(s, *args, **kwargs):
+        calls.append(s)
+        return original(s, *args, **kwargs)
+
+    monkeypatch.setattr(json, "loads", loads)
+    return calls
+
+
+def test_json_decoded_once_per_request(json_loads_calls: list[str]):
+    server = HTTPServer()
+    for idx in range(10):
+        server.expect_request("/foo", json={"value": idx}).respond_with_data(str(idx))
+
+    response = server.application(make_request(json={"value": 9}))
+
+    assert response.get_data() == b"9"
+    assert len(json_loads_calls) == 1
+
+
+def test_cache_is_reused_by_log_queries(json_loads_calls: list[str], httpserver: HTTPServer):
+    httpserver.expect_request("/foo", json={"foo": "bar"}).respond_with_data("OK")
+    assert requests.post(httpserver.url_for("/foo"), json={"foo": "bar"}).text == "OK"
+    assert len(json_loads_calls) == 1
+
+    for _ in range(3):
+        httpserver.assert_request_made(httpserver.create_matcher("/foo", json={"foo": "bar"}))
+
+    assert len(json_loads_calls) == 1
+
+
+def test_invalid_json():
+    cache = RequestCache.of(make_request(data=b"non-text\x1f\x8b"))
+    assert cache.get_json("utf-8") is UNDEFINED
+    assert cache.get_json("latin-1") is UNDEFINED
+
+
+def test_query():
+    cache = RequestCache.of(make_request(query_string="k1=v1&k1=v2&k2=v3"))
+    assert cache.get_query().getlist("k1") == ["v1", "v2"]
+    assert cache.get_query_dict() == {"k1": "v1", "k2": "v3"}
+    assert cache.get_query() is cache.get_query()
+
+
+def test_headers_are_case_insensitive():
+    cache = RequestCache.of(make_request(headers={"X-Foo": "bar"}))
+    assert cache.get_header("x-foo") == "bar"
+    assert cache.get_header("X-FOO") == "bar"
+    assert cache.get_header("X-Bar") is None
+
+
+def test_headers_underscore_equivalent_to_dash():
+    cache = RequestCache.of(make_request(headers={"X-Foo": "bar"}))
+    assert cache.get_header("X_Foo") == "bar"
+
+
+def test_cache_attached_to_request():
+    request = make_request()
+    assert RequestCache.of(request) is RequestCache.of(request)
+    assert RequestCache.attach(request) is RequestCache.of(request)
@@ -0,0 +1,61 @@
+import requests
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import StaticResponse
+from pytest_httpserver.hooks import Garbage
+
+
+def test_static_response():
+    static_response = StaticResponse("OK", 201, {"X-Foo": "bar"}, content_type="text/plain")
+
+    assert static_response.body == b"OK"
+    assert static_response.status == "201 CREATED"
+    assert static_response.status_code == 201
+    assert ("X-Foo", "bar") in static_response.headers
+    assert ("Content-Length", "2") in static_response.headers
+
+    response = static_response.make_response()
+    assert response.status_code == 201
+    assert response.get_data() == b"OK"
+    assert response.headers["X-Foo"] == "bar"
+    assert response.headers["Content-Type"] == "text/plain"
+    assert response.headers["Content-Length"] == "2"
+
+
+def test_static_response_is_not_shared():
+    static_response = StaticResponse("OK", headers={"X-Foo": "bar"})
+
+    response1 = static_response.make_response()
+    response1.set_data(b"modified")
+    response1.headers["X-Foo"] = "baz"
+    response1.headers["X-Bar"] = "bar"
+    response1.status_code = 404
+    response1.call_on_close(lambda: None)
+
+    response2 = static_response.make_response()
+    assert response2 is not response1
+    assert response2.get_data() == b"OK"
+    assert response2.headers["X-Foo"] == "bar"
+    assert "X-Bar" not in response2.headers
+    assert response2.status_code == 200
+    assert static_response.body == b"OK"
+
+
+def test_respond_with_static_response(httpserver: HTTPServer):
+    static_response = StaticResponse("OK", headers={"X-Foo": "bar"})
+    httpserver.expect_request("/foo").respond_with_static_response(static_response)
+    httpserver.expect_request("/bar").respond_with_static_response(static_response)
+
+    for uri in ("/foo", "/bar", "/foo"):
+        response = requests.get(httpserver.url_for(uri))
+        assert response.text == "OK"
+        assert response.headers["X-Foo"] == "bar"
+
+
+def test_hook_does_not_modify_later_responses(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").with_post_hook(Garbage(suffix_size=4)).respond_with_data("OK")
+
+    for _ in range(3):
+        response = requests.get(httpserver.url_for("/foo"))
+        assert len(response.content) == 6
+        assert response.content.startswith(b"OK")
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import io
+from collections.abc import Iterator
+
+import requests
+from werkzeug import Request
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import RequestHandler
+from pytest_httpserver import RequestMatcher
+from pytest_httpserver.hooks import Garbage
+
+
+def generate(count: int, size: int) -> Iterator[bytes]:
+    for idx in range(count):
+        yield bytes([idx % 256]) * size
+
+
+def test_stream_from_factory(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_stream(lambda: generate(4, 1000), content_type="text/plain")
+
+    for _ in range(2):
+        response = requests.get(httpserver.url_for("/foo"))
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "text/plain"
+        assert "Content-Length" not in response.headers
+        assert response.content == b"".join(generate(4, 1000))
+
+
+def test_stream_with_content_length(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").respond_with_stream(lambda: generate(4, 1000), content_length=4000)
+
+    response = requests.get(httpserver.url_for("/foo"))
+    assert response.headers["Content-Length"] == "4000"
+    assert response.content == b"".join(generate(4, 1000))
+
+
+def test_stream_chunked():
+    server = HTTPServer(threaded=True)
+    server.expect_request("/foo").respond_with_stream(lambda: generate(4, 1000))
+
+    with server:
+        response = requests.get(server.url_for("/foo"))
+        assert response.headers["Transfer-Encoding"] == "chunked"
+        assert response.content == b"".join(generate(4, 1000))
+
+
+def test_stream_is_not_buffered():
+    produced: list[int] = []
+
+    def produce() -> Iterator[str]:
+        for idx in range(3):
+            produced.append(idx)
+            yield str(idx)
+
+    handler = RequestHandler(RequestMatcher("/foo"))
+    handler.respond_with_stream(produce, chunk_size=10)
+
+    response = handler.respond(Request.from_values("/foo"))
+    assert response.is_streamed
+    assert produced == []
+
+    chunks = response.iter_encoded()
+    assert next(chunks) == b"0"
+    assert produced == [0]
+    assert list(chunks) == [b"1", b"2"]
+
+
+def test_stream_chunk_size():
+    handler = RequestHandler(RequestMatcher("/foo"))
+    handler.respond_with_stream(lambda: [b"abcdefg", b"", "hi"], chunk_size=3)
+
+    response = handler.respond(Request.from_values("/foo"))
+    assert list(response.iter_encoded()) == [b"abc", b"def", b"g", b"hi"]
+
+
+def test_stream_file_object():
+    files: list[io.BytesIO] = []
+
+    def open_file() -> io.BytesIO:
+        files.append(io.BytesIO(b"x" * 10))
+        return files[-1]
+
+    handler = RequestHandler(RequestMatcher("/foo"))
+    handler.respond_with_stream(open_file, chunk_size=4)
+
+    response = handler.respond(Request.from_values("/foo"))
+    assert list(response.iter_encoded()) == [b"xxxx", b"xxxx", b"xx"]
+    response.close()
+    assert files[0].closed
+
+
+def test_stream_with_garbage_hook(httpserver: HTTPServer):
+    httpserver.expect_request("/foo").with_post_hook(Garbage(prefix_size=16, suffix_size=8)).respond_with_stream(
+        lambda: generate(4, 1000), content_length=4000
+    )
+
+    response = requests.get(httpserver.url_for("/foo"))
+    assert response.headers["Content-Length"] == "4024"
+    assert len(response.content) == 4024
+    assert response.content[16:-8] == b"".join(generate(4, 1000))
@@ -1,9 +1,12 @@
 import http.client
+import re
+import sys
 import threading
 import time
 from collections.abc import Iterable
 
 import pytest
+import requests
 from werkzeug import Request
 from werkzeug import Response
 
@@ -50,3 +53,60 @@ def test_threaded(threaded: HTTPServer):
         conn.close()
 
     assert len(thread_ids) == len(set(thread_ids)), "thread ids returned should be unique"
+
+
+def test_threaded_oneshot_consumption(threaded: HTTPServer):
+    handler_count = 1000
+    thread_count = 8
+    for idx in range(handler_count):
+        # the regular expressions share their literal prefix, so they are evaluated in the same bucket
+        threaded.expect_oneshot_request(re.compile(rf"/foo/{idx}$")).respond_with_data(str(idx))
+
+    statuses: list[int] = []
+
+    def client(offset: int) -> None:
+        with requests.Session() as session:
+            for idx in range(offset, handler_count, thread_count):
+                statuses.append(session.get(threaded.url_for(f"/foo/{idx}")).status_code)
+
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(thread_count)]
+    # switch between the threads often, so the dispatches interleave
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert statuses == [200] * handler_count
+    assert threaded.oneshot_handlers == []
+    threaded.check_assertions()
+    threaded.check_handler_errors()
+
+
+def test_threaded_dispatch_while_registering(threaded: HTTPServer):
+    threaded.expect_request("/foo").respond_with_data("OK")
+    stop = threading.Event()
+
+    def register() -> None:
+        idx = 0
+        while not stop.is_set():
+            threaded.expect_request(f"/bar/{idx}").respond_with_data("OK")
+            threaded.expect_request(re.compile(rf"/baz/{idx}$")).respond_with_data("OK")
+            idx += 1
+
+    registering = threading.Thread(target=register)
+    registering.start()
+    try:
+        with requests.Session() as session:
+            statuses = [session.get(threaded.url_for("/foo")).status_code for _ in range(200)]
+    finally:
+        stop.set()
+        registering.join()
+
+    assert statuses == [200] * 200
+    threaded.check_assertions()
+    threaded.check_handler_errors()
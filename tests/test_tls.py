@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import socket
+import ssl
+import threading
+from pathlib import Path
+
+import pytest
+import requests
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import HTTPServerError
+from pytest_httpserver import TLSCertificates
+from pytest_httpserver import get_tls_certificates
+from pytest_httpserver import tls
+
+
+def https_get(server: HTTPServer, context: ssl.SSLContext, session: ssl.SSLSession | None = None) -> ssl.SSLSocket:
+    sock = socket.create_connection(("localhost", server.port))
+    ssock = context.wrap_socket(sock, server_hostname="localhost", session=session)
+    ssock.sendall(b"GET /foo HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+    response = b""
+    while chunk := ssock.recv(4096):
+        response += chunk
+    assert response.endswith(b"\r\n\r\nOK")
+    return ssock
+
+
+def test_httpsserver(httpsserver: HTTPServer, httpsserver_ca_bundle: str):
+    httpsserver.expect_request("/foo").respond_with_data("OK")
+
+    assert httpsserver.url_for("/foo").startswith("https://localhost:")
+    assert requests.get(httpsserver.url_for("/foo"), verify=httpsserver_ca_bundle).text == "OK"
+
+
+def test_httpsserver_session_resumption(httpsserver: HTTPServer, httpsserver_certificates: TLSCertificates):
+    httpsserver.expect_request("/foo").respond_with_data("OK")
+    context = httpsserver_certificates.client_context()
+
+    first = https_get(httpsserver, context)
+    assert not first.session_reused
+    second = https_get(httpsserver, context, first.session)
+    assert second.session_reused
+
+    first.close()
+    second.close()
+
+
+def test_httpsserver_certificates_cached(httpsserver_certificates: TLSCertificates, pytestconfig: pytest.Config):
+    if getattr(pytestconfig, "cache", None) is None:
+        pytest.skip("the cache provider plugin is disabled")
+    assert pytestconfig.cache is not None
+    assert httpsserver_certificates.directory == pytestconfig.cache.mkdir("pytest-httpserver") / "tls"
+    assert get_tls_certificates(httpsserver_certificates.directory).server_cert == httpsserver_certificates.server_cert
+
+
+def test_get_tls_certificates(tmp_path: Path):
+    directory = tmp_path / "tls"
+    certificates = get_tls_certificates(directory)
+    assert certificates.is_valid()
+    assert {path.name for path in tmp_path.iterdir()} == {"tls", ".tls.lock"}
+
+    mtime = os.stat(certificates.server_cert).st_mtime_ns
+    assert get_tls_certificates(directory).server_cert == certificates.server_cert
+    assert os.stat(certificates.server_cert).st_mtime_ns == mtime
+
+
+def test_get_tls_certificates_expired(tmp_path: Path):
+    certificates = get_tls_certificates(tmp_path / "tls")
+    ca_bundle = Path(certificates.ca_bundle).read_text()
+
+    metadata_path = certificates.directory / "certificates.json"
+    metadata = json.loads(metadata_path.read_text())
+    metadata_path.write_text(json.dumps({**metadata, "not_after": 0}))
+    assert not certificates.is_valid()
+
+    assert get_tls_certificates(tmp_path / "tls").is_valid()
+    assert Path(certificates.ca_bundle).read_text() != ca_bundle
+
+
+def test_get_tls_certificates_generated_concurrently(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    directory = tmp_path / "tls"
+    certificates = get_tls_certificates(directory)
+    metadata_path = certificates.directory / "certificates.json"
+    metadata_path.write_text(json.dumps({**json.loads(metadata_path.read_text()), "not_after": 0}))
+
+    is_valid = TLSCertificates.is_valid
+    other = tmp_path / "other"
+
+    def is_valid_concurrently(self: TLSCertificates) -> bool:
+        # another process replaces the expired certificates right after they are checked
+        result = is_valid(self)
+        if not (tmp_path / "other.crt").exists():
+            other.mkdir()
+            tls._generate(other)  # noqa: SLF001
+            shutil.copy(other / "ca.crt", tmp_path / "other.crt")
+            shutil.rmtree(directory)
+            other.rename(directory)
+        return result
+
+    monkeypatch.setattr(TLSCertificates, "is_valid", is_valid_concurrently)
+
+    assert get_tls_certificates(directory).is_valid()
+    assert Path(certificates.ca_bundle).read_text() == (tmp_path / "other.crt").read_text()
+    assert {path.name for path in tmp_path.iterdir()} == {"tls", "other.crt", ".tls.lock"}
+
+
+def test_get_tls_certificates_waits_for_lock(tmp_path: Path):
+    directory = tmp_path / "tls"
+    results: list[TLSCertificates] = []
+
+    with tls._locked(tmp_path / ".tls.lock"):  # noqa: SLF001
+        # another process holds the lock while generating the certificates
+        thread = threading.Thread(target=lambda: results.append(get_tls_certificates(directory)))
+        thread.start()
+        thread.join(0.5)
+        assert thread.is_alive()
+
+        directory.mkdir()
+        tls._generate(directory)  # noqa: SLF001
+        mtime = os.stat(directory / "server.crt").st_mtime_ns
+
+    thread.join()
+    assert results[0].is_valid()
+    # the certificates generated by the lock holder are used, not generated again
+    assert os.stat(results[0].server_cert).st_mtime_ns == mtime
+
+
+def test_get_tls_certificates_without_openssl(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("PATH", str(tmp_path))
+
+    with pytest.raises(HTTPServerError, match="openssl"):
+        get_tls_certificates(tmp_path / "tls")
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import http.client
+import os
+import socket
+import tempfile
+from collections.abc import Iterator
+
+import pytest
+
+from pytest_httpserver import AsyncHTTPServer
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import HTTPServerError
+from pytest_httpserver import KeepAliveSettings
+from pytest_httpserver.engines import AsyncioEngine
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not supported")
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str) -> None:
+        super().__init__("localhost")
+        self.socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+def get(server: HTTPServer, path: str) -> tuple[int, bytes]:
+    assert server.unix_socket is not None
+    conn = UnixHTTPConnection(server.unix_socket)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def socket_path() -> Iterator[str]:
+    # the path of a unix socket is limited to about 100 characters, so tmp_path may be too long
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, "server.sock")
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param({}, id="default"),
+        pytest.param({"threaded": True}, id="threaded"),
+        pytest.param({"keep_alive": KeepAliveSettings()}, id="keep-alive"),
+        pytest.param({"engine": AsyncioEngine()}, id="asyncio-engine"),
+    ],
+)
+def test_unix_socket(socket_path: str, kwargs: dict):
+    server = HTTPServer(host="unix://" + socket_path, **kwargs)
+    server.expect_request("/foo").respond_with_data("OK")
+
+    with server:
+        assert server.unix_socket == socket_path
+        assert os.path.exists(socket_path)
+        assert get(server, "/foo") == (200, b"OK")
+
+    assert not os.path.exists(socket_path)
+    server.check_assertions()
+    request, _ = server.log[0]
+    assert request.path == "/foo"
+
+
+def test_unix_socket_urls(socket_path: str):
+    server = HTTPServer(host="unix://" + socket_path)
+
+    assert server.url_for("foo") == "http://localhost/foo"
+    assert server.unix_url_for("/foo") == "http+unix://{}/foo".format(socket_path.replace("/", "%2F"))
+
+
+def test_unix_url_for_tcp():
+    server = HTTPServer()
+
+    assert server.unix_socket is None
+    with pytest.raises(HTTPServerError, match="Unix domain socket"):
+        server.unix_url_for("/foo")
+
+
+def test_unix_socket_stale_file(socket_path: str):
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+
+    server = HTTPServer(host="unix://" + socket_path)
+    server.expect_request("/foo").respond_with_data("OK")
+
+    with server:
+        assert get(server, "/foo") == (200, b"OK")
+
+
+def test_unix_socket_readiness_probe(socket_path: str):
+    with HTTPServer(host="unix://" + socket_path, readiness_probe=True) as server:
+        server.expect_request("/foo").respond_with_data("OK")
+        assert get(server, "/foo") == (200, b"OK")
+
+
+def test_unix_socket_processes(socket_path: str):
+    server = HTTPServer(host="unix://" + socket_path, processes=2)
+
+    with pytest.raises(HTTPServerError, match="Unix domain sockets"):
+        server.start()
+
+
+def test_async_httpserver_unix_socket(socket_path: str):
+    async def fetch() -> bytes:
+        server = AsyncHTTPServer(host="unix://" + socket_path)
+        server.expect_request("/foo").respond_with_data("OK")
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+            writer.write(b"GET /foo HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+            await writer.wait_closed()
+        assert not os.path.exists(socket_path)
+        return response
+
+    response = asyncio.run(fetch())
+    assert response.startswith(b"HTTP/1.1 200")
+    assert response.endswith(b"\r\n\r\nOK")
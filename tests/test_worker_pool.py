@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from multiprocessing.pool import ThreadPool
+
+import pytest
+import requests
+from werkzeug import Request
+from werkzeug import Response
+
+from pytest_httpserver import HTTPServer
+from pytest_httpserver import OverflowPolicy
+from pytest_httpserver import WorkerPool
+
+
+def wait_until(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def release() -> Iterator[threading.Event]:
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def make_server(worker_pool: WorkerPool, release: threading.Event) -> HTTPServer:
+    def handler(_request: Request) -> Response:
+        release.wait(5)
+        return Response("slow")
+
+    server = HTTPServer(worker_pool=worker_pool)
+    server.expect_request("/slow").respond_with_handler(handler)
+    server.expect_request("/thread").respond_with_handler(lambda _: Response(threading.current_thread().name))
+    return server
+
+
+def test_worker_pool_reuses_threads(release: threading.Event):
+    worker_pool = WorkerPool(max_workers=2)
+
+    with make_server(worker_pool, release) as server:
+        assert worker_pool.is_running()
+        names = {requests.get(server.url_for("/thread")).text for _ in range(10)}
+
+    assert not worker_pool.is_running()
+    assert len(names) <= 2
+    assert all(name.startswith("WorkerPool-") for name in names)
+
+
+@pytest.mark.parametrize("overflow", [OverflowPolicy.REJECT, "close"])
+def test_worker_pool_overflow(overflow: OverflowPolicy | str, release: threading.Event):
+    worker_pool = WorkerPool(max_workers=1, queue_size=1, overflow=overflow)
+
+    with make_server(worker_pool, release) as server, ThreadPool(2) as pool:
+        results = [pool.apply_async(requests.get, (server.url_for("/slow"),)) for _ in range(2)]
+        wait_until(lambda: worker_pool.active_count == 1 and worker_pool.queued_count == 1)
+
+        if worker_pool.overflow is OverflowPolicy.REJECT:
+            assert requests.get(server.url_for("/slow")).status_code == 503
+        else:
+            with pytest.raises(requests.ConnectionError):
+                requests.get(server.url_for("/slow"))
+        assert worker_pool.rejected_count == 1
+
+        release.set()
+        assert [result.get(5).text for result in results] == ["slow", "slow"]
+
+    wait_until(lambda: worker_pool.active_count == 0)
+
+
+def test_worker_pool_block(release: threading.Event):
+    worker_pool = WorkerPool(max_workers=1, queue_size=0, overflow="block")
+
+    with make_server(worker_pool, release) as server, ThreadPool(2) as pool:
+        results = [pool.apply_async(requests.get, (server.url_for("/slow"),)) for _ in range(2)]
+        wait_until(lambda: worker_pool.active_count == 1)
+
+        time.sleep(0.1)
+        assert worker_pool.queued_count == 0
+        assert not any(result.ready() for result in results)
+
+        release.set()
+        assert [result.get(5).text for result in results] == ["slow", "slow"]
+
+    assert worker_pool.rejected_count == 0
+
+
+def test_worker_pool_block_stop():
+    worker_pool = WorkerPool(max_workers=1, queue_size=0, overflow="block")
+    server = HTTPServer(worker_pool=worker_pool)
+    server.start()
+
+    # the worker waits for the request of the first client, the second one waits for room
+    clients = [socket.create_connection((server.host, server.port)) for _ in range(2)]
+    try:
+        wait_until(lambda: worker_pool.active_count == 1)
+        time.sleep(0.1)
+
+        stop = threading.Thread(target=server.stop, daemon=True)
+        stop.start()
+        stop.join(5)
+        assert not stop.is_alive()
+        assert not server.is_running()
+    finally:
+        for client in clients:
+            client.close()
+
+
+def test_worker_pool_restart(release: threading.Event):
+    worker_pool = WorkerPool(max_workers=1)
+    server = make_server(worker_pool, release)
+
+    for _ in range(2):
+        server.start()
+        assert requests.get(server.url_for("/thread")).status_code == 200
+        server.stop()
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param({"max_workers": 0}, id="no-workers"),
+        pytest.param({"queue_size": -1}, id="negative-queue"),
+        pytest.param({"overflow": "drop"}, id="invalid-overflow"),
+    ],
+)
+def test_worker_pool_invalid(kwargs: dict):
+    with pytest.raises(ValueError):
+        WorkerPool(**kwargs)